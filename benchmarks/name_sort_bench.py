@@ -0,0 +1,103 @@
+"""Name sort benchmark: times get_last_name_sort_key over synthetic last names.
+
+Generates last names (plain, with lowercase and capitalized particles, smart
+quotes, hyphenated Arabic articles) and times the original particle loop
+against the compiled matcher, without and with its memo cache. Every key is
+checked against the original loop; any difference exits with status 1.
+
+    python -m benchmarks.name_sort_bench --names 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from rsvp_manager.utils import (
+    NOBILITY_PARTICLES, _is_lowercase_particle, _normalize_apostrophes,
+    get_last_name_sort_key,
+)
+
+SURNAMES = (
+    "Berg", "Séjournet", "Humboldt", "Silva", "Gaulle", "Cruz", "Heuvel", "Martin",
+    "Dupont", "Smith", "Ridder", "Artagnan", "Hôpital", "Rashid", "Vinci", "Santos",
+    "Beethoven", "Liechtenstein", "Marco", "Bosch", "Stein", "Guttenberg", "Nguyen",
+)
+
+
+def reference_sort_key(last_name):
+    """The particle loop get_last_name_sort_key used before the compiled matcher."""
+    if not last_name:
+        return ""
+    normalized = _normalize_apostrophes(last_name)
+    for particle in NOBILITY_PARTICLES:
+        prefix = particle if particle.endswith(("'", "-")) else particle + " "
+        if normalized.lower().startswith(prefix) and len(normalized) > len(prefix):
+            if _is_lowercase_particle(normalized, len(prefix)):
+                return normalized[len(prefix):].lower()
+            return normalized.lower()
+    return last_name.lower()
+
+
+def make_names(count, rng, distinct):
+    """``count`` last names drawn from ``distinct`` generated ones, as a guest
+    list repeats family names."""
+    pool = []
+    for i in range(distinct):
+        surname = rng.choice(SURNAMES) + (str(i) if i >= len(SURNAMES) else "")
+        roll = rng.random()
+        if roll < 0.5:
+            pool.append(surname)
+        else:
+            particle = rng.choice(NOBILITY_PARTICLES)
+            if roll < 0.65:
+                particle = particle.capitalize()
+            sep = "" if particle.endswith(("'", "-")) else " "
+            name = particle + sep + surname
+            pool.append(name.replace("'", "’") if roll > 0.95 else name)
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def time_keys(func, names, runs, setup=None):
+    times = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for name in names:
+            func(name)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=100000, help="last names to sort")
+    parser.add_argument("--distinct", type=int, default=20000,
+                        help="distinct last names among them")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per variant")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    names = make_names(args.names, random.Random(args.seed), args.distinct)
+    compiled = get_last_name_sort_key.__wrapped__
+    mismatches = [n for n in set(names) if compiled(n) != reference_sort_key(n)]
+    for name in mismatches[:10]:
+        print(f"mismatch: {name!r} {compiled(name)!r} != {reference_sort_key(name)!r}",
+              file=sys.stderr)
+
+    rows = [
+        ("particle loop", time_keys(reference_sort_key, names, args.runs)),
+        ("compiled", time_keys(compiled, names, args.runs)),
+        ("compiled, cold cache", time_keys(get_last_name_sort_key, names, args.runs,
+                                           setup=get_last_name_sort_key.cache_clear)),
+        ("compiled, warm cache", time_keys(get_last_name_sort_key, names, args.runs)),
+    ]
+    baseline = rows[0][1]
+    for label, median_ms in rows:
+        print(f"{label:<24}{len(names):>8}  {median_ms:>10.2f} ms  x{baseline / median_ms:.1f}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
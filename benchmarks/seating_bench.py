@@ -0,0 +1,241 @@
+"""Seating benchmark: times the seating service on synthetic events.
+
+Builds events of 10 to 2,000 attending guests (tables of every shape, some
+locked seats, a skewed gender ratio) in a throwaway database and times
+auto_assign and shuffle_seating in every mode, serialize_seating_plan and
+the alternating placer's per-table pattern, counting the SQL statements
+each call issues.
+
+    python -m benchmarks.seating_bench --output results.json
+    python -m benchmarks.seating_bench --compare results.json
+
+With --compare, rows whose median time grew by more than --threshold are
+reported and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timezone
+
+from sqlalchemy import event as sa_event
+
+from rsvp_manager import create_app
+from rsvp_manager.config import TestConfig
+from rsvp_manager.extensions import db
+from rsvp_manager.models import (
+    User, Event, Guest, Invitation, SeatingTable, SeatAssignment, TABLE_SHAPES,
+)
+from rsvp_manager.services import seating_engine, seating_service
+
+
+DEFAULT_SIZES = (10, 50, 200, 500, 2000)
+SHAPE_CAPACITIES = {"rectangular": 8, "round": 10, "long": 16, "large_rect": 12}
+
+
+class BenchConfig(TestConfig):
+    TESTING = False
+
+
+class QueryCounter:
+    """Count SQL statements sent through the engine while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _before_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        sa_event.listen(self.engine, "before_cursor_execute", self._before_execute)
+        return self
+
+    def __exit__(self, *exc):
+        sa_event.remove(self.engine, "before_cursor_execute", self._before_execute)
+
+
+def build_event(user_id, n_guests, rng, male_share=0.62, locked_share=0.1):
+    """Create an event with n_guests attending guests and enough tables of
+    every shape for all of them, seating and locking a share of them."""
+    event = Event(user_id=user_id, name=f"Bench {n_guests}", event_type="Dinner",
+                  date=date(2026, 6, 15), date_created=date.today())
+    db.session.add(event)
+    db.session.flush()
+
+    n_male = round(n_guests * male_share)
+    guests = [Guest(user_id=user_id, first_name=f"G{i}", last_name=f"Bench{i:05d}",
+                    gender="Male" if i < n_male else "Female", date_created=datetime.now())
+              for i in range(n_guests)]
+    db.session.add_all(guests)
+    db.session.flush()
+    invitations = [Invitation(event_id=event.id, guest_id=g.id, status="Attending",
+                              date_invited=date.today()) for g in guests]
+    db.session.add_all(invitations)
+
+    tables, seats = [], 0
+    while seats < n_guests * 1.1:
+        shape = TABLE_SHAPES[len(tables) % len(TABLE_SHAPES)]
+        tables.append(SeatingTable(event_id=event.id, table_number=len(tables) + 1,
+                                   shape=shape, capacity=SHAPE_CAPACITIES[shape]))
+        seats += SHAPE_CAPACITIES[shape]
+    db.session.add_all(tables)
+    db.session.flush()
+
+    free = [(t.id, pos) for t in tables for pos in range(1, t.capacity + 1)]
+    rng.shuffle(free)
+    for inv in rng.sample(invitations, int(n_guests * locked_share)):
+        table_id, pos = free.pop()
+        db.session.add(SeatAssignment(table_id=table_id, invitation_id=inv.id,
+                                      seat_position=pos, is_locked=True))
+    db.session.commit()
+    return event
+
+
+def measure(name, fn, counter, runs, setup=None, **labels):
+    """Run fn ``runs`` times (setup untimed before each) and summarise."""
+    times, queries = [], []
+    for run in range(runs):
+        if setup:
+            setup()
+        db.session.expire_all()
+        with counter:
+            start = time.perf_counter()
+            fn(run)
+            times.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+    return {
+        "name": name, **labels, "runs": runs,
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+        "queries": max(queries),
+    }
+
+
+def bench_event(event, counter, runs, time_budget_ms):
+    labels = {"guests": len(event.invitations), "tables": len(event.seating_tables)}
+    results = []
+
+    def unseat():
+        seating_service.clear_all_seating(event)
+
+    for mode in seating_service.SEATING_MODES:
+        results.append(measure(
+            "auto_assign", lambda run, mode=mode: seating_service.auto_assign(
+                event, mode=mode, time_budget_ms=time_budget_ms, seed=run),
+            counter, runs, setup=unseat, mode=mode, **labels))
+    for mode in seating_service.SEATING_MODES:
+        results.append(measure(
+            "shuffle_seating", lambda run, mode=mode: seating_service.shuffle_seating(
+                event, mode=mode, time_budget_ms=time_budget_ms, seed=run),
+            counter, runs, mode=mode, **labels))
+    results.append(measure(
+        "serialize_seating_plan", lambda run: seating_service.serialize_seating_plan(event),
+        counter, runs, **labels))
+
+    # Pattern for each table with only its locked seats taken
+    unseat()
+    snapshot = seating_service._build_snapshot(
+        seating_service.get_seating_plan(event), [], event.seating_venue_mode
+    )
+    n_male = sum(1 for inv in event.invitations if inv.guest.gender == "Male")
+    n_female = labels["guests"] - n_male
+
+    def ideal_patterns(run):
+        for _, shape, capacity, seat_map in snapshot["tables"]:
+            seating_engine._ideal_pattern(seat_map, capacity, shape == "round", n_male, n_female)
+
+    results.append(measure("ideal_pattern", ideal_patterns, counter, runs, **labels))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def row_key(row):
+    return (row["name"], row.get("mode"), row["guests"])
+
+
+def compare(results, baseline_path, threshold):
+    """Print median changes against a saved run; return the regressed rows."""
+    with open(baseline_path) as f:
+        baseline = {row_key(row): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in results:
+        old = baseline.get(row_key(row))
+        if not old or not old["median_ms"]:
+            continue
+        ratio = row["median_ms"] / old["median_ms"]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(row)
+            flag = "  REGRESSION"
+        print(f"{row['name']:<24}{row.get('mode') or '':<12}{row['guests']:>6}  "
+              f"{old['median_ms']:>10.2f} → {row['median_ms']:>10.2f} ms  x{ratio:.2f}  "
+              f"queries {old['queries']} → {row['queries']}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="guest counts to benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-budget-ms", type=int,
+                        default=seating_engine.DEFAULT_TIME_BUDGET_MS)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    app = create_app(BenchConfig)
+    results = []
+    with app.app_context():
+        db.create_all()
+        user = User(email="bench@example.com", password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+        counter = QueryCounter(db.engine)
+        rng = random.Random(args.seed)
+        for size in args.sizes:
+            event = build_event(user.id, size, rng)
+            for row in bench_event(event, counter, args.runs, args.time_budget_ms):
+                results.append(row)
+                print(f"{row['name']:<24}{row.get('mode') or '':<12}{row['guests']:>6}  "
+                      f"{row['median_ms']:>10.2f} ms  {row['queries']:>6} queries",
+                      file=sys.stderr)
+        db.session.remove()
+        db.drop_all()
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+        "seed": args.seed,
+        "time_budget_ms": args.time_budget_ms,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
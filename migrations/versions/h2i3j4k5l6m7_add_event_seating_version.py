@@ -0,0 +1,24 @@
+"""add seating_version to event
+
+Revision ID: h2i3j4k5l6m7
+Revises: g1h2i3j4k5l6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'h2i3j4k5l6m7'
+down_revision = 'g1h2i3j4k5l6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seating_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_column('seating_version')
@@ -0,0 +1,24 @@
+"""add seating_venue_mode to event
+
+Revision ID: i3j4k5l6m7n8
+Revises: h2i3j4k5l6m7
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'i3j4k5l6m7n8'
+down_revision = 'h2i3j4k5l6m7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seating_venue_mode', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_column('seating_venue_mode')
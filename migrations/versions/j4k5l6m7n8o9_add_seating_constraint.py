@@ -0,0 +1,46 @@
+"""add seating_constraint table
+
+Revision ID: j4k5l6m7n8o9
+Revises: i3j4k5l6m7n8
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'j4k5l6m7n8o9'
+down_revision = 'i3j4k5l6m7n8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('seating_constraint',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=True),
+    sa.Column('invitation_a_id', sa.Integer(), nullable=True),
+    sa.Column('invitation_b_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ),
+    sa.ForeignKeyConstraint(['invitation_a_id'], ['invitation.id'], ),
+    sa.ForeignKeyConstraint(['invitation_b_id'], ['invitation.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('seating_constraint', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_seating_constraint_event_id'), ['event_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_seating_constraint_tag_id'), ['tag_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_seating_constraint_invitation_a_id'), ['invitation_a_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_seating_constraint_invitation_b_id'), ['invitation_b_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('seating_constraint', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_seating_constraint_invitation_b_id'))
+        batch_op.drop_index(batch_op.f('ix_seating_constraint_invitation_a_id'))
+        batch_op.drop_index(batch_op.f('ix_seating_constraint_tag_id'))
+        batch_op.drop_index(batch_op.f('ix_seating_constraint_event_id'))
+
+    op.drop_table('seating_constraint')
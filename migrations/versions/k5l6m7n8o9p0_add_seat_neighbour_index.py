@@ -0,0 +1,62 @@
+"""add seat_neighbour index of guests seated side by side
+
+Revision ID: k5l6m7n8o9p0
+Revises: j4k5l6m7n8o9
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'k5l6m7n8o9p0'
+down_revision = 'j4k5l6m7n8o9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('seat_neighbour',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=False),
+    sa.Column('guest_a_id', sa.Integer(), nullable=False),
+    sa.Column('guest_b_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['guest_a_id'], ['guest.id'], ),
+    sa.ForeignKeyConstraint(['guest_b_id'], ['guest.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('seat_neighbour', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_seat_neighbour_event_id'), ['event_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_seat_neighbour_guest_b_id'), ['guest_b_id'], unique=False)
+        batch_op.create_index('ix_seat_neighbour_owner_pair', ['user_id', 'guest_a_id', 'guest_b_id'], unique=False)
+
+    # Backfill from existing plans: seats n and n+1 are neighbours, and round
+    # tables of three or more also close the ring from the last seat to seat 1.
+    op.execute("""
+        INSERT INTO seat_neighbour (user_id, event_id, table_id, guest_a_id, guest_b_id)
+        SELECT e.user_id, e.id, t.id,
+               CASE WHEN ia.guest_id < ib.guest_id THEN ia.guest_id ELSE ib.guest_id END,
+               CASE WHEN ia.guest_id < ib.guest_id THEN ib.guest_id ELSE ia.guest_id END
+        FROM seat_assignment a
+        JOIN seat_assignment b ON b.table_id = a.table_id
+        JOIN seating_table t ON t.id = a.table_id
+        JOIN event e ON e.id = t.event_id
+        JOIN invitation ia ON ia.id = a.invitation_id
+        JOIN invitation ib ON ib.id = b.invitation_id
+        WHERE ia.guest_id <> ib.guest_id
+          AND (b.seat_position = a.seat_position + 1
+               OR (t.shape = 'round' AND t.capacity > 2
+                   AND a.seat_position = t.capacity AND b.seat_position = 1))
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('seat_neighbour', schema=None) as batch_op:
+        batch_op.drop_index('ix_seat_neighbour_owner_pair')
+        batch_op.drop_index(batch_op.f('ix_seat_neighbour_guest_b_id'))
+        batch_op.drop_index(batch_op.f('ix_seat_neighbour_event_id'))
+
+    op.drop_table('seat_neighbour')
@@ -0,0 +1,40 @@
+"""add seating_revision history of seating plans
+
+Revision ID: l6m7n8o9p0q1
+Revises: k5l6m7n8o9p0
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'l6m7n8o9p0q1'
+down_revision = 'k5l6m7n8o9p0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('seating_revision',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('number', sa.Integer(), nullable=False),
+    sa.Column('is_keyframe', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('undone', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('data', sa.Text(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'number', name='uq_seating_revision_number')
+    )
+    with op.batch_alter_table('seating_revision', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_seating_revision_event_id'), ['event_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('seating_revision', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_seating_revision_event_id'))
+
+    op.drop_table('seating_revision')
@@ -0,0 +1,47 @@
+"""add seating_job table for background seating runs
+
+Revision ID: m7n8o9p0q1r2
+Revises: l6m7n8o9p0q1
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'm7n8o9p0q1r2'
+down_revision = 'l6m7n8o9p0q1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('seating_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('mode', sa.String(length=20), nullable=False),
+    sa.Column('time_budget_ms', sa.Integer(), nullable=False),
+    sa.Column('restarts', sa.Integer(), nullable=False),
+    sa.Column('seed', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('completed', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=True),
+    sa.Column('error', sa.String(length=200), nullable=True),
+    sa.Column('cancel_requested', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('seating_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_seating_job_event_id'), ['event_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('seating_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_seating_job_event_id'))
+
+    op.drop_table('seating_job')
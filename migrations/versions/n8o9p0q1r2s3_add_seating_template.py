@@ -0,0 +1,54 @@
+"""add seating_template and seating_template_table tables
+
+Revision ID: n8o9p0q1r2s3
+Revises: m7n8o9p0q1r2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'n8o9p0q1r2s3'
+down_revision = 'm7n8o9p0q1r2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('seating_template',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('venue_mode', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('seating_template', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_seating_template_user_id'), ['user_id'], unique=False)
+
+    op.create_table('seating_template_table',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('table_number', sa.Integer(), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=True),
+    sa.Column('shape', sa.String(length=20), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('rotation', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('locked_seats', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['seating_template.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('seating_template_table', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_seating_template_table_template_id'), ['template_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('seating_template_table', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_seating_template_table_template_id'))
+
+    op.drop_table('seating_template_table')
+    with op.batch_alter_table('seating_template', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_seating_template_user_id'))
+
+    op.drop_table('seating_template')
@@ -0,0 +1,28 @@
+"""add seating_seed, seating_seed_mode and seating_seed_restarts to event
+
+Revision ID: o9p0q1r2s3t4
+Revises: n8o9p0q1r2s3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'o9p0q1r2s3t4'
+down_revision = 'n8o9p0q1r2s3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seating_seed', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('seating_seed_mode', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('seating_seed_restarts', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_column('seating_seed_restarts')
+        batch_op.drop_column('seating_seed_mode')
+        batch_op.drop_column('seating_seed')
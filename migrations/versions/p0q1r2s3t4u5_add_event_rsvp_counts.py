@@ -0,0 +1,45 @@
+"""add RSVP counters to event
+
+Revision ID: p0q1r2s3t4u5
+Revises: o9p0q1r2s3t4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'p0q1r2s3t4u5'
+down_revision = 'o9p0q1r2s3t4'
+branch_labels = None
+depends_on = None
+
+COUNTS = {
+    'invited_count': None,
+    'not_sent_count': 'Not Sent',
+    'pending_count': 'Pending',
+    'attending_count': 'Attending',
+    'declined_count': 'Declined',
+}
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        for column in COUNTS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    # Backfill: invitations of guests that are not in the trash
+    for column, status in COUNTS.items():
+        status_filter = f"AND i.status = '{status}'" if status else ""
+        op.execute(f"""
+            UPDATE event SET {column} = (
+                SELECT COUNT(*) FROM invitation i
+                JOIN guest g ON g.id = i.guest_id
+                WHERE i.event_id = event.id AND g.deleted_at IS NULL {status_filter}
+            )
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        for column in reversed(list(COUNTS)):
+            batch_op.drop_column(column)
@@ -0,0 +1,64 @@
+"""add persisted name sort keys to guest
+
+Revision ID: q1r2s3t4u5v6
+Revises: p0q1r2s3t4u5
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from rsvp_manager.utils import get_last_name_sort_key
+
+revision = 'q1r2s3t4u5v6'
+down_revision = 'p0q1r2s3t4u5'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+# Byte-wise collation so SQL order matches the Python sort it replaces
+SORT_KEY_TYPE = sa.String(length=200).with_variant(sa.String(length=200, collation='C'), 'postgresql')
+
+
+def upgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_name_sort_key', SORT_KEY_TYPE, server_default='', nullable=False))
+        batch_op.add_column(sa.Column('first_name_lower', SORT_KEY_TYPE, server_default='', nullable=False))
+
+    # Backfill in Python: the particle-skipping key has no SQL equivalent
+    conn = op.get_bind()
+    guest = sa.table(
+        'guest', sa.column('id', sa.Integer), sa.column('first_name', sa.String),
+        sa.column('last_name', sa.String), sa.column('last_name_sort_key', sa.String),
+        sa.column('first_name_lower', sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(guest.c.id, guest.c.first_name, guest.c.last_name)
+            .where(guest.c.id > last_id).order_by(guest.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            guest.update().where(guest.c.id == sa.bindparam('guest_id')).values(
+                last_name_sort_key=sa.bindparam('sort_key'),
+                first_name_lower=sa.bindparam('first_lower'),
+            ),
+            [
+                {'guest_id': r.id, 'sort_key': get_last_name_sort_key(r.last_name),
+                 'first_lower': (r.first_name or '').lower()}
+                for r in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.create_index('ix_guest_user_name_sort', ['user_id', 'last_name_sort_key', 'first_name_lower', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.drop_index('ix_guest_user_name_sort')
+        batch_op.drop_column('first_name_lower')
+        batch_op.drop_column('last_name_sort_key')
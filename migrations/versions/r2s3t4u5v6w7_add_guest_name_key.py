@@ -0,0 +1,54 @@
+"""add normalized name key to guest
+
+Revision ID: r2s3t4u5v6w7
+Revises: q1r2s3t4u5v6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from rsvp_manager.utils import get_name_key
+
+revision = 'r2s3t4u5v6w7'
+down_revision = 'q1r2s3t4u5v6'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_key', sa.Text(), server_default='|', nullable=False))
+
+    # Backfill in Python: accent stripping uses Unicode decomposition
+    conn = op.get_bind()
+    guest = sa.table(
+        'guest', sa.column('id', sa.Integer), sa.column('first_name', sa.String),
+        sa.column('last_name', sa.String), sa.column('name_key', sa.Text),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(guest.c.id, guest.c.first_name, guest.c.last_name)
+            .where(guest.c.id > last_id).order_by(guest.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            guest.update().where(guest.c.id == sa.bindparam('guest_id')).values(
+                name_key=sa.bindparam('key'),
+            ),
+            [{'guest_id': r.id, 'key': get_name_key(r.first_name, r.last_name)} for r in rows],
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.create_index('ix_guest_user_name_key', ['user_id', 'name_key'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.drop_index('ix_guest_user_name_key')
+        batch_op.drop_column('name_key')
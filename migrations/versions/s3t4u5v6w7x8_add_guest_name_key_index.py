@@ -0,0 +1,24 @@
+"""index guest name key across hosts
+
+Revision ID: s3t4u5v6w7x8
+Revises: r2s3t4u5v6w7
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = 's3t4u5v6w7x8'
+down_revision = 'r2s3t4u5v6w7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.create_index('ix_guest_name_key', ['name_key'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('guest', schema=None) as batch_op:
+        batch_op.drop_index('ix_guest_name_key')
@@ -67,6 +67,9 @@ def create_app(config_class=Config):
     app.register_blueprint(api_bp)
     csrf.exempt(api_bp)
 
+    from rsvp_manager.commands import register_commands
+    register_commands(app)
+
     # Flask-Admin (database browser)
     from flask_admin import Admin
     from rsvp_manager.admin_views import (
@@ -87,7 +90,7 @@ def create_app(config_class=Config):
     flask_admin.add_view(EventCohostView(EventCohost, db.session, name="Co-hosts", endpoint="admin_cohosts"))
     flask_admin.add_view(ActivityLogView(ActivityLog, db.session, name="Activity Log", endpoint="admin_activity"))
 
-    ASSET_VERSION = "74"
+    ASSET_VERSION = "79"
 
     @app.context_processor
     def inject_globals():
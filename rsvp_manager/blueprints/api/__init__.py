@@ -47,8 +47,15 @@ def get_api_user():
 
 # -- Serializers ---------------------------------------------------------------
 
+def serialize_keyset_page(page, serialize):
+    return {
+        "items": [serialize(item) for item in page.items],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
+
+
 def serialize_event(event):
-    attending = sum(1 for inv in event.invitations if inv.status == "Attending")
     return {
         "id": event.id,
         "name": event.name,
@@ -57,31 +64,42 @@ def serialize_event(event):
         "date": event.date.isoformat(),
         "date_created": event.date_created.isoformat() if event.date_created else None,
         "notes": event.notes or "",
-        "invitation_count": len(event.invitations),
-        "attending_count": attending,
+        "invitation_count": event.invited_count,
+        "attending_count": event.attending_count,
     }
 
 
-def serialize_friend(guest, viewer_user_id=None):
-    # Single pass through invitations for counting and building list
+def serialize_friend(guest, viewer_user_id=None, summary=None):
+    """Serialize a guest with its invitation summary and per-event list.
+
+    Given ``summary`` (status counts from get_invitation_summaries), the
+    counts come from it and the per-event "invitations" list is left out,
+    so the guest's invitations are never loaded.
+    """
     attending = pending = declined = 0
     invitations = []
-    for inv in guest.invitations:
-        if inv.status == "Attending":
-            attending += 1
-        elif inv.status == "Pending":
-            pending += 1
-        elif inv.status == "Declined":
-            declined += 1
-        if inv.status != "Not Sent":
-            invitations.append({
-                "event_name": inv.event.name,
-                "event_date": inv.event.date.strftime("%d/%m/%Y") if inv.event.date else "",
-                "status": inv.status,
-            })
+    if summary is not None:
+        attending = summary.get("Attending", 0)
+        pending = summary.get("Pending", 0)
+        declined = summary.get("Declined", 0)
+    else:
+        # Single pass through invitations for counting and building list
+        for inv in guest.invitations:
+            if inv.status == "Attending":
+                attending += 1
+            elif inv.status == "Pending":
+                pending += 1
+            elif inv.status == "Declined":
+                declined += 1
+            if inv.status != "Not Sent":
+                invitations.append({
+                    "event_name": inv.event.name,
+                    "event_date": inv.event.date.strftime("%d/%m/%Y") if inv.event.date else "",
+                    "status": inv.status,
+                })
     invited = attending + pending + declined
     # Add shared invitations (co-host's guest with same name in shared events)
-    if viewer_user_id and viewer_user_id == guest.user_id:
+    if viewer_user_id and viewer_user_id == guest.user_id and summary is None:
         from rsvp_manager.services.friend_service import get_shared_invitations
         shared = get_shared_invitations(guest, viewer_user_id)
         invitations.extend(shared)
@@ -95,7 +113,7 @@ def serialize_friend(guest, viewer_user_id=None):
                 declined += 1
         invited = attending + pending + declined
     owner_name = guest.user.full_name if guest.user else ""
-    return {
+    data = {
         "id": guest.id,
         "user_id": guest.user_id,
         "owner_name": owner_name,
@@ -116,8 +134,10 @@ def serialize_friend(guest, viewer_user_id=None):
             "pending": pending,
             "declined": declined,
         },
-        "invitations": invitations,
     }
+    if summary is None:
+        data["invitations"] = invitations
+    return data
 
 
 def serialize_invitation(inv):
@@ -1,7 +1,7 @@
 from flask import request
 from rsvp_manager.blueprints.api import (
     api_bp, api_success, api_error, api_auth_required, get_api_user,
-    serialize_event, serialize_invitation_brief,
+    serialize_event, serialize_invitation_brief, serialize_keyset_page,
 )
 from rsvp_manager.services import event_service
 
@@ -9,8 +9,18 @@ from rsvp_manager.services import event_service
 @api_bp.route("/events", methods=["GET"])
 @api_auth_required
 def list_events():
+    """Page through events, newest first: ?page=N for numbered pages, or
+    ?cursor= (empty for the first page) for cursor pages."""
     page = request.args.get("page", 1, type=int)
     search = request.args.get("q", "").strip()
+    if "cursor" in request.args:
+        try:
+            result = event_service.get_user_events_page(
+                get_api_user().id, cursor=request.args["cursor"] or None, search=search,
+            )
+        except ValueError as e:
+            return api_error(str(e))
+        return api_success(serialize_keyset_page(result, serialize_event))
     pagination = event_service.get_user_events(get_api_user().id, page=page, search=search)
     return api_success({
         "items": [serialize_event(e) for e in pagination.items],
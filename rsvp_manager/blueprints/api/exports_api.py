@@ -1,7 +1,7 @@
 from rsvp_manager.blueprints.api import api_bp, api_auth_required, get_api_user
 from rsvp_manager.models import Event, Guest
 from rsvp_manager.services import export_service, event_service
-from rsvp_manager.utils import get_last_name_sort_key
+from rsvp_manager.services.friend_service import GUEST_NAME_ORDER
 
 
 @api_bp.route("/events/export", methods=["GET"])
@@ -25,6 +25,5 @@ def export_event_guests(event_id):
 def export_friends():
     guests = Guest.query.filter_by(user_id=get_api_user().id).filter(
         Guest.deleted_at.is_(None)
-    ).all()
-    guests.sort(key=lambda g: (get_last_name_sort_key(g.last_name), g.first_name.lower()))
+    ).order_by(*GUEST_NAME_ORDER).all()
     return export_service.export_guests_xlsx(guests)
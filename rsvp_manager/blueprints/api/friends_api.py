@@ -1,21 +1,50 @@
 from flask import request
 from rsvp_manager.blueprints.api import (
     api_bp, api_success, api_error, api_auth_required, get_api_user,
-    serialize_friend,
+    serialize_friend, serialize_keyset_page,
 )
 from rsvp_manager.extensions import limiter
 from rsvp_manager.services import friend_service
 
 
+def _friend_serializer(guests, include_invitations):
+    """serialize_friend for a page of guests, counting their invitations
+    with one GROUP BY unless the full lists were loaded."""
+    if include_invitations:
+        return serialize_friend
+    summaries = friend_service.get_invitation_summaries([g.id for g in guests])
+    return lambda g: serialize_friend(g, summary=summaries.get(g.id, {}))
+
+
 @api_bp.route("/friends", methods=["GET"])
 @api_auth_required
 def list_friends():
+    """Page through friends sorted by name: ?page=N for numbered pages, or
+    ?cursor= (empty for the first page) for cursor pages.
+
+    Each friend carries its invitation_summary; ?include=invitations adds
+    the per-event "invitations" list as well.
+    """
     page = request.args.get("page", 1, type=int)
     show_archived = request.args.get("show_archived", "0")
     search = request.args.get("q", "").strip()
-    pagination = friend_service.get_user_guests(get_api_user().id, page=page, show_archived=show_archived, search=search)
+    include_invitations = "invitations" in request.args.get("include", "").split(",")
+    if "cursor" in request.args:
+        try:
+            result = friend_service.get_user_guests_page(
+                get_api_user().id, cursor=request.args["cursor"] or None,
+                show_archived=show_archived, search=search, include_invitations=include_invitations,
+            )
+        except ValueError as e:
+            return api_error(str(e))
+        return api_success(serialize_keyset_page(result, _friend_serializer(result.items, include_invitations)))
+    pagination = friend_service.get_user_guests(
+        get_api_user().id, page=page, show_archived=show_archived, search=search,
+        include_invitations=include_invitations,
+    )
+    serialize = _friend_serializer(pagination.items, include_invitations)
     return api_success({
-        "items": [serialize_friend(g) for g in pagination.items],
+        "items": [serialize(g) for g in pagination.items],
         "page": pagination.page,
         "pages": pagination.pages,
         "total": pagination.total,
@@ -45,16 +74,13 @@ def get_friend(guest_id):
         Event.user_id == user_id
     ).first()
     if shared_as_cohost or shared_as_owner:
-        from rsvp_manager.services.friend_service import _normalize_name
         data = serialize_friend(guest)
         # Check if viewer has a friend with the same name
-        norm_first = _normalize_name(guest.first_name)
-        norm_last = _normalize_name(guest.last_name)
-        my_guests = Guest.query.filter_by(user_id=user_id).filter(Guest.deleted_at.is_(None)).all()
-        data["name_match_in_my_friends"] = any(
-            _normalize_name(g.first_name) == norm_first and _normalize_name(g.last_name) == norm_last
-            for g in my_guests
-        )
+        data["name_match_in_my_friends"] = _db.session.query(Guest.id).filter(
+            Guest.user_id == user_id,
+            Guest.deleted_at.is_(None),
+            Guest.name_key == guest.name_key,
+        ).first() is not None
         return api_success(data)
     return api_error("Access denied", "FORBIDDEN", 403)
 
@@ -1,8 +1,10 @@
-from flask import request
+from flask import request, make_response
 from rsvp_manager.blueprints.api import api_bp, api_success, api_error, api_auth_required, get_api_user
-from rsvp_manager.services import seating_service
+from rsvp_manager.services import (
+    seating_engine, seating_job_service, seating_service, seating_template_service,
+)
 from rsvp_manager.services.cohost_service import require_event_access
-from rsvp_manager.models import SeatingTable
+from rsvp_manager.models import SeatingTable, SeatingConstraint
 
 
 def _get_event_for_seating(event_id, min_role="viewer"):
@@ -11,11 +13,55 @@ def _get_event_for_seating(event_id, min_role="viewer"):
     return event, user
 
 
+def _auto_assign_options(data):
+    """Read mode and optimizer options from an auto-assign payload."""
+    options = {"mode": data.get("mode", "random")}
+    budget = data.get("time_budget_ms")
+    if budget is not None:
+        if isinstance(budget, bool) or not isinstance(budget, int) or budget < 1:
+            raise ValueError("time_budget_ms must be a positive integer")
+        options["time_budget_ms"] = budget
+    restarts = data.get("restarts")
+    if restarts is not None:
+        if (isinstance(restarts, bool) or not isinstance(restarts, int)
+                or not 1 <= restarts <= seating_engine.MAX_RESTARTS):
+            raise ValueError(f"restarts must be between 1 and {seating_engine.MAX_RESTARTS}")
+        options["restarts"] = restarts
+    seed = data.get("seed")
+    if seed is not None:
+        if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+            raise ValueError("seed must be a non-negative integer")
+        options["seed"] = seed
+    return options
+
+
+def _seat_map_for_response(event, data):
+    """Snapshot the seats before a change when the client asked for a delta
+    response ({"response": "delta"}); None means reply with the full plan."""
+    mode = data.get("response", "plan")
+    if mode not in ("plan", "delta"):
+        raise ValueError("response must be 'plan' or 'delta'")
+    return seating_service.get_seat_map(event) if mode == "delta" else None
+
+
+def _plan_response(event, before):
+    if before is None:
+        return api_success(seating_service.serialize_seating_plan(event))
+    return api_success(seating_service.serialize_seating_delta(event, before))
+
+
 @api_bp.route("/events/<int:event_id>/seating", methods=["GET"])
 @api_auth_required
 def get_seating_plan(event_id):
     event, _ = _get_event_for_seating(event_id, min_role="viewer")
-    return api_success(seating_service.serialize_seating_plan(event))
+    etag = seating_service.seating_plan_etag(event)
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        response, _ = api_success(seating_service.serialize_seating_plan(event))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 @api_bp.route("/events/<int:event_id>/seating/tables", methods=["POST"])
@@ -36,6 +82,36 @@ def create_seating_table(event_id):
     return api_success(seating_service._serialize_table(table), status_code=201)
 
 
+@api_bp.route("/events/<int:event_id>/seating/tables/auto-layout", methods=["POST"])
+@api_auth_required
+def auto_layout_tables(event_id):
+    """Add the fewest tables that seat every unseated attending guest.
+
+    Optional "table_types": [{"shape", "capacity"}] limits the tables used;
+    "dry_run": true returns the plan without creating anything.
+    """
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    data = request.get_json() or {}
+    table_types = data.get("table_types")
+    try:
+        if table_types is not None:
+            if not isinstance(table_types, list) or not all(
+                isinstance(t, dict) and isinstance(t.get("capacity"), int) for t in table_types
+            ):
+                raise ValueError("table_types must be a list of {shape, capacity}")
+            table_types = [(t.get("shape", "rectangular"), t["capacity"]) for t in table_types]
+        layout = seating_service.plan_table_layout(event, table_types)
+        if data.get("dry_run"):
+            return api_success([{"shape": shape, "capacity": capacity, "guests": guests}
+                                for shape, capacity, guests in layout])
+        tables = seating_service.create_tables_bulk(
+            event, [(shape, capacity) for shape, capacity, _ in layout], acting_user_id=user.id
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success([seating_service._serialize_table(t) for t in tables], status_code=201)
+
+
 @api_bp.route("/events/<int:event_id>/seating/tables/<int:table_id>", methods=["PUT"])
 @api_auth_required
 def update_seating_table(event_id, table_id):
@@ -64,10 +140,7 @@ def rotate_seating_table(event_id, table_id):
     table = SeatingTable.query.filter_by(id=table_id, event_id=event.id).first()
     if not table:
         return api_error("Table not found", "NOT_FOUND", 404)
-    from rsvp_manager.extensions import db
-    table.rotation = ((table.rotation or 0) + 90) % 360
-    db.session.commit()
-    return api_success({"rotation": table.rotation})
+    return api_success({"rotation": seating_service.rotate_table(table)})
 
 
 @api_bp.route("/events/<int:event_id>/seating/tables/<int:table_id>", methods=["DELETE"])
@@ -81,6 +154,58 @@ def delete_seating_table(event_id, table_id):
     return "", 204
 
 
+@api_bp.route("/events/<int:event_id>/seating/venue-mode", methods=["POST"])
+@api_auth_required
+def set_seating_venue_mode(event_id):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    data = request.get_json() or {}
+    enabled = data.get("enabled")
+    if not isinstance(enabled, bool):
+        return api_error("enabled must be true or false")
+    try:
+        seating_service.set_venue_mode(event, enabled, acting_user_id=user.id)
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_service.serialize_seating_plan(event))
+
+
+@api_bp.route("/events/<int:event_id>/seating/constraints", methods=["GET"])
+@api_auth_required
+def list_seating_constraints(event_id):
+    event, _ = _get_event_for_seating(event_id, min_role="viewer")
+    return api_success([seating_service.serialize_constraint(c)
+                        for c in seating_service.get_constraints(event)])
+
+
+@api_bp.route("/events/<int:event_id>/seating/constraints", methods=["POST"])
+@api_auth_required
+def create_seating_constraint(event_id):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    data = request.get_json() or {}
+    try:
+        constraint = seating_service.create_constraint(
+            event,
+            kind=data.get("kind"),
+            tag_id=data.get("tag_id"),
+            invitation_ids=data.get("invitation_ids"),
+            acting_user_id=user.id,
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_service.serialize_constraint(constraint), status_code=201)
+
+
+@api_bp.route("/events/<int:event_id>/seating/constraints/<int:constraint_id>", methods=["DELETE"])
+@api_auth_required
+def delete_seating_constraint(event_id, constraint_id):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    constraint = SeatingConstraint.query.filter_by(id=constraint_id, event_id=event.id).first()
+    if not constraint:
+        return api_error("Constraint not found", "NOT_FOUND", 404)
+    seating_service.delete_constraint(constraint, acting_user_id=user.id)
+    return "", 204
+
+
 @api_bp.route("/events/<int:event_id>/seating/assign", methods=["POST"])
 @api_auth_required
 def assign_seat(event_id):
@@ -89,7 +214,7 @@ def assign_seat(event_id):
     if not data:
         return api_error("Request body must be JSON")
     try:
-        assignment = seating_service.assign_seat(
+        changes = seating_service.assign_seat(
             event,
             invitation_id=data["invitation_id"],
             table_id=data["table_id"],
@@ -98,7 +223,7 @@ def assign_seat(event_id):
         )
     except (ValueError, KeyError) as e:
         return api_error(str(e))
-    return api_success({"assignment_id": assignment.id})
+    return api_success(changes)
 
 
 @api_bp.route("/events/<int:event_id>/seating/swap", methods=["POST"])
@@ -109,7 +234,7 @@ def swap_seats(event_id):
     if not data:
         return api_error("Request body must be JSON")
     try:
-        seating_service.swap_seats(
+        changes = seating_service.swap_seats(
             event,
             assignment_id_a=data["assignment_id_a"],
             assignment_id_b=data["assignment_id_b"],
@@ -117,7 +242,26 @@ def swap_seats(event_id):
         )
     except (ValueError, KeyError) as e:
         return api_error(str(e))
-    return api_success()
+    return api_success(changes)
+
+
+@api_bp.route("/events/<int:event_id>/seating/batch", methods=["POST"])
+@api_auth_required
+def apply_seating_batch(event_id):
+    """Apply many assign/swap/unseat/lock operations in one transaction."""
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    data = request.get_json()
+    if not data:
+        return api_error("Request body must be JSON")
+    if not isinstance(data, dict):
+        return api_error("Request body must be a JSON object")
+    try:
+        changes = seating_service.apply_seating_batch(
+            event, data.get("operations"), acting_user_id=user.id
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(changes)
 
 
 @api_bp.route("/events/<int:event_id>/seating/assign/<int:assignment_id>", methods=["DELETE"])
@@ -125,10 +269,10 @@ def swap_seats(event_id):
 def unseat_guest(event_id, assignment_id):
     event, user = _get_event_for_seating(event_id, min_role="cohost")
     try:
-        seating_service.unseat_guest(event, assignment_id, acting_user_id=user.id)
+        changes = seating_service.unseat_guest(event, assignment_id, acting_user_id=user.id)
     except ValueError as e:
         return api_error(str(e))
-    return "", 204
+    return api_success(changes)
 
 
 @api_bp.route("/events/<int:event_id>/seating/assign/<int:assignment_id>/lock", methods=["POST"])
@@ -136,10 +280,10 @@ def unseat_guest(event_id, assignment_id):
 def toggle_seat_lock(event_id, assignment_id):
     event, user = _get_event_for_seating(event_id, min_role="cohost")
     try:
-        sa = seating_service.toggle_lock(event, assignment_id, acting_user_id=user.id)
+        changes = seating_service.toggle_lock(event, assignment_id, acting_user_id=user.id)
     except ValueError as e:
         return api_error(str(e))
-    return api_success({"is_locked": sa.is_locked})
+    return api_success(changes)
 
 
 @api_bp.route("/events/<int:event_id>/seating/tables/<int:table_id>/lock", methods=["POST"])
@@ -149,10 +293,10 @@ def lock_table(event_id, table_id):
     data = request.get_json() or {}
     lock = data.get("lock", True)
     try:
-        seating_service.lock_table(event, table_id, lock=lock, acting_user_id=user.id)
+        changes = seating_service.lock_table(event, table_id, lock=lock, acting_user_id=user.id)
     except ValueError as e:
         return api_error(str(e))
-    return api_success()
+    return api_success(changes)
 
 
 @api_bp.route("/events/<int:event_id>/seating/smart-assign", methods=["POST"])
@@ -161,16 +305,17 @@ def smart_assign_seating(event_id):
     """Auto-detect: if unseated guests exist, assign them. If all seated, shuffle unlocked."""
     event, user = _get_event_for_seating(event_id, min_role="cohost")
     data = request.get_json() or {}
-    mode = data.get("mode", "random")
     unseated = seating_service.get_unseated_attending(event)
     try:
+        options = _auto_assign_options(data)
+        before = _seat_map_for_response(event, data)
         if unseated:
-            seating_service.auto_assign(event, mode=mode, acting_user_id=user.id)
+            seating_service.auto_assign(event, acting_user_id=user.id, **options)
         else:
-            seating_service.shuffle_seating(event, mode=mode, acting_user_id=user.id)
+            seating_service.shuffle_seating(event, acting_user_id=user.id, **options)
     except ValueError as e:
         return api_error(str(e))
-    return api_success(seating_service.serialize_seating_plan(event))
+    return _plan_response(event, before)
 
 
 @api_bp.route("/events/<int:event_id>/seating/auto-assign", methods=["POST"])
@@ -178,12 +323,13 @@ def smart_assign_seating(event_id):
 def auto_assign_seating(event_id):
     event, user = _get_event_for_seating(event_id, min_role="cohost")
     data = request.get_json() or {}
-    mode = data.get("mode", "random")
     try:
-        seating_service.auto_assign(event, mode=mode, acting_user_id=user.id)
+        options = _auto_assign_options(data)
+        before = _seat_map_for_response(event, data)
+        seating_service.auto_assign(event, acting_user_id=user.id, **options)
     except ValueError as e:
         return api_error(str(e))
-    return api_success(seating_service.serialize_seating_plan(event))
+    return _plan_response(event, before)
 
 
 @api_bp.route("/events/<int:event_id>/seating/shuffle", methods=["POST"])
@@ -191,12 +337,13 @@ def auto_assign_seating(event_id):
 def shuffle_seating(event_id):
     event, user = _get_event_for_seating(event_id, min_role="cohost")
     data = request.get_json() or {}
-    mode = data.get("mode", "random")
     try:
-        seating_service.shuffle_seating(event, mode=mode, acting_user_id=user.id)
+        options = _auto_assign_options(data)
+        before = _seat_map_for_response(event, data)
+        seating_service.shuffle_seating(event, acting_user_id=user.id, **options)
     except ValueError as e:
         return api_error(str(e))
-    return api_success(seating_service.serialize_seating_plan(event))
+    return _plan_response(event, before)
 
 
 @api_bp.route("/events/<int:event_id>/seating/clear", methods=["POST"])
@@ -220,3 +367,150 @@ def clear_table(event_id, table_id):
     include_locked = data.get("include_locked", False)
     seating_service.clear_table_seats(table, include_locked=include_locked, acting_user_id=user.id)
     return api_success()
+
+
+@api_bp.route("/events/<int:event_id>/seating/revisions", methods=["GET"])
+@api_auth_required
+def list_seating_revisions(event_id):
+    event, _ = _get_event_for_seating(event_id, min_role="viewer")
+    revisions = seating_service.get_seating_revisions(event)
+    live = [r for r in revisions if not r.undone]
+    return api_success({
+        "revisions": [seating_service.serialize_seating_revision(r) for r in revisions],
+        "can_undo": len(live) > 1,
+        "can_redo": len(live) < len(revisions),
+    })
+
+
+@api_bp.route("/events/<int:event_id>/seating/undo", methods=["POST"])
+@api_auth_required
+def undo_seating(event_id):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    try:
+        seating_service.undo_seating(event, acting_user_id=user.id)
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_service.serialize_seating_plan(event))
+
+
+@api_bp.route("/events/<int:event_id>/seating/redo", methods=["POST"])
+@api_auth_required
+def redo_seating(event_id):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    try:
+        seating_service.redo_seating(event, acting_user_id=user.id)
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_service.serialize_seating_plan(event))
+
+
+@api_bp.route("/events/<int:event_id>/seating/revisions/<int:number>/restore", methods=["POST"])
+@api_auth_required
+def restore_seating_revision(event_id, number):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    if seating_service.get_seating_revision(event, number) is None:
+        return api_error("Revision not found", "NOT_FOUND", 404)
+    seating_service.restore_seating_revision(event, number, acting_user_id=user.id)
+    return api_success(seating_service.serialize_seating_plan(event))
+
+
+@api_bp.route("/events/<int:event_id>/seating/jobs", methods=["GET"])
+@api_auth_required
+def list_seating_jobs(event_id):
+    event, _ = _get_event_for_seating(event_id, min_role="viewer")
+    return api_success([seating_job_service.serialize_job(j)
+                        for j in seating_job_service.get_jobs(event)])
+
+
+@api_bp.route("/events/<int:event_id>/seating/jobs", methods=["POST"])
+@api_auth_required
+def create_seating_job(event_id):
+    """Start an auto-assign or shuffle in the background. The kind defaults to
+    'smart': auto-assign when guests are unseated, shuffle otherwise."""
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    data = request.get_json() or {}
+    kind = data.get("kind", "smart")
+    if kind == "smart":
+        kind = "auto_assign" if seating_service.get_unseated_attending(event) else "shuffle"
+    try:
+        options = _auto_assign_options({"mode": "optimize", **data})
+        job = seating_job_service.submit_job(event, kind, acting_user_id=user.id, **options)
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_job_service.serialize_job(job), status_code=202)
+
+
+@api_bp.route("/events/<int:event_id>/seating/jobs/<int:job_id>", methods=["GET"])
+@api_auth_required
+def get_seating_job(event_id, job_id):
+    event, _ = _get_event_for_seating(event_id, min_role="viewer")
+    job = seating_job_service.get_job(event, job_id)
+    if not job:
+        return api_error("Job not found", "NOT_FOUND", 404)
+    return api_success(seating_job_service.serialize_job(job))
+
+
+@api_bp.route("/events/<int:event_id>/seating/jobs/<int:job_id>/cancel", methods=["POST"])
+@api_auth_required
+def cancel_seating_job(event_id, job_id):
+    event, _ = _get_event_for_seating(event_id, min_role="cohost")
+    job = seating_job_service.get_job(event, job_id)
+    if not job:
+        return api_error("Job not found", "NOT_FOUND", 404)
+    try:
+        seating_job_service.cancel_job(job)
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_job_service.serialize_job(job))
+
+
+@api_bp.route("/seating-templates", methods=["GET"])
+@api_auth_required
+def list_seating_templates():
+    templates = seating_template_service.get_templates(get_api_user().id)
+    return api_success([seating_template_service.serialize_template(t) for t in templates])
+
+
+@api_bp.route("/seating-templates/<int:template_id>", methods=["DELETE"])
+@api_auth_required
+def delete_seating_template(template_id):
+    template = seating_template_service.get_template(template_id, get_api_user().id)
+    if not template:
+        return api_error("Template not found", "NOT_FOUND", 404)
+    seating_template_service.delete_template(template)
+    return "", 204
+
+
+@api_bp.route("/events/<int:event_id>/seating/templates", methods=["POST"])
+@api_auth_required
+def save_seating_template(event_id):
+    # Cohost, as the template can keep the event's locked seats by guest
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    data = request.get_json() or {}
+    try:
+        template = seating_template_service.save_template(
+            event, user.id, data.get("name"),
+            include_locked=bool(data.get("include_locked", False)),
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success(seating_template_service.serialize_template(template), status_code=201)
+
+
+@api_bp.route("/events/<int:event_id>/seating/templates/<int:template_id>/apply", methods=["POST"])
+@api_auth_required
+def apply_seating_template(event_id, template_id):
+    event, user = _get_event_for_seating(event_id, min_role="cohost")
+    template = seating_template_service.get_template(template_id, user.id)
+    if not template:
+        return api_error("Template not found", "NOT_FOUND", 404)
+    data = request.get_json() or {}
+    try:
+        _, copied, skipped = seating_template_service.apply_template(
+            event, template, copy_locked=bool(data.get("copy_locked", False)),
+            acting_user_id=user.id,
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    return api_success({**seating_service.serialize_seating_plan(event),
+                        "copied_seats": copied, "skipped_guests": skipped})
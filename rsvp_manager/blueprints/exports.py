@@ -2,7 +2,7 @@ from flask import Blueprint
 from flask_login import login_required, current_user
 from rsvp_manager.models import Event, Guest
 from rsvp_manager.services import export_service, event_service
-from rsvp_manager.utils import get_last_name_sort_key
+from rsvp_manager.services.friend_service import GUEST_NAME_ORDER
 
 bp = Blueprint("exports", __name__)
 
@@ -19,8 +19,7 @@ def export_events():
 def export_friends():
     guests = Guest.query.filter_by(user_id=current_user.id).filter(
         Guest.deleted_at.is_(None)
-    ).all()
-    guests.sort(key=lambda g: (get_last_name_sort_key(g.last_name), g.first_name.lower()))
+    ).order_by(*GUEST_NAME_ORDER).all()
     return export_service.export_guests_xlsx(guests)
 
 
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request
+from flask import Blueprint, abort, render_template, request
 from flask_login import login_required, current_user
 from rsvp_manager.services import history_service
 
@@ -8,6 +8,10 @@ bp = Blueprint("history", __name__)
 @bp.route("/history")
 @login_required
 def history():
-    page = request.args.get("page", 1, type=int)
-    pagination = history_service.get_user_history(current_user.id, page=page)
+    try:
+        pagination = history_service.get_user_history(
+            current_user.id, cursor=request.args.get("cursor") or None
+        )
+    except ValueError:
+        abort(400, description="Invalid cursor")
     return render_template("history.html", entries=pagination.items, pagination=pagination)
@@ -5,6 +5,7 @@ from rsvp_manager.extensions import db
 from rsvp_manager.models import Event, Guest, Invitation, Tag, ActivityLog, guest_tags
 from rsvp_manager.utils import VALID_GENDERS
 from rsvp_manager.services.seed_service import seed
+from rsvp_manager.services.seating_service import bump_seating_versions_for_guest
 
 bp = Blueprint("settings", __name__)
 
@@ -41,6 +42,7 @@ def update_profile():
     # Sync the is_me guest
     me_guest = Guest.query.filter_by(user_id=current_user.id, is_me=True).filter(Guest.deleted_at.is_(None)).first()
     if me_guest:
+        bump_seating_versions_for_guest(me_guest.id)
         me_guest.first_name = first_name
         me_guest.last_name = last_name
         me_guest.gender = gender
@@ -0,0 +1,15 @@
+import click
+from rsvp_manager.services import invitation_service
+
+
+def register_commands(app):
+    @app.cli.command("repair-rsvp-counts")
+    @click.option("--check", is_flag=True, help="Only report events with wrong counters.")
+    def repair_rsvp_counts(check):
+        """Recount every event's RSVP counters and fix any that drifted."""
+        wrong = invitation_service.repair_rsvp_counts(fix=not check)
+        verb = "wrong" if check else "repaired"
+        click.echo(f"{len(wrong)} event(s) with {verb} RSVP counters"
+                   + (f": {', '.join(map(str, wrong))}" if wrong else ""))
+        if check and wrong:
+            raise SystemExit(1)
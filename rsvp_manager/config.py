@@ -34,6 +34,11 @@ class Config:
 
     ADMIN_EMAILS = [e.strip().lower() for e in os.environ.get("ADMIN_EMAILS", "").split(",") if e.strip()]
 
+    # Worker processes for multi-restart seating search, per app process (1 = run inline)
+    SEATING_WORKERS = int(os.environ.get("SEATING_WORKERS") or 1)
+    # Threads running background seating jobs (0 = run them inline in the request)
+    SEATING_JOB_THREADS = int(os.environ.get("SEATING_JOB_THREADS") or 2)
+
     if os.environ.get("DATABASE_URL"):
         _missing = [v for v in ("SECRET_KEY",) if not os.environ.get(v)]
         if _missing:
@@ -57,3 +62,5 @@ class TestConfig:
     RATELIMIT_ENABLED = False
     APP_ENV = "staging"
     ADMIN_EMAILS = []
+    SEATING_WORKERS = 1
+    SEATING_JOB_THREADS = 0
@@ -1,6 +1,7 @@
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
 from rsvp_manager.extensions import db, login_manager
-from rsvp_manager.utils import get_last_name_sort_key
+from rsvp_manager.utils import get_last_name_sort_key, get_name_key
 
 
 EVENT_TYPES = ["Dinner", "Party", "Weekend", "Hunt", "Corporate", "Other"]
@@ -47,6 +48,19 @@ class Event(db.Model):
     date_edited = db.Column(db.DateTime, nullable=True)
     deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     notes = db.Column(db.Text, default="")
+    seating_version = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    seating_venue_mode = db.Column(db.Boolean, default=False, server_default=db.text("false"), nullable=False)
+    # The seeded run that produced the current seating plan, if any
+    seating_seed = db.Column(db.BigInteger, nullable=True)
+    seating_seed_mode = db.Column(db.String(20), nullable=True)
+    seating_seed_restarts = db.Column(db.Integer, nullable=True)
+    # RSVP counters over invitations of guests not in the trash, kept current
+    # by invitation_service; `flask repair-rsvp-counts` recounts them
+    invited_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    not_sent_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    attending_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    declined_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
     invitations = db.relationship("Invitation", backref="event", cascade="all, delete-orphan")
     cohosts = db.relationship("EventCohost", backref="event", cascade="all, delete-orphan")
     share_links = db.relationship("EventShareLink", backref="event", cascade="all, delete-orphan")
@@ -88,6 +102,9 @@ guest_tags = db.Table('guest_tags',
 )
 
 
+_SORT_KEY_TYPE = db.String(200).with_variant(db.String(200, collation="C"), "postgresql")
+
+
 class Guest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
@@ -100,19 +117,38 @@ class Guest(db.Model):
     date_created = db.Column(db.DateTime, nullable=True)
     date_edited = db.Column(db.DateTime, nullable=True)
     deleted_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Derived from the names on every write, so friend lists sort in SQL;
+    # C collation on PostgreSQL to order exactly as Python compares strings
+    last_name_sort_key = db.Column(_SORT_KEY_TYPE, nullable=False, default="", server_default="")
+    first_name_lower = db.Column(_SORT_KEY_TYPE, nullable=False, default="", server_default="")
+    # Accent- and case-insensitive "first|last", matched across hosts' guest lists
+    name_key = db.Column(db.Text, nullable=False, default="|", server_default="|")
     invitations = db.relationship("Invitation", backref="guest", cascade="all, delete-orphan")
     tags = db.relationship("Tag", secondary=guest_tags, backref="guests")
 
+    __table_args__ = (
+        db.Index("ix_guest_user_name_sort", "user_id", "last_name_sort_key", "first_name_lower", "id"),
+        db.Index("ix_guest_user_name_key", "user_id", "name_key"),
+        # Same-name guests of every host, for shared-invitation lookups
+        db.Index("ix_guest_name_key", "name_key"),
+    )
+
+    @validates("first_name", "last_name")
+    def _update_name_keys(self, key, value):
+        if key == "first_name":
+            self.first_name_lower = (value or "").lower()
+            self.name_key = get_name_key(value, self.last_name)
+        else:
+            self.last_name_sort_key = get_last_name_sort_key(value)
+            self.name_key = get_name_key(self.first_name, value)
+        return value
+
     @property
     def full_name(self):
         if self.last_name:
             return f"{self.first_name} {self.last_name}"
         return self.first_name
 
-    @property
-    def last_name_sort_key(self):
-        return get_last_name_sort_key(self.last_name)
-
     def __repr__(self):
         return f"<Guest {self.id} {self.full_name!r}>"
 
@@ -208,3 +244,160 @@ class SeatAssignment(db.Model):
 
     def __repr__(self):
         return f"<SeatAssignment {self.id} table={self.table_id} seat={self.seat_position}>"
+
+
+SEATING_CONSTRAINT_KINDS = ["together", "apart"]
+
+
+class SeatingConstraint(db.Model):
+    """Keep guests together or apart when auto-assigning seats.
+
+    Applies either to every guest carrying a tag or to one pair of
+    invitations.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey("event.id"), nullable=False, index=True)
+    kind = db.Column(db.String(10), nullable=False)
+    tag_id = db.Column(db.Integer, db.ForeignKey("tag.id"), nullable=True, index=True)
+    invitation_a_id = db.Column(db.Integer, db.ForeignKey("invitation.id"), nullable=True, index=True)
+    invitation_b_id = db.Column(db.Integer, db.ForeignKey("invitation.id"), nullable=True, index=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    event = db.relationship("Event", backref=db.backref(
+        "seating_constraints", cascade="all, delete-orphan"))
+    tag = db.relationship("Tag", backref=db.backref(
+        "seating_constraints", cascade="all, delete-orphan"))
+    invitation_a = db.relationship("Invitation", foreign_keys=[invitation_a_id], backref=db.backref(
+        "seating_constraints_a", cascade="all, delete-orphan"))
+    invitation_b = db.relationship("Invitation", foreign_keys=[invitation_b_id], backref=db.backref(
+        "seating_constraints_b", cascade="all, delete-orphan"))
+
+    def __repr__(self):
+        return f"<SeatingConstraint {self.id} event={self.event_id} {self.kind}>"
+
+
+class SeatNeighbour(db.Model):
+    """Two guests seated side by side at an event, guest_a_id < guest_b_id.
+
+    Kept in step with SeatAssignment table by table, so "sat next to each
+    other" counts across an owner's events are an index lookup rather than a
+    rescan of every past seating plan.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey("event.id"), nullable=False, index=True)
+    table_id = db.Column(db.Integer, nullable=False)
+    guest_a_id = db.Column(db.Integer, db.ForeignKey("guest.id"), nullable=False)
+    guest_b_id = db.Column(db.Integer, db.ForeignKey("guest.id"), nullable=False, index=True)
+
+    event = db.relationship("Event", backref=db.backref(
+        "seat_neighbours", cascade="all, delete-orphan"))
+    guest_a = db.relationship("Guest", foreign_keys=[guest_a_id], backref=db.backref(
+        "seat_neighbours_a", cascade="all, delete-orphan"))
+    guest_b = db.relationship("Guest", foreign_keys=[guest_b_id], backref=db.backref(
+        "seat_neighbours_b", cascade="all, delete-orphan"))
+
+    __table_args__ = (
+        db.Index("ix_seat_neighbour_owner_pair", "user_id", "guest_a_id", "guest_b_id"),
+    )
+
+    def __repr__(self):
+        return f"<SeatNeighbour event={self.event_id} {self.guest_a_id}-{self.guest_b_id}>"
+
+
+class SeatingRevision(db.Model):
+    """One step in an event's seating history, numbered 1, 2, ... per event.
+
+    ``data`` is compact JSON. Keyframes list every seat as
+    [invitation_id, table_id, seat_position, locked]; other revisions hold
+    only the seats set and the invitations unseated since the revision
+    before. Undone revisions stay until the next change drops them.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey("event.id"), nullable=False, index=True)
+    number = db.Column(db.Integer, nullable=False)
+    is_keyframe = db.Column(db.Boolean, default=False, server_default=db.text("false"), nullable=False)
+    undone = db.Column(db.Boolean, default=False, server_default=db.text("false"), nullable=False)
+    data = db.Column(db.Text, nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    event = db.relationship("Event", backref=db.backref(
+        "seating_revisions", cascade="all, delete-orphan"))
+
+    __table_args__ = (
+        db.UniqueConstraint("event_id", "number", name="uq_seating_revision_number"),
+    )
+
+    def __repr__(self):
+        return f"<SeatingRevision event={self.event_id} #{self.number}>"
+
+
+SEATING_JOB_STATUSES = ["queued", "running", "done", "failed", "cancelled"]
+
+
+class SeatingJob(db.Model):
+    """An auto-assign or shuffle run in the background, polled by the client.
+
+    ``completed`` counts finished restarts out of ``restarts`` and
+    ``best_score`` is the lowest plan cost found so far.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey("event.id"), nullable=False, index=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    mode = db.Column(db.String(20), nullable=False)
+    time_budget_ms = db.Column(db.Integer, nullable=False)
+    restarts = db.Column(db.Integer, nullable=False, default=1)
+    seed = db.Column(db.BigInteger, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="queued")
+    completed = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    best_score = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.String(200), nullable=True)
+    cancel_requested = db.Column(db.Boolean, default=False, server_default=db.text("false"), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    event = db.relationship("Event", backref=db.backref(
+        "seating_jobs", cascade="all, delete-orphan"))
+
+    def __repr__(self):
+        return f"<SeatingJob {self.id} event={self.event_id} {self.status}>"
+
+
+class SeatingTemplate(db.Model):
+    """A table layout saved from an event, to be applied to other events."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    venue_mode = db.Column(db.Boolean, default=False, server_default=db.text("false"), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    user = db.relationship("User", backref=db.backref(
+        "seating_templates", cascade="all, delete-orphan"))
+    tables = db.relationship("SeatingTemplateTable", backref="template",
+                             cascade="all, delete-orphan",
+                             order_by="SeatingTemplateTable.table_number")
+
+    def __repr__(self):
+        return f"<SeatingTemplate {self.id} {self.name!r}>"
+
+
+class SeatingTemplateTable(db.Model):
+    """One table of a seating template.
+
+    ``locked_seats`` is compact JSON of [seat_position, guest_id] pairs for
+    the seats that were locked when the template was saved.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    template_id = db.Column(db.Integer, db.ForeignKey("seating_template.id"), nullable=False, index=True)
+    table_number = db.Column(db.Integer, nullable=False)
+    label = db.Column(db.String(100), nullable=True, default="")
+    shape = db.Column(db.String(20), nullable=False, default="rectangular")
+    capacity = db.Column(db.Integer, nullable=False, default=12)
+    rotation = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    locked_seats = db.Column(db.Text, nullable=True)
+
+    def __repr__(self):
+        return f"<SeatingTemplateTable {self.id} template={self.template_id} #{self.table_number}>"
@@ -0,0 +1,111 @@
+"""Keyset (cursor) pagination for lists that grow without bound.
+
+Pages are fetched with a WHERE on the sort key of the last row seen instead
+of an OFFSET, so every page costs the same. Cursors are opaque base64 tokens
+holding that sort key and the direction to read in.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values, backwards=False):
+    data = {"k": [_dump_value(v) for v in values]}
+    if backwards:
+        data["b"] = 1
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """Return (values, backwards) from a cursor; ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values = [_load_value(v) for v in data["k"]]
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError):
+        raise ValueError("Invalid cursor")
+    if len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values, bool(data.get("b"))
+
+
+def _check_types(order, values):
+    """ValueError unless each cursor value has its sort column's Python type,
+    so a tampered cursor is rejected instead of failing in the query."""
+    for (column, _), value in zip(order, values):
+        try:
+            expected = column.type.python_type
+        except NotImplementedError:
+            continue
+        if type(value) is not expected:
+            raise ValueError("Invalid cursor")
+
+
+def _beyond(order, values, backwards):
+    """Rows strictly after ``values`` in the given order (before, if backwards)."""
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        later = column < values[i] if descending != backwards else column > values[i]
+        clauses.append(and_(*(c == v for (c, _), v in zip(order[:i], values)), later))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, order, cursor=None, per_page=20):
+    """Fetch one page of ``query`` sorted by ``order``, a list of
+    (column, descending) pairs ending in a unique column.
+
+    A cursor from a previous page's next_cursor or prev_cursor continues in
+    that direction; raises ValueError for a malformed cursor.
+    """
+    values, backwards = decode_cursor(cursor, len(order)) if cursor else (None, False)
+    if values is not None:
+        _check_types(order, values)
+        query = query.filter(_beyond(order, values, backwards))
+    query = query.order_by(*(
+        column.desc() if descending != backwards else column.asc()
+        for column, descending in order
+    ))
+    rows = query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return KeysetPage(rows)
+
+    def key(row):
+        return [getattr(row, column.key) for column, _ in order]
+
+    has_next = more if not backwards else values is not None
+    has_prev = values is not None if not backwards else more
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(key(rows[-1])) if has_next else None,
+        prev_cursor=encode_cursor(key(rows[0]), backwards=True) if has_prev else None,
+    )
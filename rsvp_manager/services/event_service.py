@@ -1,32 +1,50 @@
+from collections import Counter
 from datetime import date, datetime, timezone
 from flask import abort
 from sqlalchemy.orm import joinedload
 from rsvp_manager.extensions import db
 from rsvp_manager.models import Event, EventCohost, Guest, Invitation, EVENT_TYPES
+from rsvp_manager.pagination import keyset_paginate
 from rsvp_manager.services.history_service import log_action
+from rsvp_manager.services.invitation_service import RSVP_COUNT_COLUMNS
 
 
 EVENTS_PER_PAGE = 20
 
 
-def get_user_events(user_id, page=1, search=""):
-    """Get events owned by user OR where user is a co-host/viewer."""
-    owned = Event.query.filter_by(user_id=user_id).filter(Event.deleted_at.is_(None))
+# Newest first; id breaks ties between events on the same date
+EVENT_ORDER = [(Event.date, True), (Event.id, True)]
+
+
+def _user_events_query(user_id, search=""):
+    """Events owned by user OR where user is a co-host/viewer."""
     cohosted_ids = db.session.query(EventCohost.event_id).filter_by(user_id=user_id)
-    shared = Event.query.filter(Event.id.in_(cohosted_ids), Event.deleted_at.is_(None))
-    combined = owned.union(shared).options(
-        joinedload(Event.invitations)
+    query = Event.query.filter(
+        db.or_(Event.user_id == user_id, Event.id.in_(cohosted_ids)),
+        Event.deleted_at.is_(None),
     )
     if search:
         like_pattern = f"%{search}%"
-        combined = combined.filter(
+        query = query.filter(
             db.or_(
                 Event.name.ilike(like_pattern),
                 Event.location.ilike(like_pattern),
             )
         )
-    combined = combined.order_by(Event.date.desc())
-    return combined.paginate(page=page, per_page=EVENTS_PER_PAGE, error_out=False)
+    return query
+
+
+def get_user_events(user_id, page=1, search=""):
+    """Get events owned by user OR where user is a co-host/viewer."""
+    query = _user_events_query(user_id, search).order_by(Event.date.desc(), Event.id.desc())
+    return query.paginate(page=page, per_page=EVENTS_PER_PAGE, error_out=False)
+
+
+def get_user_events_page(user_id, cursor=None, search=""):
+    """Cursor-paginated variant of get_user_events; raises ValueError for a
+    malformed cursor."""
+    return keyset_paginate(_user_events_query(user_id, search), EVENT_ORDER, cursor,
+                           EVENTS_PER_PAGE)
 
 
 def get_authorized_event(event_id, user_id):
@@ -98,6 +116,7 @@ def create_event(user_id, form_data):
                 date_responded=date.today()
             )
             db.session.add(inv)
+            event.invited_count = event.attending_count = 1
             db.session.commit()
 
     return event
@@ -159,6 +178,7 @@ def duplicate_event(event, user_id, new_date=None, reset_status=True, name=None)
     db.session.add(new_event)
     db.session.flush()
     # Copy invitations (only non-deleted guests owned by this user)
+    counts = Counter()
     for inv in event.invitations:
         if inv.guest.deleted_at or inv.guest.user_id != user_id:
             continue
@@ -180,6 +200,10 @@ def duplicate_event(event, user_id, new_date=None, reset_status=True, name=None)
                 notes=inv.notes,
             )
         db.session.add(new_inv)
+        counts[new_inv.status] += 1
+    new_event.invited_count = sum(counts.values())
+    for status, column in RSVP_COUNT_COLUMNS.items():
+        setattr(new_event, column, counts[status])
     log_action(user_id, "duplicated_event", "event", new_event.id,
                f"You duplicated event {event.name}")
     db.session.commit()
@@ -3,7 +3,6 @@ from io import BytesIO
 from flask import send_file, make_response
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
-from rsvp_manager.utils import get_last_name_sort_key
 
 HEADER_FONT = Font(bold=True, color="FFFFFF")
 HEADER_FILL = PatternFill(start_color="2C3E50", end_color="2C3E50", fill_type="solid")
@@ -34,9 +33,8 @@ def export_events_xlsx(events):
     wb = Workbook()
     ws = _styled_sheet(wb, "Events", ["Name", "Type", "Date", "Location", "Invited", "Attending", "Notes"])
     for e in events:
-        attending = sum(1 for inv in e.invitations if inv.status == "Attending")
         ws.append([e.name, e.event_type, e.date.strftime("%Y-%m-%d"), e.location or "",
-                   len(e.invitations), attending, e.notes or ""])
+                   e.invited_count, e.attending_count, e.notes or ""])
     for col in ws.columns:
         ws.column_dimensions[col[0].column_letter].width = 20
     return _to_download(wb, "events.xlsx")
@@ -96,7 +94,7 @@ def export_event_guests_text(event):
         if inv.guest.deleted_at:
             continue
         g = inv.guest
-        entry = (get_last_name_sort_key(g.last_name), g.first_name.lower(), g.full_name)
+        entry = (g.last_name_sort_key, g.first_name_lower, g.full_name)
         if inv.status == "Attending":
             attending.append(entry)
         elif inv.status == "Pending":
@@ -1,14 +1,18 @@
-import unicodedata
 from datetime import datetime, timezone
 from flask import abort
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from rsvp_manager.extensions import db
 from rsvp_manager.models import Guest, Invitation
-from rsvp_manager.services.history_service import log_action
-from rsvp_manager.utils import VALID_GENDERS, get_last_name_sort_key
+from rsvp_manager.pagination import keyset_paginate
+from rsvp_manager.services.history_service import log_action, log_actions
+from rsvp_manager.services.invitation_service import refresh_rsvp_counts_for_guests
+from rsvp_manager.utils import BULK_INSERT_CHUNK_SIZE, VALID_GENDERS, chunked
 
 
 GUESTS_PER_PAGE = 50
+# By last name (nobility particles skipped), then first name; id breaks ties
+GUEST_ORDER = [(Guest.last_name_sort_key, False), (Guest.first_name_lower, False), (Guest.id, False)]
+GUEST_NAME_ORDER = [column for column, _ in GUEST_ORDER]
 
 
 class _Pagination:
@@ -37,15 +41,8 @@ class _Pagination:
                 last = num
 
 
-def _guest_sort_key(guest):
-    return (guest.last_name_sort_key, guest.first_name.lower())
-
-
-def get_user_guests(user_id, page=1, show_archived="0", search=""):
-    query = Guest.query.filter_by(user_id=user_id).filter(Guest.deleted_at.is_(None)).options(
-        joinedload(Guest.invitations).joinedload(Invitation.event),
-        joinedload(Guest.tags),
-    )
+def _user_guests_query(user_id, show_archived="0", search=""):
+    query = Guest.query.filter_by(user_id=user_id).filter(Guest.deleted_at.is_(None))
     if show_archived == "2":
         query = query.filter_by(is_archived=True)
     elif show_archived != "1":
@@ -59,12 +56,46 @@ def get_user_guests(user_id, page=1, show_archived="0", search=""):
                 (Guest.first_name + " " + Guest.last_name).ilike(like_pattern),
             )
         )
-    all_guests = query.all()
-    all_guests.sort(key=_guest_sort_key)
-    total = len(all_guests)
-    start = (page - 1) * GUESTS_PER_PAGE
-    end = start + GUESTS_PER_PAGE
-    return _Pagination(all_guests[start:end], total, page, GUESTS_PER_PAGE)
+    return query
+
+
+def _with_page_data(query, include_invitations=False):
+    """Load tags (and invitations with their events, if asked) for the
+    guests a page returns, only."""
+    options = [selectinload(Guest.tags)]
+    if include_invitations:
+        options.append(selectinload(Guest.invitations).joinedload(Invitation.event))
+    return query.options(*options)
+
+
+def get_user_guests(user_id, page=1, show_archived="0", search="", include_invitations=False):
+    query = _user_guests_query(user_id, show_archived, search)
+    total = query.order_by(None).count()
+    guests = _with_page_data(query, include_invitations).order_by(*GUEST_NAME_ORDER).offset(
+        (page - 1) * GUESTS_PER_PAGE
+    ).limit(GUESTS_PER_PAGE).all()
+    return _Pagination(guests, total, page, GUESTS_PER_PAGE)
+
+
+def get_user_guests_page(user_id, cursor=None, show_archived="0", search="", include_invitations=False):
+    """Cursor-paginated friends, sorted by name like get_user_guests.
+    Raises ValueError for a malformed cursor."""
+    query = _with_page_data(_user_guests_query(user_id, show_archived, search), include_invitations)
+    return keyset_paginate(query, GUEST_ORDER, cursor, GUESTS_PER_PAGE)
+
+
+def get_invitation_summaries(guest_ids):
+    """Per-guest invitation counts by status in one GROUP BY query:
+    {guest_id: {status: count}}. Guests without invitations are left out."""
+    summaries = {}
+    if not guest_ids:
+        return summaries
+    rows = db.session.query(Invitation.guest_id, Invitation.status, db.func.count()).filter(
+        Invitation.guest_id.in_(guest_ids)
+    ).group_by(Invitation.guest_id, Invitation.status).all()
+    for guest_id, status, count in rows:
+        summaries.setdefault(guest_id, {})[status] = count
+    return summaries
 
 
 def get_owned_guest_or_404(guest_id, user_id):
@@ -115,8 +146,11 @@ def update_guest(guest, user_id, form_data):
     is_me = bool(form_data.get("is_me"))
     if is_me and not guest.is_me:
         Guest.query.filter_by(user_id=user_id, is_me=True).update({"is_me": False})
+    last_name = form_data.get("last_name", "").strip()[:100]
+    if (first_name, last_name, gender) != (guest.first_name, guest.last_name, guest.gender):
+        _seating_details_changed(guest)
     guest.first_name = first_name
-    guest.last_name = form_data.get("last_name", "").strip()[:100]
+    guest.last_name = last_name
     guest.gender = gender
     guest.is_me = is_me
     guest.notes = form_data.get("notes", "").strip()
@@ -126,9 +160,17 @@ def update_guest(guest, user_id, form_data):
     return guest
 
 
+def _seating_details_changed(guest):
+    """Seating plans show names and score genders, so invalidate the plans
+    of events the guest is invited to."""
+    from rsvp_manager.services.seating_service import bump_seating_versions_for_guest
+    bump_seating_versions_for_guest(guest.id)
+
+
 def delete_guest(guest):
     log_action(guest.user_id, "deleted_guest", "guest", guest.id, f"You deleted {guest.full_name}")
     guest.deleted_at = datetime.now(timezone.utc)
+    refresh_rsvp_counts_for_guests([guest.id])
     db.session.commit()
 
 
@@ -139,6 +181,8 @@ def update_guest_name(guest, first_name, last_name):
         abort(400, description="First name is required (max 100 characters)")
     if len(last_name) > 100:
         abort(400, description="Last name max 100 characters")
+    if (first_name, last_name) != (guest.first_name, guest.last_name):
+        _seating_details_changed(guest)
     guest.first_name = first_name
     guest.last_name = last_name
     guest.date_edited = datetime.now(timezone.utc)
@@ -148,6 +192,8 @@ def update_guest_name(guest, first_name, last_name):
 def update_guest_gender(guest, gender):
     if gender not in VALID_GENDERS:
         abort(400, description="Gender must be Male or Female")
+    if gender != guest.gender:
+        _seating_details_changed(guest)
     guest.gender = gender
     guest.date_edited = datetime.now(timezone.utc)
     db.session.commit()
@@ -211,6 +257,7 @@ def bulk_delete_guests(user_id, guest_ids):
     for guest in guests:
         log_action(user_id, "deleted_guest", "guest", guest.id, f"You deleted {guest.full_name}")
         guest.deleted_at = now
+    refresh_rsvp_counts_for_guests([guest.id for guest in guests])
     db.session.commit()
     return len(guests)
 
@@ -256,8 +303,10 @@ def bulk_remove_tag(user_id, guest_ids, tag_name):
     return updated
 
 
-def bulk_create_guests(user_id, guests_data):
-    added = []
+def build_guests(user_id, guests_data):
+    """Yield unsaved guests for the entries of a bulk create, skipping those
+    without a first name."""
+    now = datetime.now(timezone.utc)
     for g_data in guests_data:
         first_name = g_data.get("first_name", "").strip()[:100]
         if not first_name:
@@ -265,72 +314,67 @@ def bulk_create_guests(user_id, guests_data):
         gender = g_data.get("gender", "Male")
         if gender not in VALID_GENDERS:
             gender = "Male"
-        guest = Guest(
+        yield Guest(
             user_id=user_id,
             first_name=first_name,
             last_name=g_data.get("last_name", "").strip()[:100],
             gender=gender,
             notes=g_data.get("notes", "").strip(),
-            date_created=datetime.now(timezone.utc)
+            date_created=now,
         )
-        db.session.add(guest)
+
+
+def bulk_create_guests(user_id, guests_data):
+    """Create guests in chunks, one flush per chunk: each chunk's guests go
+    in one multi-row INSERT returning their ids, then its history rows in
+    another."""
+    added = []
+    for guests in chunked(build_guests(user_id, guests_data), BULK_INSERT_CHUNK_SIZE):
+        db.session.add_all(guests)
         db.session.flush()
-        log_action(user_id, "created_guest", "guest", guest.id, f"You added {guest.full_name} to your friends")
-        added.append({
+        log_actions(user_id, [
+            ("created_guest", "guest", guest.id, f"You added {guest.full_name} to your friends")
+            for guest in guests
+        ])
+        added.extend({
             "id": guest.id, "first_name": guest.first_name,
             "last_name": guest.last_name or "", "gender": guest.gender,
             "notes": guest.notes or "", "is_me": False,
             "date_created": guest.date_created.isoformat()
-        })
+        } for guest in guests)
     db.session.commit()
     return added
 
 
-def _normalize_name(name):
-    """Normalize name: remove accents, lowercase, collapse whitespace."""
-    if not name:
-        return ""
-    nfkd = unicodedata.normalize('NFKD', name)
-    result = "".join(c for c in nfkd if not unicodedata.combining(c)).lower().strip()
-    # Collapse multiple spaces into one
-    return " ".join(result.split())
-
-
 def get_shared_invitations(guest, user_id):
     """Find events where a co-host's guest with the same name was invited.
 
     Returns list of dicts with event_name, event_date, status for events
     where the user is owner/co-host and another user's guest with matching
     name was invited.
+
+    One query: guests with the same name key (indexed) are joined to their
+    invitations, keeping those in events the user owns or co-hosts.
     """
     from rsvp_manager.models import Event, EventCohost
-    norm_first = _normalize_name(guest.first_name)
-    norm_last = _normalize_name(guest.last_name)
-
-    # Get events where user is owner or co-host
-    owned_ids = db.session.query(Event.id).filter_by(user_id=user_id).filter(Event.deleted_at.is_(None))
-    cohosted_ids = db.session.query(EventCohost.event_id).filter_by(user_id=user_id)
-    my_event_ids = set(r[0] for r in owned_ids.all()) | set(r[0] for r in cohosted_ids.all())
-
-    if not my_event_ids:
-        return []
-
-    # Find invitations in those events for guests owned by OTHER users with matching name
-    results = []
-    invitations = Invitation.query.filter(
-        Invitation.event_id.in_(my_event_ids)
-    ).join(Guest, Invitation.guest_id == Guest.id).filter(
+    in_my_events = db.or_(
+        db.and_(Event.user_id == user_id, Event.deleted_at.is_(None)),
+        db.exists().where(EventCohost.event_id == Event.id, EventCohost.user_id == user_id),
+    )
+    rows = db.session.query(Event.name, Event.date, Invitation.status).select_from(Guest).join(
+        Invitation, Invitation.guest_id == Guest.id
+    ).join(Event, Event.id == Invitation.event_id).filter(
+        Guest.name_key == guest.name_key,
         Guest.user_id != user_id,
         Guest.deleted_at.is_(None),
-    ).all()
-
-    for inv in invitations:
-        g = inv.guest
-        if _normalize_name(g.first_name) == norm_first and _normalize_name(g.last_name) == norm_last:
-            results.append({
-                "event_name": inv.event.name,
-                "event_date": inv.event.date.strftime("%d/%m/%Y") if inv.event.date else "",
-                "status": inv.status,
-                "shared": True,
-            })
-    return results
+        in_my_events,
+    ).order_by(Invitation.id).all()
+    return [
+        {
+            "event_name": name,
+            "event_date": event_date.strftime("%d/%m/%Y") if event_date else "",
+            "status": status,
+            "shared": True,
+        }
+        for name, event_date, status in rows
+    ]
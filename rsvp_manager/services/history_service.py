@@ -2,9 +2,11 @@ from datetime import datetime, timezone
 from sqlalchemy import or_
 from rsvp_manager.extensions import db
 from rsvp_manager.models import ActivityLog, EventCohost, Event
+from rsvp_manager.pagination import keyset_paginate
 
 
 HISTORY_PER_PAGE = 30
+HISTORY_ORDER = [(ActivityLog.created_at, True), (ActivityLog.id, True)]
 
 
 def log_action(user_id, action, entity_type, entity_id, description, acting_user_id=None):
@@ -20,12 +22,36 @@ def log_action(user_id, action, entity_type, entity_id, description, acting_user
     db.session.add(entry)
 
 
-def get_user_history(user_id, page=1):
-    """Get history: own logs + logs for shared events (where I'm co-host)."""
+def log_actions(user_id, entries, acting_user_id=None):
+    """Log many actions in one multi-row INSERT; each entry is an
+    (action, entity_type, entity_id, description) tuple."""
+    if not entries:
+        return
+    now = datetime.now(timezone.utc)
+    db.session.execute(db.insert(ActivityLog), [
+        {
+            "user_id": user_id,
+            "acting_user_id": acting_user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "description": description,
+            "created_at": now,
+        }
+        for action, entity_type, entity_id, description in entries
+    ])
+
+
+def get_user_history(user_id, cursor=None):
+    """Get history: own logs + logs for shared events (where I'm co-host).
+
+    Returns a KeysetPage, newest first; raises ValueError for a malformed
+    cursor.
+    """
     # Event IDs owned by users whose events I co-host
     cohosted_owner_ids = db.session.query(Event.user_id).join(
         EventCohost, EventCohost.event_id == Event.id
-    ).filter(EventCohost.user_id == user_id).distinct().subquery()
+    ).filter(EventCohost.user_id == user_id).distinct()
 
     query = ActivityLog.query.filter(
         or_(
@@ -36,6 +62,5 @@ def get_user_history(user_id, page=1):
                 ActivityLog.entity_type.in_(["event", "invitation"])
             )
         )
-    ).order_by(ActivityLog.created_at.desc())
-
-    return query.paginate(page=page, per_page=HISTORY_PER_PAGE, error_out=False)
+    )
+    return keyset_paginate(query, HISTORY_ORDER, cursor, HISTORY_PER_PAGE)
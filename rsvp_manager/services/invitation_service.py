@@ -1,12 +1,100 @@
 from datetime import date, datetime, timezone
 from flask import abort
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload
 from rsvp_manager.extensions import db
-from rsvp_manager.models import Guest, Invitation
-from rsvp_manager.services.history_service import log_action
-from rsvp_manager.utils import get_last_name_sort_key
+from rsvp_manager.models import Event, Guest, Invitation
+from rsvp_manager.services.history_service import log_action, log_actions
+from rsvp_manager.utils import BULK_INSERT_CHUNK_SIZE, chunked
 
 VALID_STATUSES = ("Attending", "Pending", "Declined")
 
+# Event counter column for each invitation status; invited_count is their sum
+RSVP_COUNT_COLUMNS = {
+    "Not Sent": "not_sent_count",
+    "Pending": "pending_count",
+    "Attending": "attending_count",
+    "Declined": "declined_count",
+}
+RSVP_REPAIR_BATCH_SIZE = 500
+
+
+# -- RSVP counters -----------------------------------------------------------------
+
+def adjust_rsvp_counts(event_id, changes):
+    """Apply {status: delta} to an event's RSVP counters in one UPDATE, so
+    concurrent writers add up instead of overwriting each other."""
+    values = {}
+    for status, delta in changes.items():
+        if delta:
+            column = RSVP_COUNT_COLUMNS[status]
+            values[column] = getattr(Event, column) + delta
+    total = sum(changes.values())
+    if total:
+        values["invited_count"] = Event.invited_count + total
+    if values:
+        db.session.execute(db.update(Event).where(Event.id == event_id).values(**values))
+
+
+def _count_rsvps(event_ids):
+    """Recount the RSVP counters of the given events from their invitations."""
+    counts = {event_id: {"invited_count": 0, **dict.fromkeys(RSVP_COUNT_COLUMNS.values(), 0)}
+              for event_id in event_ids}
+    rows = db.session.query(
+        Invitation.event_id, Invitation.status, func.count(Invitation.id)
+    ).join(Guest, Guest.id == Invitation.guest_id).filter(
+        Invitation.event_id.in_(list(event_ids)), Guest.deleted_at.is_(None)
+    ).group_by(Invitation.event_id, Invitation.status).all()
+    for event_id, status, n in rows:
+        counts[event_id]["invited_count"] += n
+        if status in RSVP_COUNT_COLUMNS:
+            counts[event_id][RSVP_COUNT_COLUMNS[status]] += n
+    return counts
+
+
+def refresh_rsvp_counts(event_ids):
+    """Recount and store the RSVP counters of the given events."""
+    event_ids = set(event_ids)
+    if event_ids:
+        db.session.execute(db.update(Event), [
+            {"id": event_id, **values} for event_id, values in _count_rsvps(event_ids).items()
+        ])
+
+
+def refresh_rsvp_counts_for_guests(guest_ids):
+    """Recount the events the guests are invited to, after guests move in
+    or out of the trash."""
+    refresh_rsvp_counts(event_id for (event_id,) in db.session.query(
+        Invitation.event_id
+    ).filter(Invitation.guest_id.in_(list(guest_ids))).distinct())
+
+
+def repair_rsvp_counts(fix=True):
+    """Check every event's RSVP counters against a recount, in batches.
+
+    Returns the ids of events whose counters were wrong; with fix they are
+    corrected and committed.
+    """
+    columns = ["invited_count", *RSVP_COUNT_COLUMNS.values()]
+    wrong = []
+    last_id = 0
+    while True:
+        events = db.session.query(Event.id, *(getattr(Event, c) for c in columns)).filter(
+            Event.id > last_id
+        ).order_by(Event.id).limit(RSVP_REPAIR_BATCH_SIZE).all()
+        if not events:
+            break
+        last_id = events[-1].id
+        counts = _count_rsvps([row.id for row in events])
+        stale = [row.id for row in events
+                 if any(getattr(row, c) != counts[row.id][c] for c in columns)]
+        if stale and fix:
+            db.session.execute(db.update(Event), [{"id": i, **counts[i]} for i in stale])
+            db.session.commit()
+        wrong.extend(stale)
+    return wrong
+
 
 def get_owned_invitation_or_404(invitation_id, user_id):
     """Check user has at least cohost access to the invitation's event."""
@@ -18,7 +106,12 @@ def get_owned_invitation_or_404(invitation_id, user_id):
     return invitation
 
 
+def _counts_toward_event(invitation):
+    return invitation.guest.deleted_at is None
+
+
 def toggle_send(invitation, acting_user_id=None):
+    old_status = invitation.status
     if invitation.status == "Not Sent":
         invitation.status = "Pending"
         invitation.date_invited = date.today()
@@ -35,6 +128,8 @@ def toggle_send(invitation, acting_user_id=None):
         log_action(invitation.event.user_id, "unsent_invitation", "invitation", invitation.id,
                    f"You unsent the invitation to {invitation.guest.full_name} for {invitation.event.name}",
                    acting_user_id=acting_user_id)
+    if _counts_toward_event(invitation):
+        adjust_rsvp_counts(invitation.event_id, {old_status: -1, invitation.status: 1})
     invitation.event.date_edited = datetime.now(timezone.utc)
     db.session.commit()
     return invitation
@@ -46,6 +141,8 @@ def update_status(invitation, new_status, acting_user_id=None):
     if invitation.status == "Not Sent":
         abort(400, description="Cannot change status of an unsent invitation")
     if new_status != invitation.status:
+        if _counts_toward_event(invitation):
+            adjust_rsvp_counts(invitation.event_id, {invitation.status: -1, new_status: 1})
         invitation.status = new_status
         invitation.status_changed_by = acting_user_id
         if new_status in ("Attending", "Declined"):
@@ -66,6 +163,8 @@ def remove_invitation(invitation):
     event_id = invitation.event_id
     log_action(invitation.event.user_id, "removed_from_event", "invitation", invitation.id,
                f"You removed {invitation.guest.full_name} from {invitation.event.name}")
+    if _counts_toward_event(invitation):
+        adjust_rsvp_counts(event_id, {invitation.status: -1})
     invitation.event.date_edited = datetime.now(timezone.utc)
     db.session.delete(invitation)
     db.session.commit()
@@ -82,21 +181,20 @@ def update_field(invitation, field, value):
 
 
 def get_available_guests(event, user_id):
-    from rsvp_manager.services.friend_service import _normalize_name
     invited_ids = {inv.guest_id for inv in event.invitations}
-    # Build set of normalized names already in the event (from all hosts)
-    invited_names = set()
-    for inv in event.invitations:
-        if not inv.guest.deleted_at:
-            norm = _normalize_name(inv.guest.first_name) + "|" + _normalize_name(inv.guest.last_name)
-            invited_names.add(norm)
-    all_guests = Guest.query.filter_by(user_id=user_id).filter(Guest.deleted_at.is_(None)).all()
-    all_guests.sort(key=lambda g: (get_last_name_sort_key(g.last_name), g.first_name.lower()))
+    # Normalized names already in the event (from all hosts)
+    invited_names = set(db.session.scalars(
+        db.select(Guest.name_key).join(Invitation, Invitation.guest_id == Guest.id).filter(
+            Invitation.event_id == event.id, Guest.deleted_at.is_(None),
+        )
+    ))
+    all_guests = Guest.query.filter_by(user_id=user_id).filter(Guest.deleted_at.is_(None)).order_by(
+        Guest.last_name_sort_key, Guest.first_name_lower, Guest.id
+    ).all()
     result = []
     for g in all_guests:
         already_by_id = g.id in invited_ids
-        name_key = _normalize_name(g.first_name) + "|" + _normalize_name(g.last_name)
-        name_match = name_key in invited_names and not already_by_id
+        name_match = g.name_key in invited_names and not already_by_id
         result.append({
             "id": g.id, "first_name": g.first_name, "last_name": g.last_name or "",
             "last_name_sort_key": g.last_name_sort_key,
@@ -109,29 +207,46 @@ def get_available_guests(event, user_id):
     return result
 
 
+def _insert_ignoring_conflicts(model):
+    """INSERT for ``model`` that skips rows violating a unique constraint
+    (ON CONFLICT DO NOTHING on PostgreSQL and SQLite)."""
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model).on_conflict_do_nothing()
+
+
 def bulk_add_guests(event, guest_ids, user_id):
-    invited_ids = {inv.guest_id for inv in event.invitations}
-    new_ids = [gid for gid in guest_ids if gid not in invited_ids]
-    if not new_ids:
+    """Invite the user's guests to the event, skipping those already invited.
+
+    Per chunk, one INSERT ... ON CONFLICT DO NOTHING RETURNING adds the
+    invitations, so uq_invitation_event_guest drops duplicates (including
+    ones added concurrently), and one insert writes their history rows.
+    """
+    guest_ids = list(dict.fromkeys(guest_ids))
+    if not guest_ids:
         return []
     guests_by_id = {
-        g.id: g for g in Guest.query.filter(
-            Guest.id.in_(new_ids), Guest.user_id == user_id,
+        g.id: g for g in Guest.query.options(selectinload(Guest.tags)).filter(
+            Guest.id.in_(guest_ids), Guest.user_id == user_id,
             Guest.deleted_at.is_(None)
         ).all()
     }
+    invitation_ids = {}
+    for chunk in chunked([gid for gid in guest_ids if gid in guests_by_id], BULK_INSERT_CHUNK_SIZE):
+        invitation_ids.update(
+            (guest_id, inv_id) for inv_id, guest_id in db.session.execute(
+                _insert_ignoring_conflicts(Invitation).values([
+                    {"event_id": event.id, "guest_id": gid, "added_by": user_id, "status": "Not Sent"}
+                    for gid in chunk
+                ]).returning(Invitation.id, Invitation.guest_id)
+            )
+        )
     added = []
-    for gid in new_ids:
-        guest = guests_by_id.get(gid)
-        if not guest:
+    for gid in guest_ids:
+        if gid not in invitation_ids:
             continue
-        inv = Invitation(event_id=event.id, guest_id=gid, added_by=user_id, status="Not Sent")
-        db.session.add(inv)
-        db.session.flush()
-        log_action(event.user_id, "added_to_event", "invitation", inv.id,
-                   f"You added {guest.full_name} to {event.name}")
+        guest = guests_by_id[gid]
         added.append({
-            "invitation_id": inv.id, "guest_id": guest.id,
+            "invitation_id": invitation_ids[gid], "guest_id": guest.id,
             "guest_owner_id": guest.user_id, "added_by": user_id,
             "first_name": guest.first_name, "last_name": guest.last_name or "",
             "gender": guest.gender, "status": "Not Sent",
@@ -140,7 +255,13 @@ def bulk_add_guests(event, guest_ids, user_id):
             "date_invited": "", "date_invited_iso": "",
             "date_responded": "", "date_responded_iso": ""
         })
+    log_actions(event.user_id, [
+        ("added_to_event", "invitation", a["invitation_id"],
+         f"You added {guests_by_id[a['guest_id']].full_name} to {event.name}")
+        for a in added
+    ])
     if added:
+        adjust_rsvp_counts(event.id, {"Not Sent": len(added)})
         event.date_edited = datetime.now(timezone.utc)
     db.session.commit()
     return added
@@ -170,32 +291,29 @@ def get_event_guests_with_status(source_event, current_event, user_id):
 
 
 def bulk_create_and_invite(event, guests_data, user_id):
-    from rsvp_manager.utils import VALID_GENDERS
+    """Create guests and invite them to the event in chunks: per chunk, one
+    flush inserts the guests in a multi-row INSERT returning their ids, then
+    one INSERT ... RETURNING each adds the invitations and the history rows."""
+    from rsvp_manager.services.friend_service import build_guests
     added = []
-    for g_data in guests_data:
-        first_name = g_data.get("first_name", "").strip()[:100]
-        if not first_name:
-            continue
-        gender = g_data.get("gender", "Male")
-        if gender not in VALID_GENDERS:
-            gender = "Male"
-        guest = Guest(
-            user_id=user_id,
-            first_name=first_name,
-            last_name=g_data.get("last_name", "").strip()[:100],
-            gender=gender,
-            notes=g_data.get("notes", "").strip(),
-            date_created=datetime.now(timezone.utc)
-        )
-        db.session.add(guest)
-        db.session.flush()
-        inv = Invitation(event_id=event.id, guest_id=guest.id, added_by=user_id, status="Not Sent")
-        db.session.add(inv)
+    for guests in chunked(build_guests(user_id, guests_data), BULK_INSERT_CHUNK_SIZE):
+        db.session.add_all(guests)
         db.session.flush()
-        log_action(user_id, "created_guest", "guest", guest.id, f"You added {guest.full_name} to your friends")
-        log_action(user_id, "added_to_event", "invitation", inv.id, f"You added {guest.full_name} to {event.name}")
-        added.append({
-            "invitation_id": inv.id, "guest_id": guest.id,
+        invitation_ids = db.session.scalars(
+            db.insert(Invitation).returning(Invitation.id, sort_by_parameter_order=True),
+            [{"event_id": event.id, "guest_id": guest.id, "added_by": user_id, "status": "Not Sent"}
+             for guest in guests],
+        ).all()
+        log_actions(user_id, [
+            entry
+            for guest, inv_id in zip(guests, invitation_ids)
+            for entry in (
+                ("created_guest", "guest", guest.id, f"You added {guest.full_name} to your friends"),
+                ("added_to_event", "invitation", inv_id, f"You added {guest.full_name} to {event.name}"),
+            )
+        ])
+        added.extend({
+            "invitation_id": inv_id, "guest_id": guest.id,
             "guest_owner_id": guest.user_id, "added_by": user_id,
             "first_name": guest.first_name, "last_name": guest.last_name or "",
             "gender": guest.gender, "status": "Not Sent",
@@ -203,8 +321,9 @@ def bulk_create_and_invite(event, guests_data, user_id):
             "guest_notes": "", "guest_tags": [],
             "date_invited": "", "date_invited_iso": "",
             "date_responded": "", "date_responded_iso": ""
-        })
+        } for guest, inv_id in zip(guests, invitation_ids))
     if added:
+        adjust_rsvp_counts(event.id, {"Not Sent": len(added)})
         event.date_edited = datetime.now(timezone.utc)
     db.session.commit()
     return added
@@ -0,0 +1,1090 @@
+"""Seating optimizer engine.
+
+Works on a compact, ORM-free snapshot of a seating problem so the search can
+run without touching the database:
+
+    {
+        "tables": [(table_id, shape, capacity, {seat_position: gender}), ...],
+        "guests": [(invitation_id, gender), ...],
+    }
+
+The seat map holds guests who are already seated and must stay put (locked
+seats, or everyone already seated when only filling empty seats). An optional
+"venue": True scores plans on geometry-aware adjacency (large-venue mode).
+
+Optional seating constraints ride along in the snapshot:
+
+    "seated":   {invitation_id: (table_id, seat_position)} for fixed guests
+    "together": [(invitation_id, ...), ...] keep-together links
+    "apart":    [(invitation_id, invitation_id), ...] keep-apart pairs
+    "repeats":  [(invitation_id, invitation_id, count), ...] pairs who sat
+                side by side at `count` earlier events (fresh mode)
+
+Snapshots are plain tuples and dicts, so search() can hand them to worker
+processes for parallel restarts.
+"""
+import heapq
+import math
+import multiprocessing
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+
+DEFAULT_TIME_BUDGET_MS = 250
+MAX_TIME_BUDGET_MS = 5000
+MAX_RESTARTS = 32
+
+_GENDER_CODES = {"Male": 1, "Female": 2}
+
+# Annealing temperature range (in units of same-gender adjacencies)
+_T_START = 2.0
+_T_END = 0.02
+_CHECK_EVERY = 512
+# Least time between progress calls made while a restart is still running
+_PROGRESS_EVERY_S = 0.5
+
+# Cost of seating a keep-apart pair side by side, in same-gender adjacencies
+APART_PENALTY = 8
+# Cost per earlier event at which a pair already sat side by side (fresh mode)
+REPEAT_PENALTY = 2
+
+
+@lru_cache(maxsize=None)
+def seat_adjacency(shape, capacity, venue=False):
+    """Return neighbour positions for each seat, indexed by seat_position - 1.
+
+    Seats are numbered sequentially around the table, so neighbours are
+    pos-1 and pos+1, wrapping from the last seat to the first on round tables.
+    With ``venue`` the graph follows the table geometry instead (see
+    _venue_adjacency).
+    """
+    if venue:
+        return _venue_adjacency(shape, capacity)
+    wrap = shape == "round" and capacity > 2
+    neighbours = []
+    for pos in range(1, capacity + 1):
+        adj = []
+        if pos > 1:
+            adj.append(pos - 1)
+        elif wrap:
+            adj.append(capacity)
+        if pos < capacity:
+            adj.append(pos + 1)
+        elif wrap:
+            adj.append(1)
+        neighbours.append(tuple(adj))
+    return tuple(neighbours)
+
+
+def _table_sides(shape, capacity):
+    """Seat positions on each side of a table, as drawn by seating.js.
+
+    Returns (top, bottom, right, left): top and bottom rows left to right,
+    end seats top to bottom. Round tables have no sides.
+    """
+    n = capacity
+    if shape == "long":
+        top_count, right_count, left_count = (n + 1) // 2, 0, 0
+    elif shape == "large_rect":
+        ends = min(4, n)
+        top_count = (n - ends + 1) // 2
+        right_count, left_count = min(2, ends), max(0, ends - 2)
+    elif n >= 6:
+        top_count, right_count, left_count = (n - 2) // 2, 1, 1
+    else:
+        top_count, right_count, left_count = n // 2, 0, 0
+    bottom_count = n - top_count - right_count - left_count
+
+    positions = iter(range(1, n + 1))
+    top = [next(positions) for _ in range(top_count)]
+    right = [next(positions) for _ in range(right_count)]
+    bottom = [next(positions) for _ in range(bottom_count)][::-1]
+    left = [next(positions) for _ in range(left_count)][::-1]
+    return top, bottom, right, left
+
+
+def _venue_adjacency(shape, capacity):
+    """Geometry-aware neighbours for large venues.
+
+    Besides side neighbours along a row, rows facing each other are linked
+    across the table (the one or two opposite seats within half a seat
+    width), and end seats are linked to the corner seats of both rows.
+    Round tables keep their ring.
+    """
+    if shape == "round":
+        return seat_adjacency(shape, capacity)
+    top, bottom, right, left = _table_sides(shape, capacity)
+    edges = set()
+    for side in (top, bottom, right, left):
+        edges.update(zip(side, side[1:]))
+    # Across: rows are centred, so compare slot offsets from the middle
+    for i, a in enumerate(top):
+        x_a = i - (len(top) - 1) / 2
+        for j, b in enumerate(bottom):
+            if abs(x_a - (j - (len(bottom) - 1) / 2)) <= 0.5:
+                edges.add((a, b))
+    # Corners: end seats touch the first / last seat of each row
+    for end, row_index in ((right, -1), (left, 0)):
+        if end:
+            if top:
+                edges.add((end[0], top[row_index]))
+            if bottom:
+                edges.add((end[-1], bottom[row_index]))
+
+    neighbours = [set() for _ in range(capacity)]
+    for a, b in edges:
+        neighbours[a - 1].add(b)
+        neighbours[b - 1].add(a)
+    return tuple(tuple(sorted(adj)) for adj in neighbours)
+
+
+def _gender_code(gender):
+    return _GENDER_CODES.get(gender, 3)
+
+
+class _SeatGraph:
+    """Flattened seats of every table with global neighbour indices."""
+
+    def __init__(self, tables, venue=False):
+        self.seat_table = []
+        self.seat_pos = []
+        self.neighbours = []
+        self.fixed_gender = []
+        self.index = {}
+        self.spans = []
+        self._masks = None
+        for table_id, shape, capacity, seat_map in tables:
+            base = len(self.seat_table)
+            self.spans.append((base, capacity, shape == "round" and capacity > 2))
+            for pos, adj in enumerate(seat_adjacency(shape, capacity, venue), start=1):
+                self.index[(table_id, pos)] = len(self.seat_table)
+                self.seat_table.append(table_id)
+                self.seat_pos.append(pos)
+                self.neighbours.append(tuple(base + p - 1 for p in adj))
+                gender = seat_map.get(pos)
+                self.fixed_gender.append(_gender_code(gender) if gender else 0)
+
+    def __len__(self):
+        return len(self.seat_table)
+
+    @property
+    def masks(self):
+        """Adjacency bitsets: bit j of masks[i] is set when seats i and j touch."""
+        if self._masks is None:
+            self._masks = [sum(1 << j for j in adj) for adj in self.neighbours]
+        return self._masks
+
+    def seat_of(self, seated):
+        """Map {invitation_id: (table_id, pos)} to {invitation_id: seat index}."""
+        return {inv: self.index[key] for inv, key in (seated or {}).items() if key in self.index}
+
+
+def score_genders(neighbours, genders):
+    """Count adjacent seat pairs occupied by guests of the same gender."""
+    score = 0
+    for i, g in enumerate(genders):
+        if not g:
+            continue
+        for j in neighbours[i]:
+            if j > i and genders[j] == g:
+                score += 1
+    return score
+
+
+def table_score(shape, capacity, seat_map, venue=False):
+    """Same-gender neighbour count for one table given {seat_position: gender}."""
+    graph = _SeatGraph([(None, shape, capacity, seat_map)], venue)
+    return score_genders(graph.neighbours, graph.fixed_gender)
+
+
+def _local_cost(neighbours, genders, seat):
+    g = genders[seat]
+    if not g:
+        return 0
+    return sum(1 for j in neighbours[seat] if genders[j] == g)
+
+
+class _PairPenalties:
+    """Weighted guest pairs that cost extra when seated side by side.
+
+    Covers keep-apart pairs and, in fresh mode, pairs who sat together
+    before. Partners already seated are folded into one bitset per guest and
+    weight, so checking a seat against them is an AND with its adjacency mask.
+    """
+
+    def __init__(self, pairs, guests, fixed_seats, masks):
+        index = {guest[0]: k for k, guest in enumerate(guests)}
+        self.masks = masks
+        self.partners = [[] for _ in guests]
+        self.fixed = [{} for _ in guests]
+        for a, b, weight in pairs:
+            ka, kb = index.get(a), index.get(b)
+            if ka is not None and kb is not None:
+                if ka != kb:
+                    self.partners[ka].append((kb, weight))
+                    self.partners[kb].append((ka, weight))
+            elif ka is not None and b in fixed_seats:
+                self._add_fixed(ka, fixed_seats[b], weight)
+            elif kb is not None and a in fixed_seats:
+                self._add_fixed(kb, fixed_seats[a], weight)
+        self.constrained = [bool(p or f) for p, f in zip(self.partners, self.fixed)]
+
+    def _add_fixed(self, k, seat, weight):
+        self.fixed[k][weight] = self.fixed[k].get(weight, 0) | 1 << seat
+
+    def cost(self, k, seat, seat_of):
+        mask = self.masks[seat]
+        total = 0
+        for weight, seats in self.fixed[k].items():
+            total += weight * bin(mask & seats).count("1")
+        for other, weight in self.partners[k]:
+            if seat_of[other] >= 0 and mask >> seat_of[other] & 1:
+                total += weight
+        return total
+
+    def total(self, seat_of):
+        total = 0
+        for k, seat in enumerate(seat_of):
+            if seat < 0 or not self.constrained[k]:
+                continue
+            mask = self.masks[seat]
+            for weight, seats in self.fixed[k].items():
+                total += weight * bin(mask & seats).count("1")
+            total += sum(weight for other, weight in self.partners[k]
+                         if other > k and seat_of[other] >= 0 and mask >> seat_of[other] & 1)
+        return total
+
+
+def _weighted_pairs(snapshot):
+    """Keep-apart and repeat-neighbour pairs of a snapshot as (a, b, weight)."""
+    pairs = [(a, b, APART_PENALTY) for a, b in snapshot.get("apart") or ()]
+    pairs.extend((a, b, REPEAT_PENALTY * count) for a, b, count in snapshot.get("repeats") or ())
+    return pairs
+
+
+def optimize(snapshot, time_budget_ms=DEFAULT_TIME_BUDGET_MS, rng=None, stop=None,
+             max_time_budget_ms=MAX_TIME_BUDGET_MS):
+    """Place snapshot guests on free seats minimising same-gender neighbours.
+
+    Runs simulated annealing over swaps of free seats, starting from a random
+    placement, and stops at the time budget (capped at max_time_budget_ms),
+    once an iteration cap scaled to the problem size is reached, or as soon
+    as a perfect plan is found. Budgets beyond MAX_TIME_BUDGET_MS (background
+    jobs) raise the iteration cap in proportion.
+    Keep-apart pairs seated side by side cost APART_PENALTY each, and pairs
+    listed in "repeats" cost REPEAT_PENALTY per earlier time together.
+
+    ``stop(best_score)`` is called every _CHECK_EVERY iterations with the
+    score of the best placement so far; returning True ends the search early
+    with that placement.
+
+    Returns (placements, score) where placements is a list of
+    (invitation_id, table_id, seat_position) tuples.
+    """
+    rng = rng or random
+    budget_ms = min(max(int(time_budget_ms or 0), 1), max_time_budget_ms)
+    budget = budget_ms / 1000.0
+    graph = _SeatGraph(snapshot["tables"], snapshot.get("venue", False))
+    guests = snapshot["guests"]
+
+    free = [i for i in range(len(graph)) if not graph.fixed_gender[i]]
+    if not guests or not free:
+        return [], score_genders(graph.neighbours, graph.fixed_gender)
+
+    # occupant[seat] is a guest index, or -1 for empty / fixed seats
+    occupant = [-1] * len(graph)
+    seat_of = [-1] * len(guests)
+    genders = list(graph.fixed_gender)
+    order = list(free)
+    rng.shuffle(order)
+    for k, seat in enumerate(order[:len(guests)]):
+        occupant[seat] = k
+        seat_of[k] = seat
+        genders[seat] = _gender_code(guests[k][1])
+
+    neighbours = graph.neighbours
+    cost = score_genders(neighbours, genders)
+
+    pairs = _weighted_pairs(snapshot)
+    apart = None
+    if pairs:
+        apart = _PairPenalties(pairs, guests, graph.seat_of(snapshot.get("seated")), graph.masks)
+        cost += apart.total(seat_of)
+
+    def seat_cost(seat):
+        c = _local_cost(neighbours, genders, seat)
+        k = occupant[seat]
+        if k >= 0 and apart.constrained[k]:
+            c += apart.cost(k, seat, seat_of)
+        return c
+
+    best_cost = cost
+    best_occupant = list(occupant)
+
+    n_free = len(free)
+    max_iters = max(2000, 400 * n_free) * max(1, budget_ms // MAX_TIME_BUDGET_MS)
+    # Penalties between two fixed guests never change, so the running cost
+    # leaves them out; add them back for the scores handed to stop
+    fixed_cost = 0
+    if stop is not None and apart is not None:
+        fixed_cost = (score_placements(snapshot, [])
+                      - score_genders(neighbours, graph.fixed_gender))
+    started = time.perf_counter()
+    progress = 0.0
+    temperature = _T_START
+    it = 0
+    while it < max_iters and cost > 0 and n_free > 1:
+        it += 1
+        if it % _CHECK_EVERY == 0:
+            if cost < best_cost:
+                best_cost = cost
+                best_occupant = list(occupant)
+            elapsed = time.perf_counter() - started
+            if elapsed >= budget or (stop is not None and stop(best_cost + fixed_cost)):
+                break
+            progress = max(it / max_iters, elapsed / budget)
+            temperature = _T_START * (_T_END / _T_START) ** progress
+
+        a = free[rng.randrange(n_free)]
+        b = free[rng.randrange(n_free)]
+        ga, gb = genders[a], genders[b]
+        if apart is None:
+            if ga == gb:
+                continue
+            before = _local_cost(neighbours, genders, a) + _local_cost(neighbours, genders, b)
+            genders[a], genders[b] = gb, ga
+            after = _local_cost(neighbours, genders, a) + _local_cost(neighbours, genders, b)
+            delta = after - before
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                occupant[a], occupant[b] = occupant[b], occupant[a]
+                cost += delta
+            else:
+                genders[a], genders[b] = ga, gb
+            continue
+
+        ka, kb = occupant[a], occupant[b]
+        if a == b or (ga == gb and not ((ka >= 0 and apart.constrained[ka])
+                                        or (kb >= 0 and apart.constrained[kb]))):
+            continue
+        before = seat_cost(a) + seat_cost(b)
+        _swap_seats(a, b, genders, occupant, seat_of)
+        delta = seat_cost(a) + seat_cost(b) - before
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            cost += delta
+        else:
+            _swap_seats(a, b, genders, occupant, seat_of)
+
+    if cost <= best_cost:
+        best_cost = cost
+        best_occupant = occupant
+
+    placements = []
+    for seat, k in enumerate(best_occupant):
+        if k >= 0:
+            placements.append((guests[k][0], graph.seat_table[seat], graph.seat_pos[seat]))
+    return placements, best_cost
+
+
+def _swap_seats(a, b, genders, occupant, seat_of):
+    genders[a], genders[b] = genders[b], genders[a]
+    occupant[a], occupant[b] = occupant[b], occupant[a]
+    if occupant[a] >= 0:
+        seat_of[occupant[a]] = a
+    if occupant[b] >= 0:
+        seat_of[occupant[b]] = b
+
+
+class SeatingState:
+    """Incrementally maintained gender layout and score of an event's plan.
+
+    Holds a seat → gender array and the same-gender neighbour count for each
+    table, so a single seat change costs O(neighbours) instead of a rescore.
+    """
+
+    def __init__(self, tables, venue=False):
+        """tables: iterable of (table_id, shape, capacity, {seat_position: gender})."""
+        self.tables = {}
+        self.table_scores = {}
+        for table_id, shape, capacity, seat_map in tables:
+            genders = [0] * capacity
+            for pos, gender in seat_map.items():
+                if 1 <= pos <= capacity:
+                    genders[pos - 1] = _gender_code(gender)
+            self.tables[table_id] = (seat_adjacency(shape, capacity, venue), genders)
+            self.table_scores[table_id] = 0
+            for pos, g in enumerate(genders, start=1):
+                self.table_scores[table_id] += self._seat_cost(table_id, pos, g, upper_only=True)
+        self.score = sum(self.table_scores.values())
+
+    def _seat_cost(self, table_id, pos, g, upper_only=False):
+        if not g:
+            return 0
+        adj, genders = self.tables[table_id]
+        return sum(1 for p in adj[pos - 1]
+                   if genders[p - 1] == g and (not upper_only or p > pos))
+
+    def set_seat(self, table_id, pos, gender):
+        """Seat a guest of ``gender`` at a position (None empties it)."""
+        if table_id not in self.tables:
+            return
+        _, genders = self.tables[table_id]
+        if not 1 <= pos <= len(genders):
+            return
+        old = genders[pos - 1]
+        new = _gender_code(gender) if gender else 0
+        if old == new:
+            return
+        delta = self._seat_cost(table_id, pos, new) - self._seat_cost(table_id, pos, old)
+        genders[pos - 1] = new
+        self.table_scores[table_id] += delta
+        self.score += delta
+
+    def apply(self, moves):
+        """Apply (table_id, seat_position, gender_or_None) writes in order.
+
+        Returns {table_id: table_score} for the tables that were touched.
+        """
+        changed = set()
+        for table_id, pos, gender in moves:
+            self.set_seat(table_id, pos, gender)
+            if table_id in self.tables:
+                changed.add(table_id)
+        return {table_id: self.table_scores[table_id] for table_id in changed}
+
+
+def score_placements(snapshot, placements):
+    """Cost of the snapshot with ``placements`` seated.
+
+    That is the same-gender neighbour count, plus the keep-apart and
+    repeat-neighbour penalties of pairs seated side by side.
+    """
+    graph = _SeatGraph(snapshot["tables"], snapshot.get("venue", False))
+    genders = list(graph.fixed_gender)
+    gender_of = dict(snapshot["guests"])
+    for invitation_id, table_id, pos in placements:
+        genders[graph.index[(table_id, pos)]] = _gender_code(gender_of[invitation_id])
+    score = score_genders(graph.neighbours, genders)
+    pairs = _weighted_pairs(snapshot)
+    if pairs:
+        seat_of = graph.seat_of(snapshot.get("seated"))
+        seat_of.update(graph.seat_of({inv: (t, p) for inv, t, p in placements}))
+        masks = graph.masks
+        for a, b, weight in pairs:
+            if a in seat_of and b in seat_of and masks[seat_of[a]] >> seat_of[b] & 1:
+                score += weight
+    return score
+
+
+class _DisjointSet:
+    """Union-find over hashable items, with path halving and union by size."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+    def groups(self):
+        members = defaultdict(list)
+        for x in self.parent:
+            members[self.find(x)].append(x)
+        return list(members.values())
+
+
+def together_groups(links):
+    """Collapse keep-together links into disjoint groups of two or more."""
+    sets = _DisjointSet()
+    for link in links:
+        link = list(link)
+        for other in link[1:]:
+            sets.union(link[0], other)
+    return [sorted(group) for group in sets.groups() if len(group) > 1]
+
+
+def _interleave_genders(members, gender_of):
+    """Order a group so men and women alternate as far as possible."""
+    men = [m for m in members if gender_of[m] == "Male"]
+    women = [m for m in members if gender_of[m] == "Female"]
+    others = [m for m in members if gender_of[m] not in ("Male", "Female")]
+    first, second = (men, women) if len(men) >= len(women) else (women, men)
+    ordered = []
+    for i, m in enumerate(first):
+        ordered.append(m)
+        if i < len(second):
+            ordered.append(second[i])
+    return ordered + others
+
+
+def _seats_near(graph, free, anchors, k):
+    """k free seats reachable from the anchor seats through free seats only."""
+    seen = set(anchors)
+    queue = deque(anchors)
+    found = []
+    while queue and len(found) < k:
+        for n in graph.neighbours[queue.popleft()]:
+            if n not in seen:
+                seen.add(n)
+                if free[n]:
+                    found.append(n)
+                    queue.append(n)
+    return found[:k] if len(found) >= k else None
+
+
+def _free_run(graph, free, k, rng):
+    """k consecutive free seats at one table, preferring runs that start
+    against a taken seat or a table end so gaps don't fragment."""
+    snug, loose = [], []
+    for base, capacity, wrap in graph.spans:
+        if k > capacity:
+            continue
+        for start in range(capacity if wrap else capacity - k + 1):
+            seats = [base + (start + i) % capacity for i in range(k)]
+            if all(free[s] for s in seats):
+                before = (start - 1) % capacity if wrap else start - 1
+                (snug if before < 0 or not free[base + before] else loose).append(seats)
+    if snug or loose:
+        return rng.choice(snug or loose)
+    # No run long enough: settle for the roomiest table if the group fits
+    base, capacity, _ = max(graph.spans, key=lambda span: sum(free[span[0]:span[0] + span[1]]))
+    seats = [s for s in range(base, base + capacity) if free[s]]
+    return seats[:k] if len(seats) >= k else None
+
+
+def place_groups(snapshot, rng=None):
+    """Seat keep-together groups on adjacent free seats before anything else.
+
+    Links are collapsed into groups with union-find; groups with a member
+    already seated grow outwards from that seat, the others take a run of
+    consecutive free seats, largest groups first. Groups that fit nowhere are
+    left to the main placement.
+
+    Returns (placements, rest) where rest is the snapshot left to place, with
+    the group members seated in it.
+    """
+    groups = together_groups(snapshot.get("together") or ())
+    if not groups:
+        return [], snapshot
+    rng = rng or random
+    graph = _SeatGraph(snapshot["tables"], snapshot.get("venue", False))
+    gender_of = dict(snapshot["guests"])
+    fixed_seats = graph.seat_of(snapshot.get("seated"))
+    free = [not g for g in graph.fixed_gender]
+
+    rng.shuffle(groups)
+    groups.sort(key=len, reverse=True)
+    placements = []
+    for group in groups:
+        movers = [inv for inv in group if inv in gender_of]
+        if not movers:
+            continue
+        anchors = [fixed_seats[inv] for inv in group if inv in fixed_seats]
+        seats = (_seats_near(graph, free, anchors, len(movers)) if anchors else None) \
+            or _free_run(graph, free, len(movers), rng)
+        if not seats:
+            continue
+        for inv, seat in zip(_interleave_genders(movers, gender_of), seats):
+            free[seat] = False
+            placements.append((inv, graph.seat_table[seat], graph.seat_pos[seat]))
+
+    if not placements:
+        return [], snapshot
+    seat_maps = {table_id: dict(seat_map) for table_id, _, _, seat_map in snapshot["tables"]}
+    seated = dict(snapshot.get("seated") or {})
+    for inv, table_id, pos in placements:
+        seat_maps[table_id][pos] = gender_of[inv]
+        seated[inv] = (table_id, pos)
+    rest = dict(snapshot)
+    rest["tables"] = [(table_id, shape, capacity, seat_maps[table_id])
+                      for table_id, shape, capacity, _ in snapshot["tables"]]
+    rest["guests"] = [g for g in snapshot["guests"] if g[0] not in seated]
+    rest["seated"] = seated
+    rest["together"] = ()
+    return placements, rest
+
+
+def separate_apart(snapshot, placements, rng=None):
+    """Move guests out of keep-apart clashes left by a placement strategy.
+
+    Each clashing guest swaps with a same-gender guest first (keeping the
+    gender pattern), then an empty seat, then anyone, taking the first
+    option that leaves neither guest next to someone they must avoid.
+    """
+    if not snapshot.get("apart") or not placements:
+        return placements
+    rng = rng or random
+    graph = _SeatGraph(snapshot["tables"], snapshot.get("venue", False))
+    masks = graph.masks
+    gender_of = dict(snapshot["guests"])
+    partners = defaultdict(list)
+    for a, b in snapshot["apart"]:
+        if a != b:
+            partners[a].append(b)
+            partners[b].append(a)
+    seat_of = graph.seat_of(snapshot.get("seated"))
+    occupant = {}
+    for inv, table_id, pos in placements:
+        seat = graph.index[(table_id, pos)]
+        seat_of[inv] = seat
+        occupant[seat] = inv
+
+    def clashes(inv):
+        mask = masks[seat_of[inv]]
+        return any(p in seat_of and mask >> seat_of[p] & 1 for p in partners[inv])
+
+    def move(inv, seat):
+        seat_of[inv] = seat
+        occupant[seat] = inv
+
+    for inv, _, _ in placements:
+        if inv not in partners or not clashes(inv):
+            continue
+        home = seat_of[inv]
+        same = [s for s, o in occupant.items() if s != home and gender_of[o] == gender_of[inv]]
+        empty = [s for s in range(len(graph)) if not graph.fixed_gender[s] and s not in occupant]
+        other = [s for s, o in occupant.items() if s != home and gender_of[o] != gender_of[inv]]
+        for candidates in (same, empty, other):
+            rng.shuffle(candidates)
+        for target in same + empty + other:
+            displaced = occupant.get(target)
+            move(inv, target)
+            if displaced is not None:
+                move(displaced, home)
+            else:
+                del occupant[home]
+            if not clashes(inv) and (displaced is None or not clashes(displaced)):
+                break
+            move(inv, home)
+            if displaced is not None:
+                move(displaced, target)
+            else:
+                del occupant[target]
+
+    return [(inv, graph.seat_table[seat], graph.seat_pos[seat]) for seat, inv in occupant.items()]
+
+
+def place_random(snapshot, rng=None):
+    """Randomly distribute snapshot guests across free seats."""
+    rng = rng or random
+    guests = list(snapshot["guests"])
+    rng.shuffle(guests)
+    seats = [(table_id, pos)
+             for table_id, _, capacity, seat_map in snapshot["tables"]
+             for pos in range(1, capacity + 1) if pos not in seat_map]
+    rng.shuffle(seats)
+    return [(invitation_id, table_id, pos)
+            for (invitation_id, _), (table_id, pos) in zip(guests, seats)]
+
+
+def allocate_genders(tables, n_male, n_female):
+    """Decide how many men and women each table gets, across the whole room.
+
+    Tables are filled in order, as many guests as they have free seats. The
+    men / women split is then chosen globally to minimise the sum over
+    tables of (men - women)², seated guests included. That is a convex
+    min-cost flow from the two gender pools to the tables; with unit
+    increments and convex per-table costs, taking the cheapest next man from
+    a heap is exact, so it runs in O(guests · log tables).
+
+    Returns {table_id: (n_male, n_female)}.
+    """
+    remaining = n_male + n_female
+    rows = []
+    for table_id, _, capacity, seat_map in tables:
+        seats = min(max(capacity - len(seat_map), 0), remaining)
+        remaining -= seats
+        imbalance = sum(1 if g == "Male" else -1 if g == "Female" else 0
+                        for g in seat_map.values())
+        # With m men the table's imbalance is base + 2m
+        rows.append((table_id, seats, imbalance - seats))
+
+    total = sum(seats for _, seats, _ in rows)
+    lo, hi = max(0, total - n_female), min(n_male, total)
+
+    def marginal(base, m):
+        return (base + 2 * m + 2) ** 2 - (base + 2 * m) ** 2
+
+    heap = [(marginal(base, 0), i) for i, (_, seats, base) in enumerate(rows) if seats]
+    heapq.heapify(heap)
+    men = [0] * len(rows)
+    picks = []
+    cost = sum(base * base for _, _, base in rows)
+    best_cost, best_k = (cost, 0) if lo == 0 else (None, lo)
+    for k in range(1, hi + 1):
+        delta, i = heapq.heappop(heap)
+        men[i] += 1
+        picks.append(i)
+        cost += delta
+        if men[i] < rows[i][1]:
+            heapq.heappush(heap, (marginal(rows[i][2], men[i]), i))
+        if k >= lo and (best_cost is None or cost < best_cost):
+            best_cost, best_k = cost, k
+
+    men = [0] * len(rows)
+    for i in picks[:best_k]:
+        men[i] += 1
+    return {table_id: (men[i], seats - men[i]) for i, (table_id, seats, _) in enumerate(rows)}
+
+
+def place_alternating(snapshot, rng=None):
+    """Assign guests to maximize M/F alternation, respecting seated guests.
+
+    Strategy: allocate_genders first decides how many men and women each
+    table gets. Each table then builds the best possible gender pattern
+    around the seats already taken and fills its free seats accordingly,
+    seats whose pattern gender has run out taking the rest of its share.
+
+    Table topology:
+    - Round: seat N wraps to seat 1 (circular)
+    - Rectangular: seats go clockwise — top row L→R, right end, bottom row R→L, left end
+    - Long/Banquet: top row L→R then bottom row R→L (two parallel rows, no wrap)
+
+    The pattern alternates along that sequential numbering, which matches
+    seat_adjacency's default pos-1 ↔ pos ↔ pos+1 neighbours (wrapping on
+    round tables). With "venue" set the plan is scored on geometry-aware
+    adjacency instead (seats facing each other, end seats touching both
+    rows), so the pattern is only a good start there, not an optimum; use
+    optimize for the best large-venue plan.
+    """
+    rng = rng or random
+    pools = {
+        "Male": [g for g in snapshot["guests"] if g[1] == "Male"],
+        "Female": [g for g in snapshot["guests"] if g[1] == "Female"],
+    }
+    rng.shuffle(pools["Male"])
+    rng.shuffle(pools["Female"])
+    quotas = allocate_genders(snapshot["tables"], len(pools["Male"]), len(pools["Female"]))
+
+    placements = []
+    for table_id, shape, capacity, seat_map in snapshot["tables"]:
+        n_male, n_female = quotas[table_id]
+        if not n_male + n_female:
+            continue
+        pattern = _ideal_pattern(seat_map, capacity, shape == "round", n_male, n_female)
+        left = {"Male": n_male, "Female": n_female}
+        unmatched = []
+        for pos in sorted(pattern):
+            gender = pattern[pos]
+            if left.get(gender):
+                left[gender] -= 1
+                placements.append((pools[gender].pop()[0], table_id, pos))
+            else:
+                unmatched.append(pos)
+        rest = [pools[g].pop() for g in ("Male", "Female") for _ in range(left[g])]
+        rng.shuffle(rest)
+        for (invitation_id, _), pos in zip(rest, unmatched):
+            placements.append((invitation_id, table_id, pos))
+    return placements
+
+
+def _ideal_pattern(seat_map, capacity, is_round, n_males_avail, n_females_avail):
+    """Compute the ideal gender for each empty seat to maximize alternation.
+
+    Strategy: space the minority gender evenly across ALL seats (including
+    locked ones), then for each empty seat, read off the ideal gender.
+    Locked seats are constraints; the pattern wraps around them.
+    """
+    n = capacity
+    empty_positions = sorted(p for p in range(1, n + 1) if p not in seat_map)
+    n_empty = len(empty_positions)
+    if n_empty == 0:
+        return {}
+
+    existing_m = sum(1 for g in seat_map.values() if g == "Male")
+    existing_f = sum(1 for g in seat_map.values() if g == "Female")
+
+    # Calculate how many of each gender to place
+    need_m = min(n_males_avail, n_empty)
+    need_f = min(n_females_avail, n_empty)
+    # Try to balance: aim for ~50/50 total
+    total = existing_m + existing_f + n_empty
+    ideal_m_total = (total + 1) // 2
+    ideal_f_total = total - ideal_m_total
+    want_m = max(0, min(ideal_m_total - existing_m, n_males_avail, n_empty))
+    want_f = max(0, min(ideal_f_total - existing_f, n_females_avail, n_empty))
+    leftover = n_empty - want_m - want_f
+    if leftover > 0:
+        if n_males_avail - want_m > 0:
+            extra = min(leftover, n_males_avail - want_m)
+            want_m += extra
+            leftover -= extra
+        if leftover > 0 and n_females_avail - want_f > 0:
+            extra = min(leftover, n_females_avail - want_f)
+            want_f += extra
+
+    total_m = existing_m + want_m
+    total_f = existing_f + want_f
+    if total_f <= total_m:
+        min_g, maj_g = "Female", "Male"
+        n_min_total, n_maj_total = total_f, total_m
+        need_min, need_maj = want_f, want_m
+    else:
+        min_g, maj_g = "Male", "Female"
+        n_min_total, n_maj_total = total_m, total_f
+        need_min, need_maj = want_m, want_f
+
+    # Build ideal full-table pattern: place minority at evenly-spaced positions
+    # across ALL n seats, then check if empty seats match.
+    # The spacing between minority members should be ~ n / n_min_total.
+    if n_min_total == 0:
+        return {p: maj_g for p in empty_positions}
+
+    spacing = n / n_min_total  # e.g., 10 seats / 3 minority = every 3.33 seats
+
+    # Find best starting offset to align with existing locked minority positions
+    # Try each possible offset and pick the one that conflicts least with locks
+    best_offset = 0
+    best_conflicts = n + 1
+    for trial_offset in range(n):
+        conflicts = 0
+        min_positions = set()
+        for i in range(n_min_total):
+            pos = int(round(trial_offset + i * spacing)) % n + 1
+            min_positions.add(pos)
+        # Check conflicts with locked seats
+        for pos, gender in seat_map.items():
+            if pos in min_positions and gender != min_g:
+                conflicts += 1
+            elif pos not in min_positions and gender == min_g:
+                conflicts += 1
+        if conflicts < best_conflicts:
+            best_conflicts = conflicts
+            best_offset = trial_offset
+
+    # Generate minority positions with best offset
+    minority_positions = set()
+    for i in range(n_min_total):
+        pos = int(round(best_offset + i * spacing)) % n + 1
+        minority_positions.add(pos)
+
+    # Build the result: for each empty position, assign ideal gender
+    result = {}
+    min_placed = 0
+    maj_placed = 0
+    for pos in empty_positions:
+        if pos in minority_positions and min_placed < need_min:
+            result[pos] = min_g
+            min_placed += 1
+        elif pos not in minority_positions and maj_placed < need_maj:
+            result[pos] = maj_g
+            maj_placed += 1
+        else:
+            # Fallback: assign whatever we still need
+            if min_placed < need_min:
+                result[pos] = min_g
+                min_placed += 1
+            else:
+                result[pos] = maj_g
+                maj_placed += 1
+
+    return result
+
+
+_PLACERS = {"random": place_random, "alternating": place_alternating}
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _run_restart(snapshot, mode, seed, time_budget_ms, stop=None,
+                 max_time_budget_ms=MAX_TIME_BUDGET_MS):
+    """One seeded search; module-level so worker processes can unpickle it."""
+    rng = random.Random(seed)
+    grouped, rest = place_groups(snapshot, rng)
+    if mode in ("optimize", "fresh"):
+        placements, _ = optimize(rest, time_budget_ms=time_budget_ms, rng=rng, stop=stop,
+                                 max_time_budget_ms=max_time_budget_ms)
+    else:
+        placements = separate_apart(rest, _PLACERS[mode](rest, rng), rng)
+    placements = grouped + placements
+    return placements, score_placements(snapshot, placements)
+
+
+def _get_pool(workers):
+    """Shared process pool, started lazily and resized when workers changes.
+
+    Uses the spawn start method: forking a threaded web worker can copy locks
+    held by other threads into the child.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def search(snapshot, mode="optimize", restarts=1, seed=None,
+           time_budget_ms=DEFAULT_TIME_BUDGET_MS, workers=1, progress=None,
+           max_time_budget_ms=MAX_TIME_BUDGET_MS):
+    """Run independently seeded restarts of a placement mode, keep the best.
+
+    Restart i uses ``random.Random(seed + i)``, so a given seed always yields
+    the same candidates regardless of how many workers run them. With
+    workers > 1 the restarts are spread across a process pool, falling back
+    to running them inline if the pool is unavailable. time_budget_ms bounds
+    the whole search (capped at max_time_budget_ms) and is shared between
+    restarts that run in sequence.
+
+    ``progress(completed, best_score)`` is called as each restart finishes,
+    and for restarts run inline also every _PROGRESS_EVERY_S seconds while
+    one is annealing, best_score then including the running restart's best
+    placement so far.
+    Returning False stops the search early with the best plan so far, which
+    for a restart cut short is the best placement it had reached.
+
+    Returns (placements, score) of the best restart; ties go to the lowest
+    restart index.
+    """
+    if mode not in ("optimize", "fresh") + tuple(_PLACERS):
+        raise ValueError(f"Unknown mode: {mode}")
+    restarts = min(max(int(restarts or 1), 1), MAX_RESTARTS)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    parallel = min(max(int(workers or 1), 1), restarts)
+    budget = min(max(int(time_budget_ms or 0), 1), max_time_budget_ms)
+    per_restart = max(1, budget * parallel // restarts)
+    seeds = [seed + i for i in range(restarts)]
+
+    results = {}
+
+    def report(running=None):
+        scores = [score for _, score in results.values()]
+        if running is not None:
+            scores.append(running)
+        return progress(len(results), min(scores)) is not False
+
+    def finished(index, result):
+        results[index] = result
+        return progress is None or report()
+
+    stop = None
+    if progress is not None:
+        last_report = [time.perf_counter()]
+
+        def stop(best_score):
+            now = time.perf_counter()
+            if now - last_report[0] < _PROGRESS_EVERY_S:
+                return False
+            last_report[0] = now
+            return not report(best_score)
+
+    stopped = False
+    if parallel > 1:
+        pool = _get_pool(parallel)
+        try:
+            futures = {pool.submit(_run_restart, snapshot, mode, s, per_restart,
+                                   max_time_budget_ms=max_time_budget_ms): i
+                       for i, s in enumerate(seeds)}
+            for future in as_completed(futures):
+                if not finished(futures[future], future.result()):
+                    stopped = True
+                    for other in futures:
+                        other.cancel()
+                    break
+        except (BrokenProcessPool, OSError):
+            _discard_pool(pool)
+    if not stopped:
+        for i, s in enumerate(seeds):
+            if i in results:
+                continue
+            if not finished(i, _run_restart(snapshot, mode, s, per_restart, stop,
+                                            max_time_budget_ms)):
+                break
+
+    best = min(results, key=lambda i: (results[i][1], i))
+    return results[best]
+
+
+def _first_fit_decreasing(sizes, capacity):
+    """Pack item sizes into bins of ``capacity``; returns bins of item indexes."""
+    loads, bins = [], []
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        for b, load in enumerate(loads):
+            if load + sizes[i] <= capacity:
+                loads[b] += sizes[i]
+                bins[b].append(i)
+                break
+        else:
+            loads.append(sizes[i])
+            bins.append([i])
+    return bins
+
+
+def plan_table_layout(group_sizes, table_types):
+    """Tables for guests arriving in groups to be kept together.
+
+    Packs the groups first-fit-decreasing into the fewest tables of the
+    largest allowed capacity, then repacks them into the smallest capacity
+    that needs no more tables, so tables come out evenly filled. Each table
+    finally shrinks to the smallest allowed capacity that holds its guests.
+    Groups larger than the largest table are split across tables.
+
+    table_types lists the allowed (shape, capacity) pairs; a capacity takes
+    the shape of its first pair. Returns [(shape, capacity, guests)].
+    """
+    shape_of = {}
+    for shape, capacity in table_types:
+        shape_of.setdefault(capacity, shape)
+    capacities = sorted(shape_of)
+    largest = capacities[-1]
+    sizes = []
+    for size in group_sizes:
+        while size > largest:
+            sizes.append(largest)
+            size -= largest
+        if size > 0:
+            sizes.append(size)
+    if not sizes:
+        return []
+
+    bins = _first_fit_decreasing(sizes, largest)
+    total = sum(sizes)
+    for capacity in capacities:
+        if capacity * len(bins) >= total and capacity >= max(sizes):
+            packed = _first_fit_decreasing(sizes, capacity)
+            if len(packed) <= len(bins):
+                bins = packed
+                break
+
+    layout = []
+    for b in bins:
+        guests = sum(sizes[i] for i in b)
+        capacity = next(c for c in capacities if c >= guests)
+        layout.append((shape_of[capacity], capacity, guests))
+    return layout
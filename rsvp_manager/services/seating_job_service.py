@@ -0,0 +1,198 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from rsvp_manager.extensions import db
+from rsvp_manager.models import Event, SeatingJob
+from rsvp_manager.services import seating_engine, seating_service
+from rsvp_manager.services.cohost_service import ROLE_LEVELS, get_event_with_role
+
+logger = logging.getLogger(__name__)
+
+SEATING_JOB_KINDS = ("auto_assign", "shuffle")
+ACTIVE_STATUSES = ("queued", "running")
+
+# Background runs may search far longer than a request could
+MAX_JOB_TIME_BUDGET_MS = 120000
+# Jobs still active after this long were lost with their worker process
+JOB_STALE_AFTER = timedelta(minutes=10)
+
+_executor_lock = threading.Lock()
+
+
+def _executor():
+    with _executor_lock:
+        executor = current_app.extensions.get("seating_job_executor")
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=current_app.config["SEATING_JOB_THREADS"],
+                thread_name_prefix="seating-job",
+            )
+            current_app.extensions["seating_job_executor"] = executor
+        return executor
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _expire_if_stale(job):
+    created_at = job.created_at.replace(tzinfo=job.created_at.tzinfo or timezone.utc)
+    if job.status in ACTIVE_STATUSES and _now() - created_at > JOB_STALE_AFTER:
+        job.status = "failed"
+        job.error = "The seating job was interrupted."
+        job.finished_at = _now()
+        db.session.commit()
+
+
+def get_job(event, job_id):
+    job = SeatingJob.query.filter_by(id=job_id, event_id=event.id).first()
+    if job:
+        _expire_if_stale(job)
+    return job
+
+
+def get_jobs(event, limit=20):
+    jobs = SeatingJob.query.filter_by(event_id=event.id).order_by(
+        SeatingJob.id.desc()
+    ).limit(limit).all()
+    for job in jobs:
+        _expire_if_stale(job)
+    return jobs
+
+
+def submit_job(event, kind, mode="optimize", acting_user_id=None, time_budget_ms=None,
+               restarts=1, seed=None):
+    """Queue a background auto-assign or shuffle and return the job.
+
+    The run is checked up front (mode, free seats, guests to place) so bad
+    requests fail immediately; only one job per event is active at a time.
+    """
+    if kind not in SEATING_JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if mode not in seating_service.SEATING_MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    time_budget_ms = time_budget_ms or seating_engine.DEFAULT_TIME_BUDGET_MS
+    if time_budget_ms > MAX_JOB_TIME_BUDGET_MS:
+        raise ValueError(f"time_budget_ms must be at most {MAX_JOB_TIME_BUDGET_MS}")
+    for job in SeatingJob.query.filter(
+        SeatingJob.event_id == event.id, SeatingJob.status.in_(ACTIVE_STATUSES)
+    ).all():
+        _expire_if_stale(job)
+        if job.status in ACTIVE_STATUSES:
+            raise ValueError("A seating job is already running for this event.")
+    seating_service.prepare_seating_search(event, shuffle=kind == "shuffle")
+
+    job = SeatingJob(
+        event_id=event.id, created_by=acting_user_id, kind=kind, mode=mode,
+        time_budget_ms=time_budget_ms, restarts=restarts,
+        seed=seating_service.new_seating_seed() if seed is None else seed,
+        status="queued", created_at=_now(),
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if current_app.config["SEATING_JOB_THREADS"] > 0:
+        _executor().submit(_run_job, app, job.id)
+    else:
+        _run_job(app, job.id)
+        db.session.refresh(job)
+    return job
+
+
+def cancel_job(job):
+    """Ask an active job to stop; a running job sees it at its next progress
+    check, about every half second while restarts run inline."""
+    if job.status not in ACTIVE_STATUSES:
+        raise ValueError(f"The seating job is already {job.status}.")
+    job.cancel_requested = True
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = _now()
+    db.session.commit()
+
+
+def _run_job(app, job_id):
+    """Run a job in its own app context and session, applying the best plan
+    found unless the job was cancelled or the plan changed meanwhile."""
+    with app.app_context():
+        try:
+            _execute(db.session.get(SeatingJob, job_id))
+        except Exception:
+            logger.exception("Seating job %s failed", job_id)
+            db.session.rollback()
+            job = db.session.get(SeatingJob, job_id)
+            job.status = "failed"
+            job.error = "The seating job failed unexpectedly."
+            job.finished_at = _now()
+            db.session.commit()
+
+
+def _execute(job):
+    if job is None or job.status != "queued":
+        return
+    job.status = "running"
+    job.started_at = _now()
+    db.session.commit()
+
+    event = db.session.get(Event, job.event_id)
+    shuffle = job.kind == "shuffle"
+    try:
+        version, snapshot = seating_service.prepare_seating_search(event, shuffle=shuffle)
+    except ValueError as e:
+        return _finish(job, "failed", str(e))
+    db.session.commit()  # end the read transaction before the long search
+
+    def progress(completed, best_score):
+        job.completed = completed
+        job.best_score = best_score
+        db.session.commit()
+        return not job.cancel_requested
+
+    placements, score = seating_service._search(
+        event, snapshot, job.mode, job.time_budget_ms, job.restarts, job.seed,
+        progress=progress, max_time_budget_ms=MAX_JOB_TIME_BUDGET_MS,
+    )
+    if job.cancel_requested:
+        return _finish(job, "cancelled")
+
+    _, role = get_event_with_role(job.event_id, job.created_by)
+    if role is None or ROLE_LEVELS.get(role, 0) < ROLE_LEVELS["cohost"]:
+        return _finish(job, "failed", "You no longer have access to this event's seating.")
+
+    job.status = "done"
+    job.best_score = score
+    job.finished_at = _now()
+    try:
+        # Commits the job's status together with the new plan
+        seating_service.apply_seating_search(event, version, placements, shuffle=shuffle,
+                                             acting_user_id=job.created_by,
+                                             run=(job.mode, job.seed, job.restarts))
+    except ValueError as e:
+        db.session.rollback()
+        _finish(job, "failed", str(e))
+
+
+def _finish(job, status, error=None):
+    job.status = status
+    job.error = error[:200] if error else None
+    job.finished_at = _now()
+    db.session.commit()
+
+
+def serialize_job(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "mode": job.mode,
+        "status": job.status,
+        "restarts": job.restarts,
+        "completed": job.completed,
+        "best_score": job.best_score,
+        "error": job.error,
+        "cancel_requested": job.cancel_requested,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
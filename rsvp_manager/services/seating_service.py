@@ -1,9 +1,46 @@
+import hashlib
+import json
 import random
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from itertools import combinations
+from flask import current_app
+from sqlalchemy import case, distinct, func
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from rsvp_manager.extensions import db
-from rsvp_manager.models import SeatingTable, SeatAssignment, Invitation, TABLE_SHAPES
+from rsvp_manager.models import (
+    Event, Guest, SeatingTable, SeatAssignment, Invitation, Tag, guest_tags,
+    SeatingConstraint, SeatNeighbour, SeatingRevision, TABLE_SHAPES, SEATING_CONSTRAINT_KINDS,
+)
+from rsvp_manager.services import seating_engine
 from rsvp_manager.services.history_service import log_action
 
 
+SEATING_MODES = ("random", "alternating", "optimize", "fresh")
+
+# Table capacity limits; venue mode lifts the cap for banquet-scale events
+MAX_TABLE_CAPACITY = 30
+VENUE_MAX_TABLE_CAPACITY = 500
+
+# Standard table sizes offered by the layout planner
+LAYOUT_CAPACITIES = (4, 6, 8, 10, 12, 14, 16, 18, 20, 24, 30)
+
+# Per-app cache of event_id → (seating_version, SeatingState)
+SEATING_STATE_CACHE_SIZE = 128
+_seating_states_lock = threading.Lock()
+
+# Per-app cache of serialized plans, keyed by _seating_plan_key
+SEATING_PLAN_CACHE_SIZE = 128
+_seating_plans_lock = threading.Lock()
+
+# Seating history: revisions kept per event, and how often a full keyframe
+# is stored instead of a diff against the previous revision
+SEATING_REVISION_LIMIT = 200
+SEATING_KEYFRAME_INTERVAL = 25
+
+
 def get_seating_plan(event):
     """Return full seating plan: tables with their seat assignments."""
     tables = SeatingTable.query.filter_by(event_id=event.id).order_by(
@@ -12,17 +49,6 @@ def get_seating_plan(event):
     return tables
 
 
-def _smart_capacity(guest_count):
-    """Return the smallest standard capacity that fits the guest count."""
-    options = [4, 6, 8, 10, 12, 14, 16, 18, 20, 24, 30]
-    # Round up to next even
-    cap = guest_count if guest_count % 2 == 0 else guest_count + 1
-    for opt in options:
-        if opt >= cap:
-            return opt
-    return 30
-
-
 def get_next_table_number(event_id):
     max_num = db.session.query(db.func.max(SeatingTable.table_number)).filter_by(
         event_id=event_id
@@ -30,11 +56,475 @@ def get_next_table_number(event_id):
     return (max_num or 0) + 1
 
 
+# -- Seating version & score state ---------------------------------------------
+
+def bump_seating_version(event):
+    """Atomically increment the event's seating version and return the new value."""
+    version = db.session.execute(
+        db.update(Event).where(Event.id == event.id).values(
+            seating_version=Event.seating_version + 1
+        ).returning(Event.seating_version),
+        execution_options={"synchronize_session": False},
+    ).scalar_one()
+    set_committed_value(event, "seating_version", version)
+    return version
+
+
+def bump_seating_versions_for_guest(guest_id):
+    """Bump the seating version of every event the guest is invited to, as
+    seating plans show guests' names and score their genders."""
+    invited_event_ids = db.session.query(Invitation.event_id).filter(
+        Invitation.guest_id == guest_id
+    )
+    Event.query.filter(Event.id.in_(invited_event_ids)).update(
+        {Event.seating_version: Event.seating_version + 1}, synchronize_session=False
+    )
+
+
+def _load_seating_state(event_id, venue=False):
+    tables = db.session.query(
+        SeatingTable.id, SeatingTable.shape, SeatingTable.capacity
+    ).filter(SeatingTable.event_id == event_id).all()
+    seat_maps = {t.id: {} for t in tables}
+    rows = db.session.query(
+        SeatAssignment.table_id, SeatAssignment.seat_position, Guest.gender
+    ).join(SeatingTable, SeatingTable.id == SeatAssignment.table_id).join(
+        Invitation, Invitation.id == SeatAssignment.invitation_id
+    ).join(Guest, Guest.id == Invitation.guest_id).filter(
+        SeatingTable.event_id == event_id
+    ).all()
+    for table_id, pos, gender in rows:
+        seat_maps[table_id][pos] = gender
+    return seating_engine.SeatingState(
+        ((t.id, t.shape, t.capacity, seat_maps[t.id]) for t in tables), venue
+    )
+
+
+def _seating_states():
+    return current_app.extensions.setdefault("seating_states", OrderedDict())
+
+
+def _store_seating_state(event_id, version, state):
+    cache = _seating_states()
+    with _seating_states_lock:
+        cache[event_id] = (version, state)
+        cache.move_to_end(event_id)
+        while len(cache) > SEATING_STATE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def get_seating_state(event, version=None):
+    """Return the SeatingState for the event's current seating version."""
+    if version is None:
+        version = event.seating_version
+    cache = _seating_states()
+    with _seating_states_lock:
+        cached = cache.get(event.id)
+        if cached and cached[0] == version:
+            cache.move_to_end(event.id)
+            return cached[1]
+    state = _load_seating_state(event.id, event.seating_venue_mode)
+    _store_seating_state(event.id, version, state)
+    return state
+
+
+def _advance_seating_state(event_id, version, moves):
+    """Carry the cached state from version - 1 to version by applying moves.
+
+    Drops the cache entry instead when the moves are unknown or another
+    change landed in between.
+    """
+    with _seating_states_lock:
+        cached = _seating_states().pop(event_id, None)
+    if moves is None or not cached or cached[0] != version - 1:
+        return None
+    state = cached[1]
+    state.apply(moves)
+    _store_seating_state(event_id, version, state)
+    return state
+
+
+def _commit_seating_change(event, acting_user_id=None, moves=None, log=True, record=True,
+                           run=None, tables=None, seats=None):
+    """Log, record a revision, bump the seating version, commit and update
+    the score state.
+
+    ``moves`` lists the (table_id, seat_position, gender_or_None) seat writes
+    made by the change. Returns the new plan score and the scores of the
+    tables the moves touched. Pass moves=None for bulk changes: the score
+    state is then rebuilt on next use and nothing is returned. Undo and redo
+    pass record=False as they move through existing revisions.
+
+    ``tables`` lists the tables whose seating changed (guests moved or seat
+    adjacency changed); by default those the moves touched, or every table
+    when moves is None. Only their neighbour rows are rewritten, and a change
+    that leaves every table alone keeps the recorded seed.
+
+    ``seats`` maps each invitation the change moved to its new
+    (table_id, seat_position, locked), or None when unseated. When given,
+    the revision is stored from it instead of diffing the whole plan, and
+    the result also carries the changed tables' seats and unseated entries
+    in the shape of serialize_seating_delta, so clients can patch their plan.
+
+    ``run`` is the (mode, seed, restarts) of a seeded auto-assign or shuffle
+    that made the change, stored on the event so the plan can be replayed.
+    Any other change to a table's seating clears it.
+    """
+    if tables is None and moves is not None:
+        tables = {table_id for table_id, _, _ in moves}
+    if tables is None or tables:
+        event.seating_seed_mode, event.seating_seed, event.seating_seed_restarts = (
+            run or (None, None, None)
+        )
+    if log:
+        log_action(event.user_id, "updated_seating", "event", event.id,
+                   f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
+    if record:
+        _record_revision(event, acting_user_id, seats)
+    _refresh_seat_neighbours(event, tables)
+    version = bump_seating_version(event)
+    db.session.commit()
+    state = _advance_seating_state(event.id, version, moves)
+    if moves is None:
+        return None
+    if state is None:
+        state = get_seating_state(event, version)
+    touched = sorted({table_id for table_id, _, _ in moves})
+    result = {
+        "score": state.score,
+        "changed_tables": [
+            {"id": table_id, "score": state.table_scores[table_id]}
+            for table_id in touched if table_id in state.table_scores
+        ],
+    }
+    if seats is not None:
+        table_ids = set(touched) | {seat[0] for seat in seats.values() if seat is not None}
+        result.update(_serialize_delta(
+            event, table_ids, [inv for inv, seat in seats.items() if seat is None],
+            [inv for inv, seat in seats.items() if seat is not None], state.score,
+        ))
+    return result
+
+
+# -- Neighbour history -----------------------------------------------------------
+
+def _refresh_seat_neighbours(event, table_ids=None):
+    """Rewrite the SeatNeighbour rows of the given tables (all when None)."""
+    if table_ids is not None and not table_ids:
+        return
+    stale = SeatNeighbour.query.filter(SeatNeighbour.event_id == event.id)
+    tables = db.session.query(
+        SeatingTable.id, SeatingTable.shape, SeatingTable.capacity
+    ).filter(SeatingTable.event_id == event.id)
+    if table_ids is not None:
+        stale = stale.filter(SeatNeighbour.table_id.in_(table_ids))
+        tables = tables.filter(SeatingTable.id.in_(table_ids))
+    stale.delete(synchronize_session=False)
+    tables = tables.all()
+    if not tables:
+        return
+
+    seated = defaultdict(dict)
+    rows = db.session.query(
+        SeatAssignment.table_id, SeatAssignment.seat_position, Invitation.guest_id
+    ).join(Invitation, Invitation.id == SeatAssignment.invitation_id).filter(
+        SeatAssignment.table_id.in_([t.id for t in tables])
+    ).all()
+    for table_id, pos, guest_id in rows:
+        seated[table_id][pos] = guest_id
+
+    pairs = []
+    for t in tables:
+        guests = seated.get(t.id)
+        if not guests:
+            continue
+        adjacency = seating_engine.seat_adjacency(t.shape, t.capacity, event.seating_venue_mode)
+        for pos, guest_id in guests.items():
+            if pos > t.capacity:
+                continue
+            for other in adjacency[pos - 1]:
+                other_guest = guests.get(other)
+                if other > pos and other_guest is not None and other_guest != guest_id:
+                    a, b = sorted((guest_id, other_guest))
+                    pairs.append({"user_id": event.user_id, "event_id": event.id,
+                                  "table_id": t.id, "guest_a_id": a, "guest_b_id": b})
+    if pairs:
+        db.session.execute(db.insert(SeatNeighbour), pairs)
+
+
+def _repeat_pairs(event, invitation_ids):
+    """Pairs of these invitations whose guests sat side by side at the
+    owner's other events, as (invitation_a, invitation_b, times)."""
+    invitation_of = dict(db.session.query(Invitation.guest_id, Invitation.id).filter(
+        Invitation.id.in_(invitation_ids)
+    ).all())
+    if len(invitation_of) < 2:
+        return []
+    guest_ids = list(invitation_of)
+    rows = db.session.query(
+        SeatNeighbour.guest_a_id, SeatNeighbour.guest_b_id,
+        func.count(distinct(SeatNeighbour.event_id)),
+    ).join(Event, Event.id == SeatNeighbour.event_id).filter(
+        SeatNeighbour.user_id == event.user_id,
+        SeatNeighbour.event_id != event.id,
+        Event.deleted_at.is_(None),
+        SeatNeighbour.guest_a_id.in_(guest_ids),
+        SeatNeighbour.guest_b_id.in_(guest_ids),
+    ).group_by(SeatNeighbour.guest_a_id, SeatNeighbour.guest_b_id).all()
+    return [(invitation_of[a], invitation_of[b], times) for a, b, times in rows]
+
+
+# -- Revisions -------------------------------------------------------------------
+
+def get_seat_map(event):
+    """Map invitation id → (table_id, seat_position, locked) for the event."""
+    rows = db.session.query(
+        SeatAssignment.invitation_id, SeatAssignment.table_id,
+        SeatAssignment.seat_position, SeatAssignment.is_locked,
+    ).join(SeatingTable, SeatingTable.id == SeatAssignment.table_id).filter(
+        SeatingTable.event_id == event.id
+    ).all()
+    return {inv: (table_id, pos, bool(locked)) for inv, table_id, pos, locked in rows}
+
+
+def _seat_of(assignment):
+    """The get_seat_map entry for one assignment."""
+    return (assignment.table_id, assignment.seat_position, bool(assignment.is_locked))
+
+
+def _encode_seats(seats):
+    return [[inv, table_id, pos, int(locked)]
+            for inv, (table_id, pos, locked) in sorted(seats.items())]
+
+
+def _dump(data):
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _latest_revision_number(event):
+    return db.session.query(func.max(SeatingRevision.number)).filter(
+        SeatingRevision.event_id == event.id
+    ).scalar()
+
+
+def _revision_bounds(event):
+    """(oldest, latest, latest keyframe, undone count) of the event's
+    revisions in one query; latest and keyframe ignore undone revisions."""
+    kept = SeatingRevision.undone == False  # noqa: E712
+    return db.session.query(
+        func.min(SeatingRevision.number),
+        func.max(case((kept, SeatingRevision.number))),
+        func.max(case((kept & (SeatingRevision.is_keyframe == True),  # noqa: E712
+                       SeatingRevision.number))),
+        func.count(case((~kept, 1))),
+    ).filter(SeatingRevision.event_id == event.id).one()
+
+
+def _materialize_revision(event, number):
+    """Seats as of revision ``number``: its nearest keyframe plus the diffs after it."""
+    keyframe = db.session.query(func.max(SeatingRevision.number)).filter(
+        SeatingRevision.event_id == event.id,
+        SeatingRevision.is_keyframe == True,  # noqa: E712
+        SeatingRevision.number <= number,
+    ).scalar()
+    revisions = SeatingRevision.query.filter(
+        SeatingRevision.event_id == event.id,
+        SeatingRevision.number >= (keyframe or 0),
+        SeatingRevision.number <= number,
+    ).order_by(SeatingRevision.number).all()
+    seats = {}
+    for revision in revisions:
+        data = json.loads(revision.data)
+        if revision.is_keyframe:
+            seats = {inv: (table_id, pos, bool(locked))
+                     for inv, table_id, pos, locked in data["seats"]}
+            continue
+        for inv in data.get("unset", ()):
+            seats.pop(inv, None)
+        for inv, table_id, pos, locked in data.get("set", ()):
+            seats[inv] = (table_id, pos, bool(locked))
+    return seats
+
+
+def _ensure_revision_baseline(event):
+    """Record the plan as it stands before the first tracked change, so the
+    first change can be undone."""
+    if _latest_revision_number(event) is None:
+        _record_revision(event)
+
+
+def _record_revision(event, acting_user_id=None, changes=None):
+    """Store the event's current seats as a new revision.
+
+    Drops any undone revisions first (a new change ends the redo branch).
+    Stores a diff against the previous revision, or a keyframe every
+    SEATING_KEYFRAME_INTERVAL revisions. ``changes`` maps the invitations
+    a change moved to their new seat (None when unseated) and becomes the
+    diff as is; without it the whole plan is compared with the previous
+    revision, and a diff no smaller than the plan is stored as a keyframe.
+    Returns the new revision, or None when nothing changed.
+    """
+    oldest, last, keyframe, undone = _revision_bounds(event)
+    if undone:
+        SeatingRevision.query.filter_by(event_id=event.id, undone=True).delete(
+            synchronize_session=False
+        )
+    number = (last or 0) + 1
+    if last is None:
+        is_keyframe, data = True, {"seats": _encode_seats(get_seat_map(event))}
+    elif changes is not None:
+        if not changes:
+            return None
+        is_keyframe = number - (keyframe or 0) >= SEATING_KEYFRAME_INTERVAL
+        if is_keyframe:
+            data = {"seats": _encode_seats(get_seat_map(event))}
+        else:
+            data = {"set": _encode_seats(
+                {inv: seat for inv, seat in changes.items() if seat is not None}
+            )}
+            unset = sorted(inv for inv, seat in changes.items() if seat is None)
+            if unset:
+                data["unset"] = unset
+    else:
+        seats = get_seat_map(event)
+        previous = _materialize_revision(event, last)
+        changed = {inv: seat for inv, seat in seats.items() if previous.get(inv) != seat}
+        unset = sorted(inv for inv in previous if inv not in seats)
+        if not changed and not unset:
+            return None
+        is_keyframe = (number - (keyframe or 0) >= SEATING_KEYFRAME_INTERVAL
+                       or len(changed) + len(unset) >= len(seats))
+        if is_keyframe:
+            data = {"seats": _encode_seats(seats)}
+        else:
+            data = {"set": _encode_seats(changed)}
+            if unset:
+                data["unset"] = unset
+    revision = SeatingRevision(
+        event_id=event.id, number=number, is_keyframe=is_keyframe, data=_dump(data),
+        created_by=acting_user_id, created_at=datetime.now(timezone.utc),
+    )
+    db.session.add(revision)
+    _prune_revisions(event, number, oldest)
+    return revision
+
+
+def _prune_revisions(event, newest, oldest):
+    """Keep the last SEATING_REVISION_LIMIT revisions, turning the oldest kept
+    one into a keyframe so it no longer depends on the pruned ones."""
+    cutoff = newest - SEATING_REVISION_LIMIT
+    if cutoff < 1 or oldest is None or oldest > cutoff:
+        return
+    first = SeatingRevision.query.filter_by(event_id=event.id, number=cutoff + 1).first()
+    if first is not None and not first.is_keyframe:
+        seats = _materialize_revision(event, first.number)
+        first.data = _dump({"seats": _encode_seats(seats)})
+        first.is_keyframe = True
+    SeatingRevision.query.filter(
+        SeatingRevision.event_id == event.id, SeatingRevision.number <= cutoff
+    ).delete(synchronize_session=False)
+
+
+def _apply_seats(event, seats):
+    """Replace the event's seat assignments with ``seats`` in one delete and
+    one bulk insert. Seats on deleted tables, beyond a table's capacity or
+    for invitations no longer on the event are skipped."""
+    capacities = dict(db.session.query(SeatingTable.id, SeatingTable.capacity).filter(
+        SeatingTable.event_id == event.id
+    ).all())
+    if not capacities:
+        return
+    invitation_ids = {inv_id for (inv_id,) in db.session.query(Invitation.id).filter(
+        Invitation.event_id == event.id
+    ).all()}
+    db.session.execute(
+        db.delete(SeatAssignment).where(SeatAssignment.table_id.in_(list(capacities))),
+        execution_options={"synchronize_session": False},
+    )
+    rows, taken = [], set()
+    for inv, (table_id, pos, locked) in sorted(seats.items()):
+        if (inv not in invitation_ids or not 1 <= pos <= capacities.get(table_id, 0)
+                or (table_id, pos) in taken):
+            continue
+        taken.add((table_id, pos))
+        rows.append({"invitation_id": inv, "table_id": table_id,
+                     "seat_position": pos, "is_locked": locked})
+    if rows:
+        db.session.execute(db.insert(SeatAssignment), rows)
+
+
+def get_seating_revisions(event):
+    return SeatingRevision.query.filter_by(event_id=event.id).order_by(
+        SeatingRevision.number.desc()
+    ).all()
+
+
+def get_seating_revision(event, number):
+    return SeatingRevision.query.filter_by(event_id=event.id, number=number).first()
+
+
+def undo_seating(event, acting_user_id=None):
+    """Step the plan back to the revision before the current one."""
+    current = SeatingRevision.query.filter_by(event_id=event.id, undone=False).order_by(
+        SeatingRevision.number.desc()
+    ).limit(2).all()
+    if len(current) < 2:
+        raise ValueError("Nothing to undo")
+    current[0].undone = True
+    _apply_seats(event, _materialize_revision(event, current[1].number))
+    _commit_seating_change(event, acting_user_id, record=False)
+
+
+def redo_seating(event, acting_user_id=None):
+    """Re-apply the earliest undone revision."""
+    revision = SeatingRevision.query.filter_by(event_id=event.id, undone=True).order_by(
+        SeatingRevision.number
+    ).first()
+    if not revision:
+        raise ValueError("Nothing to redo")
+    revision.undone = False
+    _apply_seats(event, _materialize_revision(event, revision.number))
+    _commit_seating_change(event, acting_user_id, record=False)
+
+
+def restore_seating_revision(event, number, acting_user_id=None):
+    """Bring back the plan of an earlier revision as a new revision."""
+    if get_seating_revision(event, number) is None:
+        raise ValueError("Revision not found")
+    _ensure_revision_baseline(event)
+    _apply_seats(event, _materialize_revision(event, number))
+    _commit_seating_change(event, acting_user_id)
+
+
+def serialize_seating_revision(revision):
+    data = json.loads(revision.data)
+    return {
+        "number": revision.number,
+        "created_at": revision.created_at.isoformat(),
+        "created_by": revision.created_by,
+        "undone": revision.undone,
+        "keyframe": revision.is_keyframe,
+        "changes": len(data.get("seats", ())) if revision.is_keyframe
+        else len(data.get("set", ())) + len(data.get("unset", ())),
+    }
+
+
+# -- Tables ----------------------------------------------------------------------
+
+def _max_capacity(event):
+    return VENUE_MAX_TABLE_CAPACITY if event.seating_venue_mode else MAX_TABLE_CAPACITY
+
+
+def _check_capacity(event, capacity):
+    max_capacity = _max_capacity(event)
+    if capacity < 2 or capacity > max_capacity:
+        raise ValueError(f"Capacity must be between 2 and {max_capacity}")
+
+
 def create_table(event, label="", shape="rectangular", capacity=12, acting_user_id=None):
     if shape not in TABLE_SHAPES:
         raise ValueError(f"Invalid shape: {shape}")
-    if capacity < 2 or capacity > 30:
-        raise ValueError("Capacity must be between 2 and 30")
+    _check_capacity(event, capacity)
 
     table_number = get_next_table_number(event.id)
     table = SeatingTable(
@@ -45,13 +535,62 @@ def create_table(event, label="", shape="rectangular", capacity=12, acting_user_
         capacity=capacity,
     )
     db.session.add(table)
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
+    _commit_seating_change(event, acting_user_id, tables=[], seats={})
     return table
 
 
+def plan_table_layout(event, table_types=None):
+    """Plan tables for the event's unseated attending guests.
+
+    ``table_types`` lists the allowed (shape, capacity) pairs, by default
+    rectangular tables of every standard size. Keep-together groups are
+    bin-packed into the fewest tables; returns [(shape, capacity, guests)].
+    """
+    if table_types is None:
+        table_types = [("rectangular", c) for c in LAYOUT_CAPACITIES]
+    if not table_types:
+        raise ValueError("Give at least one table type")
+    for shape, capacity in table_types:
+        if shape not in TABLE_SHAPES:
+            raise ValueError(f"Invalid shape: {shape}")
+        _check_capacity(event, capacity)
+
+    unseated = {inv.id for inv in get_unseated_attending(event)}
+    if not unseated:
+        raise ValueError("No unseated attending guests to assign.")
+    together, _ = _constraint_links(event)
+    groups = [[i for i in group if i in unseated]
+              for group in seating_engine.together_groups(together)]
+    groups = [group for group in groups if len(group) > 1]
+    grouped = sum(len(group) for group in groups)
+    sizes = [len(group) for group in groups] + [1] * (len(unseated) - grouped)
+    return seating_engine.plan_table_layout(sizes, table_types)
+
+
+def create_tables_bulk(event, specs, acting_user_id=None):
+    """Create tables from (shape, capacity) specs, numbered after the
+    event's last table, in one insert and one commit."""
+    for shape, capacity in specs:
+        if shape not in TABLE_SHAPES:
+            raise ValueError(f"Invalid shape: {shape}")
+        _check_capacity(event, capacity)
+    first_number = get_next_table_number(event.id)
+    tables = [
+        SeatingTable(event_id=event.id, table_number=first_number + i,
+                     shape=shape, capacity=capacity)
+        for i, (shape, capacity) in enumerate(specs)
+    ]
+    db.session.add_all(tables)
+    _commit_seating_change(event, acting_user_id, tables=[], seats={})
+    return tables
+
+
 def update_table(table, label=None, shape=None, capacity=None, acting_user_id=None):
+    _ensure_revision_baseline(table.event)
+    # A new shape or capacity changes which seats are adjacent; a label doesn't
+    reseated = (shape is not None and shape != table.shape
+                or capacity is not None and capacity != table.capacity)
+    unseated = {}
     if label is not None:
         table.label = label.strip()[:100]
     if shape is not None:
@@ -59,8 +598,7 @@ def update_table(table, label=None, shape=None, capacity=None, acting_user_id=No
             raise ValueError(f"Invalid shape: {shape}")
         table.shape = shape
     if capacity is not None:
-        if capacity < 2 or capacity > 30:
-            raise ValueError("Capacity must be between 2 and 30")
+        _check_capacity(table.event, capacity)
         # Remove seat assignments that exceed new capacity
         if capacity < table.capacity:
             excess = SeatAssignment.query.filter(
@@ -68,24 +606,56 @@ def update_table(table, label=None, shape=None, capacity=None, acting_user_id=No
                 SeatAssignment.seat_position > capacity
             ).all()
             for sa in excess:
+                unseated[sa.invitation_id] = None
                 db.session.delete(sa)
         table.capacity = capacity
-    log_action(table.event.user_id, "updated_seating", "event", table.event_id,
-               f"Changes to seating plan for {table.event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
+    _commit_seating_change(table.event, acting_user_id,
+                           tables=[table.id] if reseated else [], seats=unseated)
     return table
 
 
+def rotate_table(table):
+    """Turn a table a quarter turn on the floor plan."""
+    table.rotation = ((table.rotation or 0) + 90) % 360
+    # Revisions hold seats only, so a turn records none and keeps the redo branch
+    _commit_seating_change(table.event, moves=[], log=False, record=False)
+    return table.rotation
+
+
 def delete_table(table, acting_user_id=None):
     event = table.event
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
+    _ensure_revision_baseline(event)
+    seated = bool(table.seat_assignments)
     db.session.delete(table)
-    db.session.commit()
+    _commit_seating_change(event, acting_user_id, tables=[table.id] if seated else [])
+
+
+# -- Seats -------------------------------------------------------------------------
+
+def set_venue_mode(event, enabled, acting_user_id=None):
+    """Switch large-venue mode, which lifts the table capacity cap and scores
+    plans on geometry-aware adjacency (across-the-table and corner seats)."""
+    enabled = bool(enabled)
+    if event.seating_venue_mode == enabled:
+        return
+    if not enabled:
+        oversized = SeatingTable.query.filter(
+            SeatingTable.event_id == event.id,
+            SeatingTable.capacity > MAX_TABLE_CAPACITY,
+        ).count()
+        if oversized:
+            raise ValueError(
+                f"Reduce tables to {MAX_TABLE_CAPACITY} seats or fewer before leaving venue mode"
+            )
+    event.seating_venue_mode = enabled
+    _commit_seating_change(event, acting_user_id)
 
 
 def assign_seat(event, invitation_id, table_id, seat_position, acting_user_id=None):
-    """Assign a guest (via invitation) to a specific seat at a table."""
+    """Assign a guest (via invitation) to a specific seat at a table.
+
+    Returns the new assignment id with the plan score and changed tables.
+    """
     table = SeatingTable.query.filter_by(id=table_id, event_id=event.id).first()
     if not table:
         raise ValueError("Table not found")
@@ -103,13 +673,20 @@ def assign_seat(event, invitation_id, table_id, seat_position, acting_user_id=No
     ).first()
     if existing_at_seat:
         if existing_at_seat.invitation_id == invitation_id:
-            return existing_at_seat  # Already there
+            # Already there
+            state = get_seating_state(event)
+            return {"assignment_id": existing_at_seat.id, "score": state.score,
+                    "changed_tables": [], **_serialize_delta(event, (), (), (), state.score)}
         raise ValueError("Seat is already occupied")
 
+    _ensure_revision_baseline(event)
+    moves = []
     # Remove any existing assignment for this invitation
     existing_for_guest = SeatAssignment.query.filter_by(invitation_id=invitation_id).first()
     if existing_for_guest:
+        moves.append((existing_for_guest.table_id, existing_for_guest.seat_position, None))
         db.session.delete(existing_for_guest)
+        db.session.flush()
 
     assignment = SeatAssignment(
         table_id=table_id,
@@ -117,100 +694,361 @@ def assign_seat(event, invitation_id, table_id, seat_position, acting_user_id=No
         seat_position=seat_position,
     )
     db.session.add(assignment)
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
-    return assignment
+    moves.append((table_id, seat_position, invitation.guest.gender))
+    changes = _commit_seating_change(event, acting_user_id, moves,
+                                     seats={invitation_id: _seat_of(assignment)})
+    return {"assignment_id": assignment.id, **changes}
 
 
 def swap_seats(event, assignment_id_a, assignment_id_b, acting_user_id=None):
-    """Swap two seated guests."""
+    """Swap two seated guests. Returns the plan score and changed tables."""
     a = db.session.get(SeatAssignment, assignment_id_a)
     b = db.session.get(SeatAssignment, assignment_id_b)
     if not a or not b:
         raise ValueError("Assignment not found")
     if a.table.event_id != event.id or b.table.event_id != event.id:
         raise ValueError("Assignment not found")
+    _ensure_revision_baseline(event)
     # Swap positions and tables
     a.table_id, b.table_id = b.table_id, a.table_id
     a.seat_position, b.seat_position = b.seat_position, a.seat_position
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
+    moves = [
+        (a.table_id, a.seat_position, a.invitation.guest.gender),
+        (b.table_id, b.seat_position, b.invitation.guest.gender),
+    ]
+    return _commit_seating_change(event, acting_user_id, moves,
+                                  seats={sa.invitation_id: _seat_of(sa) for sa in (a, b)})
 
 
 def unseat_guest(event, assignment_id, acting_user_id=None):
+    """Remove a guest from their seat. Returns the plan score and changed tables."""
     assignment = db.session.get(SeatAssignment, assignment_id)
     if not assignment or assignment.table.event_id != event.id:
         raise ValueError("Assignment not found")
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
+    _ensure_revision_baseline(event)
+    moves = [(assignment.table_id, assignment.seat_position, None)]
     db.session.delete(assignment)
-    db.session.commit()
+    return _commit_seating_change(event, acting_user_id, moves,
+                                  seats={assignment.invitation_id: None})
 
 
 def toggle_lock(event, assignment_id, acting_user_id=None):
-    """Toggle lock on a seat assignment."""
+    """Toggle lock on a seat assignment. Returns the new lock state with the
+    plan changes."""
     assignment = db.session.get(SeatAssignment, assignment_id)
     if not assignment or assignment.table.event_id != event.id:
         raise ValueError("Assignment not found")
-    assignment.is_locked = not assignment.is_locked
-    db.session.commit()
-    return assignment
+    _ensure_revision_baseline(event)
+    assignment.is_locked = locked = not assignment.is_locked
+    changes = _commit_seating_change(event, moves=[], log=False,
+                                     seats={assignment.invitation_id: _seat_of(assignment)})
+    return {"is_locked": locked, **changes}
 
 
 def lock_table(event, table_id, lock=True, acting_user_id=None):
-    """Lock or unlock all seats at a table."""
+    """Lock or unlock all seats at a table. Returns the plan changes."""
     table = SeatingTable.query.filter_by(id=table_id, event_id=event.id).first()
     if not table:
         raise ValueError("Table not found")
+    _ensure_revision_baseline(event)
     for sa in table.seat_assignments:
         sa.is_locked = lock
-    db.session.commit()
+    return _commit_seating_change(
+        event, moves=[], log=False,
+        seats={sa.invitation_id: _seat_of(sa) for sa in table.seat_assignments},
+    )
 
 
 def clear_table_seats(table, include_locked=False, acting_user_id=None):
+    _ensure_revision_baseline(table.event)
     q = SeatAssignment.query.filter_by(table_id=table.id)
     if not include_locked:
         q = q.filter_by(is_locked=False)
     q.delete()
-    log_action(table.event.user_id, "updated_seating", "event", table.event_id,
-               f"Changes to seating plan for {table.event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
+    _commit_seating_change(table.event, acting_user_id, tables=[table.id])
 
 
 def clear_all_seating(event, include_locked=False, acting_user_id=None):
+    _ensure_revision_baseline(event)
     table_ids = [t.id for t in SeatingTable.query.filter_by(event_id=event.id).all()]
     if table_ids:
         q = SeatAssignment.query.filter(SeatAssignment.table_id.in_(table_ids))
         if not include_locked:
             q = q.filter_by(is_locked=False)
         q.delete()
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
+    _commit_seating_change(event, acting_user_id)
+
+
+SEATING_BATCH_MAX_OPERATIONS = 500
+
+
+def _batch_int(op, key):
+    value = op.get(key)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{key} must be an integer")
+    return value
+
+
+def apply_seating_batch(event, operations, acting_user_id=None):
+    """Apply an ordered list of seat operations in a single transaction.
+
+    Each operation is a dict with an ``op`` of:
+      - 'assign': invitation_id, table_id, seat_position (a moved guest is
+        unlocked, as with assign_seat)
+      - 'swap': assignment_id_a, assignment_id_b
+      - 'unseat': assignment_id
+      - 'lock': assignment_id, optional locked (toggles when omitted)
+
+    Operations are validated in order against one preloaded snapshot of the
+    event's tables and assignments; the first invalid one aborts the whole
+    batch. Returns the plan score, changed tables and the assignment id of
+    every invitation assigned by the batch.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list")
+    if len(operations) > SEATING_BATCH_MAX_OPERATIONS:
+        raise ValueError(f"At most {SEATING_BATCH_MAX_OPERATIONS} operations per batch")
+
+    _ensure_revision_baseline(event)
+    tables = {t.id: t for t in SeatingTable.query.filter_by(event_id=event.id).all()}
+    assignments = SeatAssignment.query.filter(
+        SeatAssignment.table_id.in_(list(tables))
+    ).options(
+        joinedload(SeatAssignment.invitation).joinedload(Invitation.guest)
+    ).all() if tables else []
+    by_id = {sa.id: sa for sa in assignments}
+    by_seat = {(sa.table_id, sa.seat_position): sa for sa in assignments}
+    by_invitation = {sa.invitation_id: sa for sa in assignments}
+
+    assign_inv_ids = {
+        op.get("invitation_id") for op in operations
+        if isinstance(op, dict) and op.get("op") == "assign"
+    }
+    invitations = {
+        inv.id: inv for inv in Invitation.query.filter(
+            Invitation.event_id == event.id, Invitation.id.in_(assign_inv_ids)
+        ).options(joinedload(Invitation.guest)).all()
+    } if assign_inv_ids else {}
+
+    moves = []
+    unseated = {}  # invitation_id → assignment removed earlier in this batch
+    assigned = {}
+    touched = set()  # invitations whose seat or lock the batch changed
+
+    def get_assignment(op, key):
+        sa = by_id.get(_batch_int(op, key))
+        if sa is None:
+            raise ValueError("Assignment not found")
+        return sa
+
+    for index, op in enumerate(operations, start=1):
+        try:
+            if not isinstance(op, dict):
+                raise ValueError("must be an object")
+            kind = op.get("op")
+            if kind == "assign":
+                invitation_id = _batch_int(op, "invitation_id")
+                table_id = _batch_int(op, "table_id")
+                pos = _batch_int(op, "seat_position")
+                table = tables.get(table_id)
+                if table is None:
+                    raise ValueError("Table not found")
+                invitation = invitations.get(invitation_id)
+                if invitation is None:
+                    raise ValueError("Invitation not found")
+                if pos < 1 or pos > table.capacity:
+                    raise ValueError("Invalid seat position")
+                occupant = by_seat.get((table_id, pos))
+                if occupant is not None:
+                    if occupant.invitation_id == invitation_id:
+                        assigned[invitation_id] = occupant
+                        continue
+                    raise ValueError("Seat is already occupied")
+                sa = by_invitation.get(invitation_id)
+                if sa is not None:
+                    del by_seat[(sa.table_id, sa.seat_position)]
+                    moves.append((sa.table_id, sa.seat_position, None))
+                    # A moved guest is unlocked, as assign_seat seats them afresh
+                    sa.table_id, sa.seat_position, sa.is_locked = table_id, pos, False
+                else:
+                    sa = unseated.pop(invitation_id, None)
+                    if sa is not None:
+                        # Reuse the row unseated earlier rather than delete + insert
+                        sa.table_id, sa.seat_position, sa.is_locked = table_id, pos, False
+                    else:
+                        sa = SeatAssignment(table_id=table_id, invitation_id=invitation_id,
+                                            seat_position=pos)
+                        db.session.add(sa)
+                    by_invitation[invitation_id] = sa
+                by_seat[(table_id, pos)] = sa
+                assigned[invitation_id] = sa
+                touched.add(invitation_id)
+                moves.append((table_id, pos, invitation.guest.gender))
+            elif kind == "swap":
+                a = get_assignment(op, "assignment_id_a")
+                b = get_assignment(op, "assignment_id_b")
+                a.table_id, b.table_id = b.table_id, a.table_id
+                a.seat_position, b.seat_position = b.seat_position, a.seat_position
+                by_seat[(a.table_id, a.seat_position)] = a
+                by_seat[(b.table_id, b.seat_position)] = b
+                touched.update((a.invitation_id, b.invitation_id))
+                moves.append((a.table_id, a.seat_position, a.invitation.guest.gender))
+                moves.append((b.table_id, b.seat_position, b.invitation.guest.gender))
+            elif kind == "unseat":
+                sa = get_assignment(op, "assignment_id")
+                del by_id[sa.id]
+                del by_seat[(sa.table_id, sa.seat_position)]
+                del by_invitation[sa.invitation_id]
+                assigned.pop(sa.invitation_id, None)
+                unseated[sa.invitation_id] = sa
+                touched.add(sa.invitation_id)
+                moves.append((sa.table_id, sa.seat_position, None))
+            elif kind == "lock":
+                sa = get_assignment(op, "assignment_id")
+                locked = op.get("locked")
+                sa.is_locked = (not sa.is_locked) if locked is None else bool(locked)
+                touched.add(sa.invitation_id)
+            else:
+                raise ValueError(f"Unknown op: {kind}")
+        except ValueError as e:
+            db.session.rollback()
+            raise ValueError(f"Operation {index}: {e}")
+
+    for sa in unseated.values():
+        db.session.delete(sa)
+    seats = {}
+    for inv_id in touched:
+        sa = by_invitation.get(inv_id)
+        seats[inv_id] = _seat_of(sa) if sa else None
+    changes = _commit_seating_change(event, acting_user_id, moves, seats=seats)
+    changes["applied"] = len(operations)
+    changes["assignments"] = {str(inv_id): sa.id for inv_id, sa in assigned.items()}
+    return changes
+
+
+# -- Constraints -----------------------------------------------------------------
+
+def get_constraints(event):
+    return SeatingConstraint.query.filter_by(event_id=event.id).order_by(SeatingConstraint.id).all()
+
+
+def create_constraint(event, kind, tag_id=None, invitation_ids=None, acting_user_id=None):
+    """Keep guests together or apart: everyone with a tag, or one pair."""
+    if kind not in SEATING_CONSTRAINT_KINDS:
+        raise ValueError(f"Invalid constraint kind: {kind}")
+    if (tag_id is None) == (invitation_ids is None):
+        raise ValueError("Give either a tag_id or two invitation_ids")
+
+    filters = {"event_id": event.id, "kind": kind}
+    if tag_id is not None:
+        tag = db.session.get(Tag, tag_id) if isinstance(tag_id, int) else None
+        if not tag or tag.user_id != event.user_id or tag.deleted_at is not None:
+            raise ValueError("Tag not found")
+        filters["tag_id"] = tag.id
+    else:
+        ids = list(invitation_ids) if isinstance(invitation_ids, (list, tuple)) else []
+        if (len(ids) != 2 or len(set(ids)) != 2
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+            raise ValueError("invitation_ids must be two different invitation ids")
+        found = Invitation.query.filter(
+            Invitation.event_id == event.id, Invitation.id.in_(ids)
+        ).count()
+        if found != 2:
+            raise ValueError("Invitation not found")
+        filters["invitation_a_id"], filters["invitation_b_id"] = sorted(ids)
+
+    if SeatingConstraint.query.filter_by(**filters).first():
+        raise ValueError("This constraint already exists")
+    constraint = SeatingConstraint(created_at=datetime.now(timezone.utc), **filters)
+    db.session.add(constraint)
+    _commit_seating_change(event, acting_user_id, tables=[], seats={})
+    return constraint
+
+
+def delete_constraint(constraint, acting_user_id=None):
+    event = constraint.event
+    db.session.delete(constraint)
+    _commit_seating_change(event, acting_user_id, tables=[], seats={})
+
+
+def _constraint_links(event):
+    """Resolve an event's constraints to attending invitation ids.
+
+    Returns (together, apart): keep-together links and keep-apart pairs.
+    A tag kept apart keeps every pair of its guests apart.
+    """
+    constraints = get_constraints(event)
+    together, apart = [], []
+    if not constraints:
+        return together, apart
+
+    members = defaultdict(list)
+    tag_ids = {c.tag_id for c in constraints if c.tag_id}
+    if tag_ids:
+        rows = db.session.query(guest_tags.c.tag_id, Invitation.id).join(
+            Invitation, Invitation.guest_id == guest_tags.c.guest_id
+        ).join(Tag, Tag.id == guest_tags.c.tag_id).filter(
+            guest_tags.c.tag_id.in_(tag_ids),
+            Tag.deleted_at.is_(None),
+            Invitation.event_id == event.id,
+            Invitation.status == "Attending",
+        ).all()
+        for tag_id, invitation_id in rows:
+            members[tag_id].append(invitation_id)
+
+    for c in constraints:
+        ids = members.get(c.tag_id, []) if c.tag_id else [c.invitation_a_id, c.invitation_b_id]
+        if c.kind == "together":
+            together.append(tuple(ids))
+        else:
+            apart.extend(combinations(ids, 2))
+    return together, apart
+
+
+def serialize_constraint(constraint):
+    invitations = [inv for inv in (constraint.invitation_a, constraint.invitation_b) if inv]
+    return {
+        "id": constraint.id,
+        "kind": constraint.kind,
+        "tag": {"id": constraint.tag.id, "name": constraint.tag.name} if constraint.tag else None,
+        "invitation_ids": [inv.id for inv in invitations],
+        "guests": [inv.guest.full_name for inv in invitations],
+    }
 
 
 def get_unseated_attending(event):
     """Get attending invitations that don't have a seat assignment."""
-    seated_inv_ids = db.session.query(SeatAssignment.invitation_id).join(
-        SeatingTable
-    ).filter(SeatingTable.event_id == event.id)
-
-    return Invitation.query.filter(
+    return Invitation.query.outerjoin(
+        SeatAssignment, SeatAssignment.invitation_id == Invitation.id
+    ).filter(
         Invitation.event_id == event.id,
         Invitation.status == "Attending",
-        ~Invitation.id.in_(seated_inv_ids.subquery().select())
-    ).all()
+        SeatAssignment.id.is_(None),
+    ).options(joinedload(Invitation.guest)).all()
 
 
-def auto_assign(event, mode="random", acting_user_id=None):
+def auto_assign(event, mode="random", acting_user_id=None, time_budget_ms=None,
+                restarts=1, seed=None):
     """Auto-assign unseated attending guests to empty seats.
 
     Modes:
       - 'random': random distribution
       - 'alternating': maximize M/F alternation, minimize same-gender runs
+      - 'optimize': local search over the whole plan for the fewest
+        same-gender neighbours, bounded by time_budget_ms
+      - 'fresh': like 'optimize', but also avoids seating guests next to
+        someone they sat beside at the owner's other events
+
+    ``restarts`` runs that many seeded searches (seed, seed + 1, ...) and
+    keeps the best-scoring plan. Without a seed one is drawn; either way it
+    is recorded on the event, and the same seed, mode and restarts over the
+    same plan place everyone the same way again ('optimize' and 'fresh' as
+    long as the search ends before its time budget).
     """
+    if mode not in SEATING_MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    seed = new_seating_seed() if seed is None else seed
+
     tables = SeatingTable.query.filter_by(event_id=event.id).order_by(
         SeatingTable.table_number
     ).all()
@@ -220,45 +1058,41 @@ def auto_assign(event, mode="random", acting_user_id=None):
         raise ValueError("No unseated attending guests to assign.")
 
     if not tables:
-        # Auto-create a default table sized to fit all attending guests
-        cap = _smart_capacity(len(unseated))
-        table = create_table(event, shape="rectangular", capacity=cap,
-                             acting_user_id=acting_user_id)
-        tables = [table]
-
-    # Build list of empty seats per table
-    table_empty_seats = {}
-    for table in tables:
-        taken = {sa.seat_position for sa in table.seat_assignments}
-        empty = [p for p in range(1, table.capacity + 1) if p not in taken]
-        if empty:
-            table_empty_seats[table.id] = (table, empty)
+        # Auto-create the fewest tables that fit all attending guests
+        layout = plan_table_layout(event)
+        tables = create_tables_bulk(event, [(shape, capacity) for shape, capacity, _ in layout],
+                                    acting_user_id=acting_user_id)
 
+    table_empty_seats = _get_table_empty_seats(tables)
     total_empty = sum(len(seats) for _, seats in table_empty_seats.values())
     if total_empty == 0:
         raise ValueError("No empty seats available.")
 
-    if mode == "random":
-        _auto_assign_random(unseated, table_empty_seats)
-    elif mode == "alternating":
-        _auto_assign_alternating(unseated, table_empty_seats, tables)
-    else:
-        raise ValueError(f"Unknown mode: {mode}")
+    _ensure_revision_baseline(event)
+    _fill_empty_seats(event, mode, unseated, table_empty_seats, time_budget_ms, restarts, seed)
+
+    _commit_seating_change(event, acting_user_id, run=(mode, seed, restarts))
 
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
 
+def shuffle_seating(event, mode="random", acting_user_id=None, time_budget_ms=None,
+                    restarts=1, seed=None):
+    """Clear all unlocked seats and re-assign everyone (locked seats stay).
+
+    The seed is drawn and recorded as for auto_assign.
+    """
+    if mode not in SEATING_MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    seed = new_seating_seed() if seed is None else seed
 
-def shuffle_seating(event, mode="random", acting_user_id=None):
-    """Clear all unlocked seats and re-assign everyone (locked seats stay)."""
     tables = SeatingTable.query.filter_by(event_id=event.id).order_by(
         SeatingTable.table_number
     ).all()
     if not tables:
         # Nothing to shuffle — delegate to auto_assign which will create a table
-        return auto_assign(event, mode=mode, acting_user_id=acting_user_id)
+        return auto_assign(event, mode=mode, acting_user_id=acting_user_id,
+                           time_budget_ms=time_budget_ms, restarts=restarts, seed=seed)
 
+    _ensure_revision_baseline(event)
     # Clear unlocked assignments
     table_ids = [t.id for t in tables]
     SeatAssignment.query.filter(
@@ -270,253 +1104,251 @@ def shuffle_seating(event, mode="random", acting_user_id=None):
     # Now auto-assign (all unlocked guests are now unseated)
     unseated = get_unseated_attending(event)
     if not unseated:
-        log_action(event.user_id, "updated_seating", "event", event.id,
-                   f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-        db.session.commit()
+        _commit_seating_change(event, acting_user_id)
         return
 
+    table_empty_seats = _get_table_empty_seats(tables)
+    if not table_empty_seats:
+        _commit_seating_change(event, acting_user_id)
+        return
+
+    _fill_empty_seats(event, mode, unseated, table_empty_seats, time_budget_ms, restarts, seed)
+
+    _commit_seating_change(event, acting_user_id, run=(mode, seed, restarts))
+
+
+def new_seating_seed():
+    return random.randrange(2 ** 32)
+
+
+def _get_table_empty_seats(tables):
+    """Map table id → (table, empty seat positions) for tables with room."""
     table_empty_seats = {}
     for table in tables:
         taken = {sa.seat_position for sa in table.seat_assignments}
         empty = [p for p in range(1, table.capacity + 1) if p not in taken]
         if empty:
             table_empty_seats[table.id] = (table, empty)
+    return table_empty_seats
 
-    if not table_empty_seats:
-        log_action(event.user_id, "updated_seating", "event", event.id,
-                   f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-        db.session.commit()
-        return
 
-    if mode == "random":
-        _auto_assign_random(unseated, table_empty_seats)
-    elif mode == "alternating":
-        _auto_assign_alternating(unseated, table_empty_seats, tables)
+def _fill_empty_seats(event, mode, unseated, table_empty_seats, time_budget_ms=None,
+                      restarts=1, seed=None):
+    """Seat unseated guests on empty seats; guests already seated stay fixed.
+
+    Runs ``restarts`` independently seeded searches of the chosen mode over
+    an ORM-free snapshot (in worker processes when SEATING_WORKERS > 1) and
+    keeps the plan with the lowest cost, honouring the event's seating
+    constraints.
+    """
+    snapshot = _build_snapshot([t for t, _ in table_empty_seats.values()], unseated,
+                               event.seating_venue_mode, _constraint_links(event))
+    placements, _ = _search(event, snapshot, mode, time_budget_ms, restarts, seed)
+    _add_placements(placements)
 
-    log_action(event.user_id, "updated_seating", "event", event.id,
-               f"Changes to seating plan for {event.name}", acting_user_id=acting_user_id)
-    db.session.commit()
 
+def _search(event, snapshot, mode, time_budget_ms=None, restarts=1, seed=None, **options):
+    """Run seating_engine.search over the snapshot with the app's worker count."""
+    if mode == "fresh":
+        snapshot["repeats"] = _repeat_pairs(
+            event, [inv_id for inv_id, _ in snapshot["guests"]] + list(snapshot["seated"])
+        )
+    return seating_engine.search(
+        snapshot, mode=mode, restarts=restarts, seed=seed,
+        time_budget_ms=time_budget_ms or seating_engine.DEFAULT_TIME_BUDGET_MS,
+        workers=current_app.config.get("SEATING_WORKERS", 1), **options,
+    )
 
-def _auto_assign_random(unseated, table_empty_seats):
-    """Randomly distribute guests across empty seats."""
-    random.shuffle(unseated)
-    # Flatten empty seats
-    all_seats = []
-    for table, empty in table_empty_seats.values():
-        for pos in empty:
-            all_seats.append((table.id, pos))
-    random.shuffle(all_seats)
 
-    for inv, (table_id, pos) in zip(unseated, all_seats):
+def _add_placements(placements):
+    for invitation_id, table_id, pos in placements:
         db.session.add(SeatAssignment(
-            table_id=table_id, invitation_id=inv.id, seat_position=pos
+            table_id=table_id, invitation_id=invitation_id, seat_position=pos
         ))
 
 
-def _auto_assign_alternating(unseated, table_empty_seats, tables):
-    """Assign guests to maximize M/F alternation, respecting locked seats.
+def _build_snapshot(tables, unseated, venue=False, constraints=None, keep=None):
+    """Compact, ORM-free view of the seating problem for seating_engine.
 
-    Strategy: greedy seat-by-seat placement. For each empty seat, score what
-    gender would be best there based on its neighbors, then assign guests
-    one at a time picking the seat+guest combo that minimizes same-gender
-    adjacency across the whole plan.
+    ``keep`` filters which current seat assignments stay fixed; by default
+    all of them do.
+    """
+    together, apart = constraints or ((), ())
+    kept = {t.id: [sa for sa in t.seat_assignments if keep is None or keep(sa)]
+            for t in tables}
+    return {
+        "venue": venue,
+        "seated": {sa.invitation_id: (t.id, sa.seat_position)
+                   for t in tables for sa in kept[t.id]},
+        "together": together,
+        "apart": apart,
+        "tables": [
+            (t.id, t.shape, t.capacity,
+             {sa.seat_position: sa.invitation.guest.gender for sa in kept[t.id]})
+            for t in tables
+        ],
+        "guests": [(inv.id, inv.guest.gender) for inv in unseated],
+    }
 
-    Table topology:
-    - Round: seat N wraps to seat 1 (circular)
-    - Rectangular: seats go clockwise — top row L→R, right end, bottom row R→L, left end
-    - Long/Banquet: top row L→R then bottom row R→L (two parallel rows, no wrap)
 
-    For all shapes, the seat numbering is sequential and the adjacency is
-    pos-1 ↔ pos ↔ pos+1, with wrapping for round tables.
+def prepare_seating_search(event, shuffle=False):
+    """Read-only counterpart of auto_assign / shuffle_seating for background
+    runs: the event's seating version and the search snapshot, without
+    writing anything. A shuffle keeps only locked seats fixed.
     """
-    males = [inv for inv in unseated if inv.guest.gender == "Male"]
-    females = [inv for inv in unseated if inv.guest.gender == "Female"]
-    random.shuffle(males)
-    random.shuffle(females)
+    version = db.session.query(Event.seating_version).filter_by(id=event.id).scalar()
+    tables = SeatingTable.query.filter_by(event_id=event.id).order_by(
+        SeatingTable.table_number
+    ).options(
+        selectinload(SeatingTable.seat_assignments)
+        .joinedload(SeatAssignment.invitation).joinedload(Invitation.guest)
+    ).all()
+    if not tables:
+        raise ValueError("Add a table before auto-assigning in the background.")
+    keep = (lambda sa: sa.is_locked) if shuffle else None
+    fixed = {sa.invitation_id for t in tables for sa in t.seat_assignments
+             if keep is None or keep(sa)}
+    unseated = [inv for inv in Invitation.query.filter_by(
+        event_id=event.id, status="Attending"
+    ).options(joinedload(Invitation.guest)).all() if inv.id not in fixed]
+    if not unseated:
+        raise ValueError("No unseated attending guests to assign.")
+    taken = sum(1 for t in tables for sa in t.seat_assignments
+                if sa.seat_position <= t.capacity and (keep is None or keep(sa)))
+    if sum(t.capacity for t in tables) <= taken:
+        raise ValueError("No empty seats available.")
+    snapshot = _build_snapshot(tables, unseated, event.seating_venue_mode,
+                               _constraint_links(event), keep)
+    return version, snapshot
 
-    # Build per-table state: a map of position → gender for all seats (existing + to-fill)
-    table_states = []
-    for table in tables:
-        if table.id not in table_empty_seats:
-            continue
-        _, empty_positions = table_empty_seats[table.id]
-        # Map of position → gender for already-seated guests
-        seat_map = {}
-        for sa in table.seat_assignments:
-            seat_map[sa.seat_position] = sa.invitation.guest.gender
-        is_round = table.shape == "round"
-        table_states.append({
-            "table": table,
-            "seat_map": seat_map,
-            "empty": set(empty_positions),
-            "capacity": table.capacity,
-            "is_round": is_round,
-        })
-
-    if not table_states:
-        return
 
-    # Pool of guests by gender
-    male_pool = list(males)
-    female_pool = list(females)
+def apply_seating_search(event, version, placements, shuffle=False, acting_user_id=None,
+                         run=None):
+    """Write the placements of a background run in one transaction.
 
-    # Step 1: For each table, compute the ideal gender for each empty seat.
-    # We do this by building the best possible gender pattern for the full
-    # table, respecting locked positions, then reading off the empty seats.
-    all_assignments = []  # (table_state, pos, gender_needed)
+    Fails if the plan changed since prepare_seating_search read ``version``,
+    as the placements may no longer fit the seats that are free. ``run`` is
+    the (mode, seed, restarts) recorded on the event.
+    """
+    current = db.session.query(Event.seating_version).filter_by(
+        id=event.id
+    ).with_for_update().scalar()
+    if current != version:
+        raise ValueError("The seating plan changed while the job was running.")
+    _ensure_revision_baseline(event)
+    if shuffle:
+        table_ids = [table_id for (table_id,) in db.session.query(SeatingTable.id).filter_by(
+            event_id=event.id
+        ).all()]
+        SeatAssignment.query.filter(
+            SeatAssignment.table_id.in_(table_ids),
+            SeatAssignment.is_locked == False  # noqa: E712
+        ).delete(synchronize_session=False)
+        db.session.flush()
+    _add_placements(placements)
+    _commit_seating_change(event, acting_user_id, run=run)
 
-    for ts in table_states:
-        if not ts["empty"]:
-            continue
-        pattern = _compute_ideal_pattern(
-            ts["seat_map"], ts["capacity"], ts["is_round"],
-            len(male_pool), len(female_pool)
-        )
-        for pos in sorted(ts["empty"]):
-            all_assignments.append((ts, pos, pattern.get(pos)))
-
-    # Step 2: Assign guests to match the ideal pattern
-    # First pass: fill seats where we have the requested gender
-    unmatched = []
-    for ts, pos, ideal_gender in all_assignments:
-        pool = male_pool if ideal_gender == "Male" else female_pool
-        if pool:
-            inv = pool.pop()
-            ts["seat_map"][pos] = inv.guest.gender
-            ts["empty"].discard(pos)
-            db.session.add(SeatAssignment(
-                table_id=ts["table"].id, invitation_id=inv.id, seat_position=pos
-            ))
-        else:
-            unmatched.append((ts, pos))
-
-    # Second pass: fill remaining seats with whatever gender is left
-    remaining = male_pool + female_pool
-    random.shuffle(remaining)
-    for inv, (ts, pos) in zip(remaining, unmatched):
-        ts["seat_map"][pos] = inv.guest.gender
-        ts["empty"].discard(pos)
-        db.session.add(SeatAssignment(
-            table_id=ts["table"].id, invitation_id=inv.id, seat_position=pos
-        ))
 
+def _seating_plans():
+    return current_app.extensions.setdefault("seating_plans", OrderedDict())
 
-def _compute_ideal_pattern(seat_map, capacity, is_round, n_males_avail, n_females_avail):
-    """Compute the ideal gender for each empty seat to maximize alternation.
 
-    Strategy: space the minority gender evenly across ALL seats (including
-    locked ones), then for each empty seat, read off the ideal gender.
-    Locked seats are constraints; the pattern wraps around them.
-    """
-    n = capacity
-    empty_positions = sorted(p for p in range(1, n + 1) if p not in seat_map)
-    n_empty = len(empty_positions)
-    if n_empty == 0:
-        return {}
-
-    existing_m = sum(1 for g in seat_map.values() if g == "Male")
-    existing_f = sum(1 for g in seat_map.values() if g == "Female")
-
-    # Calculate how many of each gender to place
-    need_m = min(n_males_avail, n_empty)
-    need_f = min(n_females_avail, n_empty)
-    # Try to balance: aim for ~50/50 total
-    total = existing_m + existing_f + n_empty
-    ideal_m_total = (total + 1) // 2
-    ideal_f_total = total - ideal_m_total
-    want_m = max(0, min(ideal_m_total - existing_m, n_males_avail, n_empty))
-    want_f = max(0, min(ideal_f_total - existing_f, n_females_avail, n_empty))
-    leftover = n_empty - want_m - want_f
-    if leftover > 0:
-        if n_males_avail - want_m > 0:
-            extra = min(leftover, n_males_avail - want_m)
-            want_m += extra
-            leftover -= extra
-        if leftover > 0 and n_females_avail - want_f > 0:
-            extra = min(leftover, n_females_avail - want_f)
-            want_f += extra
-
-    total_m = existing_m + want_m
-    total_f = existing_f + want_f
-    if total_f <= total_m:
-        min_g, maj_g = "Female", "Male"
-        n_min_total, n_maj_total = total_f, total_m
-        need_min, need_maj = want_f, want_m
-    else:
-        min_g, maj_g = "Male", "Female"
-        n_min_total, n_maj_total = total_m, total_f
-        need_min, need_maj = want_m, want_f
-
-    # Build ideal full-table pattern: place minority at evenly-spaced positions
-    # across ALL n seats, then check if empty seats match.
-    # The spacing between minority members should be ~ n / n_min_total.
-    if n_min_total == 0:
-        return {p: maj_g for p in empty_positions}
-
-    spacing = n / n_min_total  # e.g., 10 seats / 3 minority = every 3.33 seats
-
-    # Find best starting offset to align with existing locked minority positions
-    # Try each possible offset and pick the one that conflicts least with locks
-    best_offset = 0
-    best_conflicts = n + 1
-    for trial_offset in range(n):
-        conflicts = 0
-        min_positions = set()
-        for i in range(n_min_total):
-            pos = int(round(trial_offset + i * spacing)) % n + 1
-            min_positions.add(pos)
-        # Check conflicts with locked seats
-        for pos, gender in seat_map.items():
-            if pos in min_positions and gender != min_g:
-                conflicts += 1
-            elif pos not in min_positions and gender == min_g:
-                conflicts += 1
-        if conflicts < best_conflicts:
-            best_conflicts = conflicts
-            best_offset = trial_offset
-
-    # Generate minority positions with best offset
-    minority_positions = set()
-    for i in range(n_min_total):
-        pos = int(round(best_offset + i * spacing)) % n + 1
-        minority_positions.add(pos)
-
-    # Build the result: for each empty position, assign ideal gender
-    result = {}
-    min_placed = 0
-    maj_placed = 0
-    for pos in empty_positions:
-        if pos in minority_positions and min_placed < need_min:
-            result[pos] = min_g
-            min_placed += 1
-        elif pos not in minority_positions and maj_placed < need_maj:
-            result[pos] = maj_g
-            maj_placed += 1
-        else:
-            # Fallback: assign whatever we still need
-            if min_placed < need_min:
-                result[pos] = min_g
-                min_placed += 1
-            else:
-                result[pos] = maj_g
-                maj_placed += 1
+def _seating_plan_key(event):
+    """Everything a serialized plan depends on: the seating version (bumped by
+    seating changes and guest edits) and the event's edit time (touched by
+    invitation changes)."""
+    return (event.id, event.seating_version, event.date_edited)
 
-    return result
+
+def seating_plan_etag(event):
+    return hashlib.sha1(repr(_seating_plan_key(event)).encode()).hexdigest()[:20]
 
 
 def serialize_seating_plan(event):
-    """Serialize complete seating plan for API response."""
-    tables = get_seating_plan(event)
+    """Serialize complete seating plan for API response.
+
+    Plans are cached per event and version, so repeated polls of an
+    unchanged plan skip the table and guest queries.
+    """
+    key = _seating_plan_key(event)
+    cache = _seating_plans()
+    with _seating_plans_lock:
+        cached = cache.get(event.id)
+        if cached and cached[0] == key:
+            cache.move_to_end(event.id)
+            return cached[1]
+
+    tables = SeatingTable.query.filter_by(event_id=event.id).order_by(
+        SeatingTable.table_number
+    ).options(
+        selectinload(SeatingTable.seat_assignments)
+        .joinedload(SeatAssignment.invitation).joinedload(Invitation.guest)
+    ).all()
     unseated = get_unseated_attending(event)
-    unseated.sort(key=lambda inv: (inv.guest.last_name_sort_key, inv.guest.first_name.lower()))
+    unseated.sort(key=lambda inv: (inv.guest.last_name_sort_key, inv.guest.first_name_lower))
 
-    return {
+    plan = {
         "tables": [_serialize_table(t) for t in tables],
         "unseated": [_serialize_unseated_inv(inv) for inv in unseated],
+        "score": get_seating_state(event).score,
+        "venue_mode": event.seating_venue_mode,
+        "max_capacity": _max_capacity(event),
+        "seed": _serialize_seed(event),
+    }
+    with _seating_plans_lock:
+        cache[event.id] = (key, plan)
+        cache.move_to_end(event.id)
+        while len(cache) > SEATING_PLAN_CACHE_SIZE:
+            cache.popitem(last=False)
+    return plan
+
+
+def serialize_seating_delta(event, before):
+    """Serialize only what changed since ``before``, a get_seat_map snapshot
+    taken ahead of the change: the tables whose seats changed, plus the
+    invitations that left or joined the unseated list.
+    """
+    after = get_seat_map(event)
+    changed = {inv for inv in before.keys() | after.keys() if before.get(inv) != after.get(inv)}
+    table_ids = ({before[inv][0] for inv in changed if inv in before}
+                 | {after[inv][0] for inv in changed if inv in after})
+    return _serialize_delta(
+        event, table_ids, [inv for inv in changed if inv not in after],
+        [inv for inv in changed if inv not in before], get_seating_state(event).score,
+    )
+
+
+def _serialize_delta(event, table_ids, unseated_ids, seated_ids, score):
+    """Delta payload: the given tables in full, the unseated entries of
+    ``unseated_ids`` (attending only) and ``seated_ids`` to drop from the
+    unseated list."""
+    tables = SeatingTable.query.filter(
+        SeatingTable.event_id == event.id, SeatingTable.id.in_(table_ids)
+    ).order_by(SeatingTable.table_number).options(
+        selectinload(SeatingTable.seat_assignments)
+        .joinedload(SeatAssignment.invitation).joinedload(Invitation.guest)
+    ).all() if table_ids else []
+    unseated = Invitation.query.filter(
+        Invitation.id.in_(unseated_ids), Invitation.status == "Attending"
+    ).options(joinedload(Invitation.guest)).all() if unseated_ids else []
+    unseated.sort(key=lambda inv: (inv.guest.last_name_sort_key, inv.guest.first_name_lower))
+    return {
+        "delta": True,
+        "tables": [_serialize_table(t) for t in tables],
+        "unseated_added": [_serialize_unseated_inv(inv) for inv in unseated],
+        "unseated_removed": sorted(seated_ids),
+        "score": score,
+        "seed": _serialize_seed(event),
     }
 
 
+def _serialize_seed(event):
+    if event.seating_seed is None:
+        return None
+    return {"seed": event.seating_seed, "mode": event.seating_seed_mode,
+            "restarts": event.seating_seed_restarts}
+
+
 def _serialize_table(table):
     seats = {}
     for sa in table.seat_assignments:
@@ -548,6 +1380,7 @@ def _serialize_unseated_inv(inv):
         "guest_id": inv.guest.id,
         "first_name": inv.guest.first_name,
         "last_name": inv.guest.last_name or "",
+        "last_name_sort_key": inv.guest.last_name_sort_key,
         "gender": inv.guest.gender,
         "full_name": inv.guest.full_name,
     }
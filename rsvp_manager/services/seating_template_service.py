@@ -0,0 +1,141 @@
+import json
+from datetime import datetime, timezone
+from rsvp_manager.extensions import db
+from rsvp_manager.models import (
+    Invitation, SeatAssignment, SeatingTable, SeatingTemplate, SeatingTemplateTable,
+)
+from rsvp_manager.services import seating_service
+
+
+def get_templates(user_id):
+    return SeatingTemplate.query.filter_by(user_id=user_id).order_by(
+        SeatingTemplate.name, SeatingTemplate.id
+    ).all()
+
+
+def get_template(template_id, user_id):
+    return SeatingTemplate.query.filter_by(id=template_id, user_id=user_id).first()
+
+
+def save_template(event, user_id, name, include_locked=False):
+    """Save the event's tables as a template owned by ``user_id``.
+
+    With include_locked, each table also keeps its locked seats by guest, so
+    applying the template can lock those guests in place on another event.
+    """
+    name = (name or "").strip()[:100]
+    if not name:
+        raise ValueError("Template name is required")
+    tables = seating_service.get_seating_plan(event)
+    if not tables:
+        raise ValueError("The event has no tables to save.")
+
+    locked = {}
+    if include_locked:
+        rows = db.session.query(
+            SeatAssignment.table_id, SeatAssignment.seat_position, Invitation.guest_id,
+        ).join(Invitation, Invitation.id == SeatAssignment.invitation_id).filter(
+            SeatAssignment.table_id.in_([t.id for t in tables]),
+            SeatAssignment.is_locked == True,  # noqa: E712
+        ).order_by(SeatAssignment.seat_position).all()
+        for table_id, pos, guest_id in rows:
+            locked.setdefault(table_id, []).append([pos, guest_id])
+
+    template = SeatingTemplate(
+        user_id=user_id, name=name, venue_mode=bool(event.seating_venue_mode),
+        created_at=datetime.now(timezone.utc),
+    )
+    template.tables = [
+        SeatingTemplateTable(
+            table_number=t.table_number, label=t.label or "", shape=t.shape,
+            capacity=t.capacity, rotation=t.rotation or 0,
+            locked_seats=seating_service._dump(locked[t.id]) if t.id in locked else None,
+        )
+        for t in tables
+    ]
+    db.session.add(template)
+    db.session.commit()
+    return template
+
+
+def delete_template(template):
+    db.session.delete(template)
+    db.session.commit()
+
+
+def apply_template(event, template, copy_locked=False, acting_user_id=None):
+    """Add the template's tables to the event, numbered after its last table,
+    in one insert.
+
+    With copy_locked, guests locked in the template who are attending the
+    event and not already seated are locked into the same seats. Returns the
+    new tables, the number of seats copied and the ids of the locked guests
+    who are invited but were skipped (not attending, or already seated).
+    """
+    max_capacity = seating_service._max_capacity(event)
+    if any(t.capacity > max_capacity for t in template.tables):
+        raise ValueError("Turn on large-venue mode to use this template.")
+
+    seating_service._ensure_revision_baseline(event)
+    first_number = seating_service.get_next_table_number(event.id)
+    rows = [
+        {"event_id": event.id, "table_number": first_number + i, "label": t.label or "",
+         "shape": t.shape, "capacity": t.capacity, "rotation": t.rotation}
+        for i, t in enumerate(template.tables)
+    ]
+    table_ids = db.session.scalars(
+        db.insert(SeatingTable).returning(SeatingTable.id, sort_by_parameter_order=True),
+        rows,
+    ).all() if rows else []
+
+    seats, skipped = [], []
+    if copy_locked:
+        wanted = {}
+        for table_id, t in zip(table_ids, template.tables):
+            for pos, guest_id in json.loads(t.locked_seats or "[]"):
+                wanted.setdefault(guest_id, (table_id, pos))
+        if wanted:
+            seated = set(seating_service.get_seat_map(event))
+            invitations = db.session.query(
+                Invitation.id, Invitation.guest_id, Invitation.status
+            ).filter(
+                Invitation.event_id == event.id,
+                Invitation.guest_id.in_(list(wanted)),
+            ).all()
+            for inv_id, guest_id, status in invitations:
+                if status != "Attending" or inv_id in seated:
+                    skipped.append(guest_id)
+                    continue
+                seats.append({"invitation_id": inv_id, "table_id": wanted[guest_id][0],
+                              "seat_position": wanted[guest_id][1], "is_locked": True})
+        if seats:
+            db.session.execute(db.insert(SeatAssignment), seats)
+
+    seating_service._commit_seating_change(
+        event, acting_user_id, tables=table_ids if seats else [],
+        seats={s["invitation_id"]: (s["table_id"], s["seat_position"], True) for s in seats},
+    )
+    tables = SeatingTable.query.filter(SeatingTable.id.in_(table_ids)).order_by(
+        SeatingTable.table_number
+    ).all()
+    return tables, len(seats), sorted(skipped)
+
+
+def serialize_template(template):
+    return {
+        "id": template.id,
+        "name": template.name,
+        "venue_mode": template.venue_mode,
+        "created_at": template.created_at.isoformat(),
+        "tables": [
+            {
+                "table_number": t.table_number,
+                "label": t.label or "",
+                "shape": t.shape,
+                "capacity": t.capacity,
+                "rotation": t.rotation,
+                "locked_seats": len(json.loads(t.locked_seats)) if t.locked_seats else 0,
+            }
+            for t in template.tables
+        ],
+    }
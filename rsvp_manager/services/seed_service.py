@@ -1,6 +1,7 @@
 from datetime import date, datetime, timezone
 from rsvp_manager.extensions import db
 from rsvp_manager.models import Event, Guest, Invitation, Tag
+from rsvp_manager.services.invitation_service import refresh_rsvp_counts
 
 
 def seed(user_id):
@@ -125,6 +126,7 @@ def seed(user_id):
     ]
     db.session.add_all(invitations)
     db.session.flush()
+    refresh_rsvp_counts(e.id for e in events)
 
     tag_names = ["Family", "Cycling", "Single", "Colleague"]
     tags = []
@@ -2,6 +2,8 @@ from datetime import datetime, timezone, timedelta
 from rsvp_manager.extensions import db
 from rsvp_manager.models import Event, Guest, Tag, guest_tags
 from rsvp_manager.services.history_service import log_action
+from rsvp_manager.services.invitation_service import refresh_rsvp_counts_for_guests
+from rsvp_manager.services.seating_service import bump_seating_versions_for_guest
 
 
 TRASH_RETENTION_DAYS = 30
@@ -39,6 +41,7 @@ def restore_guest(guest_id, user_id):
     if not guest or guest.user_id != user_id or guest.deleted_at is None:
         return None
     guest.deleted_at = None
+    refresh_rsvp_counts_for_guests([guest.id])
     log_action(user_id, "restored_guest", "guest", guest.id, f"You restored {guest.full_name}")
     db.session.commit()
     return guest
@@ -67,6 +70,7 @@ def permanently_delete_guest(guest_id, user_id):
     guest = db.session.get(Guest, guest_id)
     if not guest or guest.user_id != user_id or guest.deleted_at is None:
         return False
+    bump_seating_versions_for_guest(guest.id)
     db.session.delete(guest)
     db.session.commit()
     return True
@@ -96,6 +100,7 @@ def purge_expired(user_id=None):
     if user_id:
         g_filters.append(Guest.user_id == user_id)
     for guest in Guest.query.filter(*g_filters).all():
+        bump_seating_versions_for_guest(guest.id)
         db.session.delete(guest)
 
     t_filters = [Tag.deleted_at < cutoff]
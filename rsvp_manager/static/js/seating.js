@@ -47,6 +47,32 @@ document.addEventListener("DOMContentLoaded", function () {
         }).catch(window.handleFetchError);
     }
 
+    // Merge a delta response (changed tables and unseated entries) into state
+    function applyDelta(delta) {
+        delta.tables.forEach(function (table) {
+            var idx = state.tables.findIndex(function (t) { return t.id === table.id; });
+            if (idx === -1) state.tables.push(table);
+            else state.tables[idx] = table;
+        });
+        state.tables.sort(function (a, b) { return a.table_number - b.table_number; });
+        var removed = {};
+        delta.unseated_removed.forEach(function (id) { removed[id] = true; });
+        state.unseated = state.unseated.filter(function (g) { return !removed[g.invitation_id]; })
+            .concat(delta.unseated_added);
+        state.unseated.sort(function (a, b) {
+            return a.last_name_sort_key.localeCompare(b.last_name_sort_key) ||
+                a.first_name.toLowerCase().localeCompare(b.first_name.toLowerCase());
+        });
+        state.score = delta.score;
+    }
+
+    // Seat changes (assign, swap, unseat, lock, batch) answer with a delta of
+    // the tables and unseated entries they touched, so patch instead of reloading
+    function applySeatChange(data) {
+        applyDelta(data);
+        render();
+    }
+
     function saveStateForUndo() {
         lastAction = JSON.parse(JSON.stringify(state));
     }
@@ -55,6 +81,7 @@ document.addEventListener("DOMContentLoaded", function () {
         renderUnseated();
         renderTables();
         updateHeaderCount();
+        syncVenueMode();
     }
 
     function updateHeaderCount() {
@@ -196,8 +223,8 @@ document.addEventListener("DOMContentLoaded", function () {
             e.stopPropagation();
             saveStateForUndo();
             exitMoveMode();
-            api("DELETE", "/assign/" + assignmentId).then(function () {
-                load();
+            api("DELETE", "/assign/" + assignmentId).then(function (data) {
+                applySeatChange(data);
                 window.showToast("Guest unseated", function () { undoLastAction(); });
             }).catch(window.handleFetchError);
         });
@@ -225,9 +252,9 @@ document.addEventListener("DOMContentLoaded", function () {
         lockBtn.innerHTML = '<svg width="12" height="12" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round"><rect x="3" y="11" width="18" height="11" rx="2"/><path d="M7 11V7a5 5 0 0 1 10 0v4"/></svg>';
         lockBtn.addEventListener("click", function (e) {
             e.stopPropagation();
-            api("POST", "/assign/" + assignmentId + "/lock").then(function () {
+            api("POST", "/assign/" + assignmentId + "/lock").then(function (data) {
                 exitMoveMode();
-                load();
+                applySeatChange(data);
             }).catch(window.handleFetchError);
         });
 
@@ -305,7 +332,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 lockAllBtn.title = allLocked ? "Unlock all seats" : "Lock all seats";
                 lockAllBtn.innerHTML = '<svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="11" width="18" height="11" rx="2" ry="2"/><path d="M7 11V7a5 5 0 0 1 10 0v4"/></svg>';
                 lockAllBtn.addEventListener("click", function () {
-                    api("POST", "/tables/" + table.id + "/lock", { lock: !allLocked }).then(function () { load(); });
+                    api("POST", "/tables/" + table.id + "/lock", { lock: !allLocked }).then(applySeatChange).catch(window.handleFetchError);
                 });
                 actions.appendChild(lockAllBtn);
             }
@@ -582,7 +609,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 api("POST", "/swap", {
                     assignment_id_a: parseInt(movingGuest.assignmentId),
                     assignment_id_b: parseInt(aId)
-                }).then(function () { exitMoveMode(); load(); }).catch(function (err) {
+                }).then(function (data) { exitMoveMode(); applySeatChange(data); }).catch(function (err) {
                     window.showToast(err.message || "Failed to swap");
                 });
                 e.stopPropagation();
@@ -606,14 +633,11 @@ document.addEventListener("DOMContentLoaded", function () {
                     }
                     if (seatPos) break;
                 }
-                // Remove the seated guest, then assign the unseated one
-                api("DELETE", "/assign/" + aId).then(function () {
-                    return api("POST", "/assign", {
-                        invitation_id: parseInt(movingGuest.invitationId),
-                        table_id: tId,
-                        seat_position: seatPos
-                    });
-                }).then(function () { exitMoveMode(); load(); }).catch(function (err) {
+                // Remove the seated guest and assign the unseated one in one batch
+                api("POST", "/batch", { operations: [
+                    { op: "unseat", assignment_id: parseInt(aId) },
+                    { op: "assign", invitation_id: parseInt(movingGuest.invitationId), table_id: parseInt(tId), seat_position: seatPos }
+                ] }).then(function (data) { exitMoveMode(); applySeatChange(data); }).catch(function (err) {
                     window.showToast(err.message || "Failed to replace");
                 });
                 e.stopPropagation();
@@ -643,13 +667,9 @@ document.addEventListener("DOMContentLoaded", function () {
             saveStateForUndo();
             if (movingGuest.assignmentId) {
                 // Move existing guest to empty seat
-                api("DELETE", "/assign/" + movingGuest.assignmentId).then(function () {
-                    return api("POST", "/assign", {
-                        invitation_id: parseInt(movingGuest.invitationId),
-                        table_id: tableId,
-                        seat_position: seatPos
-                    });
-                }).then(function () { exitMoveMode(); load(); }).catch(function (err) {
+                api("POST", "/batch", { operations: [
+                    { op: "assign", invitation_id: parseInt(movingGuest.invitationId), table_id: tableId, seat_position: seatPos }
+                ] }).then(function (data) { exitMoveMode(); applySeatChange(data); }).catch(function (err) {
                     window.showToast(err.message || "Failed to move");
                 });
             } else {
@@ -658,7 +678,7 @@ document.addEventListener("DOMContentLoaded", function () {
                     invitation_id: parseInt(movingGuest.invitationId),
                     table_id: tableId,
                     seat_position: seatPos
-                }).then(function () { exitMoveMode(); load(); }).catch(function (err) {
+                }).then(function (data) { exitMoveMode(); applySeatChange(data); }).catch(function (err) {
                     window.showToast(err.message || "Failed to assign");
                 });
             }
@@ -679,8 +699,8 @@ document.addEventListener("DOMContentLoaded", function () {
         var aId = seatAttr(seat, "assignment-id");
         exitMoveMode();
         saveStateForUndo();
-        api("DELETE", "/assign/" + aId).then(function () {
-            load();
+        api("DELETE", "/assign/" + aId).then(function (data) {
+            applySeatChange(data);
             window.showToast("Guest unseated", function () { undoLastAction(); });
         }).catch(window.handleFetchError);
     });
@@ -695,7 +715,7 @@ document.addEventListener("DOMContentLoaded", function () {
         if (!seat || seat.closest("#seating-table-overlay")) return;
         e.preventDefault();
         var aId = seatAttr(seat, "assignment-id");
-        api("POST", "/assign/" + aId + "/lock").then(function () { load(); }).catch(window.handleFetchError);
+        api("POST", "/assign/" + aId + "/lock").then(applySeatChange).catch(window.handleFetchError);
     });
 
     // ── Picker modal ────────────────────────────────────────────────────
@@ -725,7 +745,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 saveStateForUndo();
                 api("POST", "/assign", {
                     invitation_id: g.invitation_id, table_id: tableId, seat_position: seatPos
-                }).then(function () { load(); }).catch(function (err) {
+                }).then(applySeatChange).catch(function (err) {
                     window.showToast(err.message || "Failed to assign");
                 });
             });
@@ -744,9 +764,11 @@ document.addEventListener("DOMContentLoaded", function () {
     // ── Undo ────────────────────────────────────────────────────────────
     function undoLastAction() {
         if (!lastAction) return;
-        // Reload from server (undo is best-effort via reload, since we saved pre-action state)
-        // For a proper undo we'd need server-side support, so we just reload
-        load();
+        // The server keeps the seating history; step it back one revision
+        api("POST", "/undo").then(function (data) {
+            state = data;
+            render();
+        }).catch(window.handleFetchError);
         lastAction = null;
     }
 
@@ -756,9 +778,42 @@ document.addEventListener("DOMContentLoaded", function () {
         state.tables.forEach(function (t) { attending += Object.keys(t.seats).length; });
         if (attending <= 0) return 12;
         var cap = attending % 2 === 0 ? attending : attending + 1;
-        var options = [4,6,8,10,12,14,16,18,20,24,30];
+        var options = Array.prototype.map.call(capacitySelect.options, function (o) { return parseInt(o.value); });
         for (var i = 0; i < options.length; i++) { if (options[i] >= cap) return options[i]; }
-        return 30;
+        return options[options.length - 1];
+    }
+
+    // ── Large venue mode ────────────────────────────────────────────────
+    var VENUE_CAPACITIES = [40, 50, 60, 80, 100, 150, 200, 300, 500];
+    var venueToggle = document.getElementById("seating-venue-toggle");
+
+    function syncVenueMode() {
+        if (venueToggle) venueToggle.checked = !!state.venue_mode;
+        if (!capacitySelect) return;
+        var extra = capacitySelect.querySelectorAll("option[data-venue]");
+        if (!!state.venue_mode === (extra.length > 0)) return;
+        extra.forEach(function (o) { o.remove(); });
+        if (state.venue_mode) {
+            VENUE_CAPACITIES.forEach(function (cap) {
+                var o = document.createElement("option");
+                o.value = String(cap);
+                o.textContent = String(cap);
+                o.dataset.venue = "1";
+                capacitySelect.appendChild(o);
+            });
+        }
+    }
+
+    if (venueToggle) {
+        venueToggle.addEventListener("change", function () {
+            api("POST", "/venue-mode", { enabled: venueToggle.checked }).then(function (data) {
+                state = data;
+                render();
+            }).catch(function (err) {
+                venueToggle.checked = !venueToggle.checked;
+                window.showToast(err.message || "Failed to switch venue mode");
+            });
+        });
     }
 
     // ── Add / Edit table modal ──────────────────────────────────────────
@@ -830,8 +885,8 @@ document.addEventListener("DOMContentLoaded", function () {
                 autoMenu.style.display = "none";
                 var mode = btn.dataset.mode;
                 saveStateForUndo();
-                api("POST", "/smart-assign", { mode: mode }).then(function (data) {
-                    state = data;
+                api("POST", "/smart-assign", { mode: mode, response: "delta" }).then(function (data) {
+                    applyDelta(data);
                     render();
                     window.trackEvent("seating-auto-assigned", { mode: mode });
                     window.showToast("Seating updated (" + mode + ")", function () { undoLastAction(); });
@@ -946,13 +1001,9 @@ document.addEventListener("DOMContentLoaded", function () {
             var seatPos = parseInt(seatAttr(seat, "seat-pos"));
             if (data.assignmentId) {
                 // Move filled seat to empty seat
-                api("DELETE", "/assign/" + data.assignmentId).then(function () {
-                    return api("POST", "/assign", {
-                        invitation_id: parseInt(data.invitationId),
-                        table_id: tableId,
-                        seat_position: seatPos
-                    });
-                }).then(function () { load(); }).catch(function (err) {
+                api("POST", "/batch", { operations: [
+                    { op: "assign", invitation_id: parseInt(data.invitationId), table_id: tableId, seat_position: seatPos }
+                ] }).then(applySeatChange).catch(function (err) {
                     window.showToast(err.message || "Failed to move");
                 });
             } else {
@@ -961,7 +1012,7 @@ document.addEventListener("DOMContentLoaded", function () {
                     invitation_id: parseInt(data.invitationId),
                     table_id: tableId,
                     seat_position: seatPos
-                }).then(function () { load(); }).catch(function (err) {
+                }).then(applySeatChange).catch(function (err) {
                     window.showToast(err.message || "Failed to assign");
                 });
             }
@@ -972,7 +1023,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 api("POST", "/swap", {
                     assignment_id_a: parseInt(data.assignmentId),
                     assignment_id_b: parseInt(targetAId)
-                }).then(function () { load(); }).catch(function (err) {
+                }).then(applySeatChange).catch(function (err) {
                     window.showToast(err.message || "Failed to swap");
                 });
             } else if (!data.assignmentId) {
@@ -989,13 +1040,10 @@ document.addEventListener("DOMContentLoaded", function () {
                     }
                     if (seatPos) break;
                 }
-                api("DELETE", "/assign/" + targetAId).then(function () {
-                    return api("POST", "/assign", {
-                        invitation_id: parseInt(data.invitationId),
-                        table_id: tId,
-                        seat_position: seatPos
-                    });
-                }).then(function () { load(); }).catch(function (err) {
+                api("POST", "/batch", { operations: [
+                    { op: "unseat", assignment_id: parseInt(targetAId) },
+                    { op: "assign", invitation_id: parseInt(data.invitationId), table_id: tId, seat_position: seatPos }
+                ] }).then(applySeatChange).catch(function (err) {
                     window.showToast(err.message || "Failed to replace");
                 });
             }
@@ -1,7 +1,13 @@
 """Shared utility functions and constants."""
+import re
+import unicodedata
+from functools import lru_cache
 
 VALID_GENDERS = ("Male", "Female")
 
+# Rows per INSERT when creating guests, invitations and history in bulk
+BULK_INSERT_CHUNK_SIZE = 500
+
 # Nobility particles / tussenvoegsels across cultures.
 # Ordered longest-first so greedy matching works correctly
 # (e.g. "van der" is tested before "van").
@@ -39,6 +45,17 @@ NOBILITY_PARTICLES = [
     "d", "l", "t",
 ]
 
+# One anchored alternation tried in list order, so the first particle that
+# matches wins as in the list. Particles ending in an apostrophe or hyphen
+# attach directly to the name; the others are followed by a space.
+_PARTICLE_RE = re.compile(
+    "(?:" + "|".join(
+        re.escape(p if p.endswith(("'", "-")) else p + " ") for p in NOBILITY_PARTICLES
+    ) + ")(?=.)",
+    re.DOTALL,
+)
+NAME_SORT_CACHE_SIZE = 65536
+
 
 def _normalize_apostrophes(s):
     """Replace curly/smart quotes with straight apostrophe for particle matching."""
@@ -60,6 +77,7 @@ def _is_lowercase_particle(name, particle_len):
     return True
 
 
+@lru_cache(maxsize=NAME_SORT_CACHE_SIZE)
 def get_last_name_sort_key(last_name):
     """Return a sort key for a last name that respects nobility particle conventions.
 
@@ -76,32 +94,46 @@ def get_last_name_sort_key(last_name):
     # Normalize smart quotes for matching
     normalized = _normalize_apostrophes(last_name)
 
-    for particle in NOBILITY_PARTICLES:
-        # Check for particles that end with an apostrophe (d', l') — no space after
-        if particle.endswith("'"):
-            if normalized.lower().startswith(particle) and len(normalized) > len(particle):
-                if _is_lowercase_particle(normalized, len(particle)):
-                    return normalized[len(particle):].lower()
-                else:
-                    return normalized.lower()
-        # Check for particles ending with hyphen (al-, el-) — no space after
-        elif particle.endswith("-"):
-            if normalized.lower().startswith(particle) and len(normalized) > len(particle):
-                if _is_lowercase_particle(normalized, len(particle)):
-                    return normalized[len(particle):].lower()
-                else:
-                    return normalized.lower()
-        else:
-            prefix = particle + " "
-            if normalized.lower().startswith(prefix) and len(normalized) > len(prefix):
-                if _is_lowercase_particle(normalized, len(prefix)):
-                    return normalized[len(prefix):].lower()
-                else:
-                    return normalized.lower()
+    # Match and slice the same lowercased string: lowercasing can change the
+    # length ("İ" becomes two characters), so its offsets don't fit the original
+    lowered = normalized.lower()
+    # Only match particles followed by at least one more character of the name
+    match = _PARTICLE_RE.match(lowered)
+    if match:
+        if _is_lowercase_particle(normalized, match.end()):
+            return lowered[match.end():]
+        return lowered
 
     return last_name.lower()
 
 
+def normalize_name(name):
+    """Normalize name: remove accents, lowercase, collapse whitespace."""
+    if not name:
+        return ""
+    nfkd = unicodedata.normalize('NFKD', name)
+    result = "".join(c for c in nfkd if not unicodedata.combining(c)).lower().strip()
+    # Collapse multiple spaces into one
+    return " ".join(result.split())
+
+
+def get_name_key(first_name, last_name):
+    """Return the "first|last" key under which two guests count as the same person."""
+    return normalize_name(first_name) + "|" + normalize_name(last_name)
+
+
+def chunked(items, size):
+    """Yield successive lists of at most ``size`` items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def format_date(d, fmt="display"):
     """Format a date consistently across the app.
 
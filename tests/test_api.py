@@ -51,6 +51,35 @@ class TestEventsAPI:
         assert data["data"]["page"] == 1
         assert data["data"]["total"] == 1
 
+    def test_list_events_by_cursor(self, logged_in_client, test_app, user):
+        from rsvp_manager.services import event_service
+        with test_app.app_context():
+            for i in range(event_service.EVENTS_PER_PAGE + 5):
+                db.session.add(Event(user_id=user, name=f"E{i}", event_type="Dinner",
+                                     date=date(2026, 1, 1 + i % 3)))
+            db.session.commit()
+            expected = [e.id for e in Event.query.order_by(Event.date.desc(), Event.id.desc())]
+
+        first = logged_in_client.get("/api/v1/events?cursor=").get_json()["data"]
+        assert first["prev_cursor"] is None
+        second = logged_in_client.get(
+            f"/api/v1/events?cursor={first['next_cursor']}").get_json()["data"]
+        assert [e["id"] for e in first["items"] + second["items"]] == expected
+        assert second["next_cursor"] is None
+        back = logged_in_client.get(
+            f"/api/v1/events?cursor={second['prev_cursor']}").get_json()["data"]
+        assert back["items"] == first["items"]
+        assert back["prev_cursor"] is None
+        assert logged_in_client.get("/api/v1/events?cursor=bogus").status_code == 400
+
+    def test_cursor_values_of_the_wrong_type(self, logged_in_client, sample_event):
+        from rsvp_manager.pagination import encode_cursor
+        for values in (["x", None], [None, 1], [date(2026, 6, 1), "1"], [date(2026, 6, 1), True]):
+            r = logged_in_client.get(f"/api/v1/events?cursor={encode_cursor(values)}")
+            assert r.status_code == 400
+        r = logged_in_client.get(f"/api/v1/events?cursor={encode_cursor([date(2026, 6, 1), 1])}")
+        assert r.status_code == 200
+
     def test_get_event(self, logged_in_client, sample_event):
         resp = logged_in_client.get(f"/api/v1/events/{sample_event}")
         assert resp.status_code == 200
@@ -134,6 +163,90 @@ class TestGuestsAPI:
         assert data["data"]["page"] == 1
         assert data["data"]["total"] == 1
 
+    def test_list_guests_invitation_summary(self, logged_in_client, test_app, sample_invitation):
+        with test_app.app_context():
+            db.session.get(Invitation, sample_invitation).status = "Attending"
+            db.session.commit()
+        for url in ("/api/v1/friends", "/api/v1/friends?cursor="):
+            item = logged_in_client.get(url).get_json()["data"]["items"][0]
+            assert item["invitation_summary"] == {"invited": 1, "attending": 1, "pending": 0, "declined": 0}
+            assert "invitations" not in item
+            item = logged_in_client.get(url + ("&" if "?" in url else "?") + "include=invitations").get_json()["data"]["items"][0]
+            assert item["invitation_summary"]["attending"] == 1
+            assert [i["event_name"] for i in item["invitations"]] == ["Test Event"]
+
+    def test_list_guests_by_cursor(self, logged_in_client, test_app, user):
+        from rsvp_manager.services import friend_service
+        with test_app.app_context():
+            for i in range(friend_service.GUESTS_PER_PAGE + 1):
+                db.session.add(Guest(user_id=user, first_name=f"G{i:02d}", gender="Male"))
+            db.session.commit()
+        first = logged_in_client.get("/api/v1/friends?cursor=").get_json()["data"]
+        assert len(first["items"]) == friend_service.GUESTS_PER_PAGE
+        rest = logged_in_client.get(
+            f"/api/v1/friends?cursor={first['next_cursor']}").get_json()["data"]
+        assert [g["first_name"] for g in rest["items"]] == [f"G{friend_service.GUESTS_PER_PAGE:02d}"]
+        assert rest["next_cursor"] is None and rest["prev_cursor"]
+
+    def test_list_guests_sorted_by_last_name(self, logged_in_client, test_app, user, monkeypatch):
+        from rsvp_manager.services import friend_service
+        with test_app.app_context():
+            for first, last in [("Ann", "Smith"), ("Guy", "de Gaulle"), ("Bea", "Le Pen"),
+                                ("Al", "von Humboldt"), ("Zoe", "de Gaulle")]:
+                db.session.add(Guest(user_id=user, first_name=first, last_name=last, gender="Female"))
+            db.session.commit()
+        expected = ["Guy de Gaulle", "Zoe de Gaulle", "Al von Humboldt", "Bea Le Pen", "Ann Smith"]
+        paged = logged_in_client.get("/api/v1/friends").get_json()["data"]
+        assert [g["full_name"] for g in paged["items"]] == expected
+        monkeypatch.setattr(friend_service, "GUESTS_PER_PAGE", 2)
+        page = logged_in_client.get("/api/v1/friends?cursor=").get_json()["data"]
+        names = [g["full_name"] for g in page["items"]]
+        while page["next_cursor"]:
+            page = logged_in_client.get(
+                f"/api/v1/friends?cursor={page['next_cursor']}").get_json()["data"]
+            names += [g["full_name"] for g in page["items"]]
+        assert names == expected
+
+    def test_renaming_guest_updates_sort_keys(self, logged_in_client, test_app, sample_guest):
+        api_put(logged_in_client, f"/api/v1/friends/{sample_guest}", {
+            "first_name": "Émile", "last_name": "van der Berg",
+        })
+        with test_app.app_context():
+            guest = db.session.get(Guest, sample_guest)
+            assert guest.last_name_sort_key == "berg"
+            assert guest.first_name_lower == "émile"
+
+    def test_same_name_matched_across_hosts(self, logged_in_client, test_app, user, user2):
+        from rsvp_manager.models import EventCohost
+        with test_app.app_context():
+            event = Event(user_id=user2, name="Shared", event_type="Party", date=date(2026, 7, 1))
+            theirs = Guest(user_id=user2, first_name="Élise ", last_name="Du  Pont", gender="Female")
+            mine = Guest(user_id=user, first_name="elise", last_name="du pont", gender="Female")
+            db.session.add_all([event, theirs, mine])
+            db.session.flush()
+            db.session.add(EventCohost(event_id=event.id, user_id=user, role="cohost",
+                                       joined_at=datetime.now()))
+            db.session.add(Invitation(event_id=event.id, guest_id=theirs.id, status="Attending"))
+            # Not shared with the viewer
+            private = Event(user_id=user2, name="Private", event_type="Party", date=date(2026, 7, 2))
+            db.session.add(private)
+            db.session.flush()
+            db.session.add(Invitation(event_id=private.id, guest_id=theirs.id, status="Pending"))
+            db.session.commit()
+            assert mine.name_key == theirs.name_key == "elise|du pont"
+            event_id, theirs_id, mine_id = event.id, theirs.id, mine.id
+
+        data = logged_in_client.get(f"/api/v1/friends/{theirs_id}").get_json()["data"]
+        assert data["name_match_in_my_friends"] is True
+        data = logged_in_client.get(f"/api/v1/friends/{mine_id}").get_json()["data"]
+        assert [i["event_name"] for i in data["invitations"] if i.get("shared")] == ["Shared"]
+        available = logged_in_client.get(f"/api/v1/events/{event_id}/available-guests").get_json()["data"]
+        assert [g["name_match_in_event"] for g in available if g["id"] == mine_id] == [True]
+
+        api_put(logged_in_client, f"/api/v1/friends/{mine_id}", {"first_name": "Elisa"})
+        data = logged_in_client.get(f"/api/v1/friends/{theirs_id}").get_json()["data"]
+        assert data["name_match_in_my_friends"] is False
+
     def test_get_guest(self, logged_in_client, sample_guest):
         resp = logged_in_client.get(f"/api/v1/friends/{sample_guest}")
         assert resp.status_code == 200
@@ -54,6 +54,27 @@ class TestBulkAdd:
         data = r.get_json()
         assert len(data["added"]) == 0
 
+    def test_bulk_add_mixed_new_duplicate_and_invited(self, logged_in_client, sample_event,
+                                                      sample_guest, sample_invitation, test_app, user):
+        from rsvp_manager.models import ActivityLog, Tag
+        with test_app.app_context():
+            tag = Tag(user_id=user, name="Family")
+            bob = Guest(user_id=user, first_name="Bob", gender="Male", tags=[tag])
+            db.session.add(bob)
+            db.session.commit()
+            bob_id = bob.id
+            invited_before = db.session.get(Event, sample_event).invited_count
+        r = logged_in_client.post(f"/api/event/{sample_event}/bulk-add",
+            json={"guest_ids": [bob_id, sample_guest, bob_id]})
+        added = r.get_json()["added"]
+        assert [a["guest_id"] for a in added] == [bob_id]
+        assert [t["name"] for t in added[0]["guest_tags"]] == ["Family"]
+        with test_app.app_context():
+            assert Invitation.query.filter_by(event_id=sample_event).count() == 2
+            assert db.session.get(Invitation, added[0]["invitation_id"]).guest_id == bob_id
+            assert ActivityLog.query.filter_by(action="added_to_event").count() == 1
+            assert db.session.get(Event, sample_event).invited_count == invited_before + 1
+
     def test_bulk_add_skips_other_users_guests(self, logged_in_client, sample_event,
                                                  test_app, user2):
         with test_app.app_context():
@@ -142,3 +163,19 @@ class TestBulkCreateAndInvite:
             ]})
         data = r.get_json()
         assert len(data["added"]) == 3
+
+    def test_bulk_create_in_chunks(self, logged_in_client, sample_event, test_app, monkeypatch):
+        from rsvp_manager.models import ActivityLog
+        from rsvp_manager.services import invitation_service
+        monkeypatch.setattr(invitation_service, "BULK_INSERT_CHUNK_SIZE", 2)
+        r = logged_in_client.post(f"/api/event/{sample_event}/bulk-create-and-invite",
+            json={"guests": [{"first_name": f"G{i}", "gender": "Female"} for i in range(5)]})
+        added = r.get_json()["added"]
+        assert [a["first_name"] for a in added] == [f"G{i}" for i in range(5)]
+        with test_app.app_context():
+            for a in added:
+                inv = db.session.get(Invitation, a["invitation_id"])
+                assert inv.guest_id == a["guest_id"] and inv.event_id == sample_event
+            logged = ActivityLog.query.filter_by(action="added_to_event").all()
+            assert sorted(log.entity_id for log in logged) == sorted(a["invitation_id"] for a in added)
+            assert db.session.get(Event, sample_event).not_sent_count == 5
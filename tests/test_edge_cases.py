@@ -135,3 +135,26 @@ class TestEdgeCases:
         assert r.status_code == 200
         assert b"Past Party" in r.data
 
+
+
+class TestHistoryPage:
+    def test_pages_by_cursor(self, logged_in_client, test_app, user):
+        from rsvp_manager.models import ActivityLog
+        from rsvp_manager.services import history_service
+        with test_app.app_context():
+            same_time = datetime(2026, 1, 1, 12, 0)
+            for i in range(history_service.HISTORY_PER_PAGE + 2):
+                db.session.add(ActivityLog(user_id=user, action="created_guest", entity_type="guest",
+                                           description=f"Entry {i:02d}", created_at=same_time))
+            db.session.commit()
+            page = history_service.get_user_history(user)
+            assert page.items[0].description == f"Entry {history_service.HISTORY_PER_PAGE + 1:02d}"
+            older = history_service.get_user_history(user, cursor=page.next_cursor)
+            assert [e.description for e in older.items] == ["Entry 01", "Entry 00"]
+
+        r = logged_in_client.get("/history")
+        assert r.status_code == 200
+        assert b"Older" in r.data and b"Newer" not in r.data
+        r = logged_in_client.get(f"/history?cursor={page.next_cursor}")
+        assert b"Entry 00" in r.data and b"Newer" in r.data
+        assert logged_in_client.get("/history?cursor=%%%").status_code == 400
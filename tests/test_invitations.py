@@ -178,3 +178,95 @@ class TestInvitationFieldAPI:
         r = logged_in_client.post(f"/api/invitation/{inv_id}/field",
             json={"field": "notes", "value": "hacked"})
         assert r.status_code == 403
+
+
+class TestRsvpCounters:
+    XHR = {"X-Requested-With": "XMLHttpRequest"}
+
+    def counts(self, event_id):
+        e = db.session.get(Event, event_id)
+        db.session.refresh(e)
+        return (e.invited_count, e.not_sent_count, e.pending_count,
+                e.attending_count, e.declined_count)
+
+    def test_counters_follow_invitation_writes(self, logged_in_client, test_app,
+                                               sample_event, sample_invitation):
+        from rsvp_manager.services.invitation_service import refresh_rsvp_counts
+        with test_app.app_context():
+            refresh_rsvp_counts([sample_event])
+            db.session.commit()
+            assert self.counts(sample_event) == (1, 1, 0, 0, 0)
+        logged_in_client.post(f"/invitation/{sample_invitation}/send", headers=self.XHR)
+        logged_in_client.post(f"/invitation/{sample_invitation}/update",
+                              data={"status": "Attending"}, headers=self.XHR)
+        r = logged_in_client.post(f"/api/event/{sample_event}/bulk-create-and-invite",
+                                  json={"guests": [{"first_name": "Bo"}, {"first_name": "Cy"}]})
+        assert len(r.get_json()["added"]) == 2
+        with test_app.app_context():
+            assert self.counts(sample_event) == (3, 2, 0, 1, 0)
+        item = logged_in_client.get("/api/v1/events").get_json()["data"]["items"][0]
+        assert (item["invitation_count"], item["attending_count"]) == (3, 1)
+
+        logged_in_client.post(f"/invitation/{sample_invitation}/delete", headers=self.XHR)
+        with test_app.app_context():
+            assert self.counts(sample_event) == (2, 2, 0, 0, 0)
+
+    def test_trashed_guests_and_duplicates(self, logged_in_client, test_app,
+                                           sample_event, sample_guest, sample_invitation):
+        from rsvp_manager.services import event_service, friend_service, trash_service
+        from rsvp_manager.services.invitation_service import refresh_rsvp_counts
+        with test_app.app_context():
+            db.session.get(Invitation, sample_invitation).status = "Declined"
+            refresh_rsvp_counts([sample_event])
+            db.session.commit()
+            assert self.counts(sample_event) == (1, 0, 0, 0, 1)
+            guest = db.session.get(Guest, sample_guest)
+            friend_service.delete_guest(guest)
+            assert self.counts(sample_event) == (0, 0, 0, 0, 0)
+            trash_service.restore_guest(sample_guest, guest.user_id)
+            assert self.counts(sample_event) == (1, 0, 0, 0, 1)
+
+            event = db.session.get(Event, sample_event)
+            copy = event_service.duplicate_event(event, event.user_id, reset_status=False)
+            assert self.counts(copy.id) == (1, 0, 0, 0, 1)
+            copy = event_service.duplicate_event(event, event.user_id)
+            assert self.counts(copy.id) == (1, 1, 0, 0, 0)
+
+    def test_trashed_guests_left_out_of_event_outputs(self, logged_in_client, test_app,
+                                                      sample_event, sample_guest,
+                                                      sample_invitation):
+        from io import BytesIO
+        from openpyxl import load_workbook
+        from rsvp_manager.services import friend_service
+        from rsvp_manager.services.invitation_service import refresh_rsvp_counts
+        with test_app.app_context():
+            event = db.session.get(Event, sample_event)
+            other = Guest(user_id=event.user_id, first_name="Bo", gender="Male")
+            db.session.add(other)
+            db.session.flush()
+            db.session.add(Invitation(event_id=sample_event, guest_id=other.id,
+                                      status="Attending", date_invited=date.today()))
+            db.session.get(Invitation, sample_invitation).status = "Attending"
+            refresh_rsvp_counts([sample_event])
+            db.session.commit()
+            friend_service.delete_guest(db.session.get(Guest, sample_guest))
+
+        item = logged_in_client.get("/api/v1/events").get_json()["data"]["items"][0]
+        assert (item["invitation_count"], item["attending_count"]) == (1, 1)
+        r = logged_in_client.get("/export/events")
+        sheet = load_workbook(BytesIO(r.data)).active
+        header, row = [c.value for c in sheet[1]], [c.value for c in sheet[2]]
+        assert (row[header.index("Invited")], row[header.index("Attending")]) == (1, 1)
+
+    def test_repair_command(self, test_app, sample_event, sample_invitation):
+        runner = test_app.test_cli_runner()
+        result = runner.invoke(args=["repair-rsvp-counts", "--check"])
+        assert result.exit_code == 1
+        assert f": {sample_event}" in result.output
+        result = runner.invoke(args=["repair-rsvp-counts"])
+        assert result.exit_code == 0
+        with test_app.app_context():
+            assert self.counts(sample_event) == (1, 1, 0, 0, 0)
+        result = runner.invoke(args=["repair-rsvp-counts", "--check"])
+        assert result.exit_code == 0
+        assert result.output.startswith("0 event(s)")
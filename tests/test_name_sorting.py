@@ -165,6 +165,25 @@ class TestGetLastNameSortKey:
     def test_single_word_no_match(self):
         assert get_last_name_sort_key("Dupont") == "dupont"
 
+    def test_particle_without_remainder_falls_back_to_shorter_particle(self):
+        # "van de " has nothing after "van de ", so "van " is the particle
+        assert get_last_name_sort_key("van de ") == "de "
+
+    def test_lowercasing_that_changes_length(self):
+        # "İ".lower() is two characters; the name must not match "in de"
+        assert get_last_name_sort_key("İn de Berg") == "i̇n de berg"
+
+    def test_particle_before_a_name_that_lengthens_when_lowercased(self):
+        assert get_last_name_sort_key("van İnönü") == "i̇nönü"
+        assert get_last_name_sort_key("de İ") == "i̇"
+        assert get_last_name_sort_key("Van İnönü") == "van i̇nönü"
+
+    def test_repeated_names_are_cached(self):
+        get_last_name_sort_key.cache_clear()
+        get_last_name_sort_key("van der Berg")
+        assert get_last_name_sort_key("van der Berg") == "berg"
+        assert get_last_name_sort_key.cache_info().hits == 1
+
 
 class TestSortOrder:
     """Verify that names sort in the correct relative order."""
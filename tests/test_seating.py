@@ -0,0 +1,1293 @@
+"""Tests for the seating plan service, engine and API."""
+import json
+import random
+import time
+from datetime import date, datetime
+
+from rsvp_manager.extensions import db
+from rsvp_manager.models import (
+    Event, EventCohost, Guest, Invitation, SeatingTable, SeatAssignment, SeatNeighbour,
+    SeatingRevision, SeatingJob, Tag,
+)
+from rsvp_manager.services import seating_engine
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+def api_post(client, url, data=None):
+    headers = {"Content-Type": "application/json"}
+    return client.post(url, data=json.dumps(data or {}), headers=headers)
+
+
+def make_attending(event_id, user_id, n_male, n_female):
+    """Create attending guests for an event, returning their invitation ids."""
+    inv_ids = []
+    for i in range(n_male + n_female):
+        gender = "Male" if i < n_male else "Female"
+        g = Guest(user_id=user_id, first_name=f"G{i}", last_name=f"L{i}",
+                  gender=gender, date_created=datetime.now())
+        db.session.add(g)
+        db.session.flush()
+        inv = Invitation(event_id=event_id, guest_id=g.id, status="Attending",
+                         date_invited=date.today())
+        db.session.add(inv)
+        db.session.flush()
+        inv_ids.append(inv.id)
+    db.session.commit()
+    return inv_ids
+
+
+def make_table(event_id, number, capacity, shape="round"):
+    t = SeatingTable(event_id=event_id, table_number=number, shape=shape, capacity=capacity)
+    db.session.add(t)
+    db.session.commit()
+    return t.id
+
+
+def same_gender_neighbours(event_id):
+    total = 0
+    for t in SeatingTable.query.filter_by(event_id=event_id).all():
+        seat_map = {sa.seat_position: sa.invitation.guest.gender for sa in t.seat_assignments}
+        total += seating_engine.table_score(t.shape, t.capacity, seat_map)
+    return total
+
+
+# ── Engine ───────────────────────────────────────────────────────────────────
+
+class TestSeatAdjacency:
+    def test_round_wraps(self):
+        adj = seating_engine.seat_adjacency("round", 4)
+        assert adj[0] == (4, 2)
+        assert adj[3] == (3, 1)
+
+    def test_rectangular_does_not_wrap(self):
+        adj = seating_engine.seat_adjacency("rectangular", 4)
+        assert adj[0] == (2,)
+        assert adj[3] == (3,)
+
+    def test_cached(self):
+        assert seating_engine.seat_adjacency("long", 10) is seating_engine.seat_adjacency("long", 10)
+
+
+class TestVenueAdjacency:
+    def test_rectangular_across_and_corners(self):
+        # top 1-3, right end 4, bottom 7-5 (left to right), left end 8
+        adj = seating_engine.seat_adjacency("rectangular", 8, venue=True)
+        assert adj[0] == (2, 7, 8)
+        assert adj[3] == (3, 5)
+        assert adj[5] == (2, 5, 7)
+
+    def test_long_table_rows_face_each_other(self):
+        adj = seating_engine.seat_adjacency("long", 6, venue=True)
+        assert adj[0] == (2, 6)
+        assert adj[2] == (2, 4)
+
+    def test_large_rect_end_pairs(self):
+        adj = seating_engine.seat_adjacency("large_rect", 10, venue=True)
+        assert adj[3] == (3, 5)
+        assert adj[9] == (1, 9)
+
+    def test_round_keeps_ring(self):
+        assert seating_engine.seat_adjacency("round", 200, venue=True) == \
+            seating_engine.seat_adjacency("round", 200)
+
+    def test_symmetric_and_cached(self):
+        for shape in ("rectangular", "long", "large_rect"):
+            for capacity in (2, 3, 5, 6, 7, 31, 120):
+                adj = seating_engine.seat_adjacency(shape, capacity, venue=True)
+                assert len(adj) == capacity
+                for pos, neighbours in enumerate(adj, start=1):
+                    assert all(pos in adj[n - 1] for n in neighbours)
+        assert seating_engine.seat_adjacency("long", 300, True) is \
+            seating_engine.seat_adjacency("long", 300, True)
+
+    def test_optimize_large_banquet(self):
+        snapshot = {
+            "venue": True,
+            "tables": [(1, "long", 200, {})],
+            "guests": [(i, "Male" if i % 2 else "Female") for i in range(200)],
+        }
+        placements, score = seating_engine.optimize(snapshot, time_budget_ms=500,
+                                                     rng=random.Random(5))
+        assert len(placements) == 200
+        assert score == seating_engine.score_placements(snapshot, placements)
+
+
+class TestOptimize:
+    def test_balanced_round_table_alternates(self):
+        snapshot = {
+            "tables": [(1, "round", 10, {})],
+            "guests": [(i, "Male" if i < 5 else "Female") for i in range(10)],
+        }
+        placements, score = seating_engine.optimize(snapshot, rng=random.Random(1))
+        assert score == 0
+        assert len(placements) == 10
+        assert len({(t, p) for _, t, p in placements}) == 10
+
+    def test_locked_seats_untouched(self):
+        snapshot = {
+            "tables": [(1, "round", 6, {1: "Male", 2: "Female"})],
+            "guests": [(i, "Male" if i < 2 else "Female") for i in range(4)],
+        }
+        placements, score = seating_engine.optimize(snapshot, rng=random.Random(2))
+        assert {p for _, _, p in placements} == {3, 4, 5, 6}
+        assert score == 0
+
+    def test_more_seats_than_guests(self):
+        snapshot = {
+            "tables": [(1, "rectangular", 8, {}), (2, "round", 8, {})],
+            "guests": [(i, "Male") for i in range(3)],
+        }
+        placements, score = seating_engine.optimize(snapshot, rng=random.Random(3))
+        assert len(placements) == 3
+        assert score == 0
+
+    def test_large_plan_within_budget(self):
+        snapshot = {
+            "tables": [(t, "round", 10, {}) for t in range(60)],
+            "guests": [(i, "Male" if i % 3 else "Female") for i in range(600)],
+        }
+        started = time.perf_counter()
+        placements, _ = seating_engine.optimize(snapshot, time_budget_ms=300, rng=random.Random(4))
+        assert time.perf_counter() - started < 1.0
+        assert len(placements) == 600
+
+
+class TestSearch:
+    SNAPSHOT = {
+        "tables": [(1, "round", 8, {1: "Male"}), (2, "rectangular", 10, {})],
+        "guests": [(i, "Male" if i % 3 else "Female") for i in range(16)],
+    }
+
+    def test_alternating_balanced_round_table(self):
+        snapshot = {
+            "tables": [(1, "round", 10, {})],
+            "guests": [(i, "Male" if i < 5 else "Female") for i in range(10)],
+        }
+        placements = seating_engine.place_alternating(snapshot, random.Random(0))
+        assert len(placements) == 10
+        assert seating_engine.score_placements(snapshot, placements) == 0
+
+    def test_alternating_spreads_minority_across_tables(self):
+        snapshot = {
+            "tables": [(t, "round", 10, {}) for t in range(5)],
+            "guests": [(i, "Male" if i < 35 else "Female") for i in range(50)],
+        }
+        placements = seating_engine.place_alternating(snapshot, random.Random(0))
+        women = {}
+        for inv_id, table_id, _ in placements:
+            if inv_id >= 35:
+                women[table_id] = women.get(table_id, 0) + 1
+        assert women == {t: 3 for t in range(5)}
+        # 7 men / 3 women on a ring can't do better than 4 same-gender pairs
+        assert seating_engine.score_placements(snapshot, placements) == 20
+
+    def test_allocate_genders_accounts_for_seated_guests(self):
+        tables = [(1, "round", 10, {p: "Male" for p in range(1, 5)}), (2, "round", 10, {})]
+        assert seating_engine.allocate_genders(tables, 6, 10) == {1: (1, 5), 2: (5, 5)}
+
+    def test_allocate_genders_hundreds_of_tables(self):
+        tables = [(t, "round", 10, {1: "Male"} if t % 3 else {}) for t in range(500)]
+        started = time.perf_counter()
+        quotas = seating_engine.allocate_genders(tables, 2400, 2200)
+        assert time.perf_counter() - started < 0.5
+        assert sum(m for m, _ in quotas.values()) == 2400
+        assert sum(f for _, f in quotas.values()) == 2200
+        assert all(m + f <= 10 for m, f in quotas.values())
+
+    def test_seed_is_reproducible(self):
+        for mode in ("random", "alternating", "optimize"):
+            a = seating_engine.search(self.SNAPSHOT, mode=mode, restarts=3, seed=42)
+            b = seating_engine.search(self.SNAPSHOT, mode=mode, restarts=3, seed=42)
+            assert a == b
+
+    def test_keeps_best_restart(self):
+        best = seating_engine.search(self.SNAPSHOT, mode="random", restarts=8, seed=7)
+        singles = [seating_engine.search(self.SNAPSHOT, mode="random", seed=7 + i)[1]
+                   for i in range(8)]
+        assert best[1] == min(singles)
+        assert best[1] == seating_engine.score_placements(self.SNAPSHOT, best[0])
+
+    def test_process_pool_matches_inline(self):
+        inline = seating_engine.search(self.SNAPSHOT, mode="alternating", restarts=4, seed=3)
+        pooled = seating_engine.search(self.SNAPSHOT, mode="alternating", restarts=4, seed=3,
+                                       workers=2)
+        assert pooled == inline
+
+    def test_progress_reports_and_stops(self):
+        calls = []
+
+        def progress(completed, best_score):
+            calls.append((completed, best_score))
+            return completed < 2
+
+        placements, score = seating_engine.search(self.SNAPSHOT, mode="random", restarts=6,
+                                                  seed=7, progress=progress)
+        assert [c for c, _ in calls] == [1, 2]
+        assert calls[1][1] == score <= calls[0][1]
+
+    def test_progress_can_stop_a_running_restart(self, monkeypatch):
+        monkeypatch.setattr(seating_engine, "_PROGRESS_EVERY_S", 0)
+        # 35 men and 15 women can't avoid same-gender neighbours, so the
+        # annealing would run to its iteration cap unless stopped
+        snapshot = {
+            "tables": [(t, "round", 10, {}) for t in range(5)],
+            "guests": [(i, "Male" if i < 35 else "Female") for i in range(50)],
+        }
+        calls = []
+
+        def progress(completed, best_score):
+            calls.append((completed, best_score))
+            return False
+
+        placements, score = seating_engine.search(snapshot, mode="optimize", seed=1,
+                                                  time_budget_ms=5000, progress=progress)
+        # The restart reports its best placement so far before it finishes
+        assert calls == [(0, score), (1, score)]
+        assert len(placements) == 50
+
+    def test_longer_budget_raises_iteration_cap(self):
+        snapshot = {
+            "tables": [(t, "round", 10, {}) for t in range(5)],
+            "guests": [(i, "Male" if i < 35 else "Female") for i in range(50)],
+        }
+        checks = {}
+        for budget in (seating_engine.MAX_TIME_BUDGET_MS, 3 * seating_engine.MAX_TIME_BUDGET_MS):
+            calls = []
+            seating_engine.optimize(snapshot, time_budget_ms=budget, rng=random.Random(1),
+                                    stop=lambda best: calls.append(best) and False,
+                                    max_time_budget_ms=budget)
+            checks[budget] = len(calls)
+        short, long = checks.values()
+        # 400 iterations per free seat, checked every _CHECK_EVERY iterations
+        assert short == 50 * 400 // seating_engine._CHECK_EVERY
+        assert long == 3 * 50 * 400 // seating_engine._CHECK_EVERY
+
+
+class TestConstraintEngine:
+    @staticmethod
+    def seats(placements):
+        return {inv: (t, p) for inv, t, p in placements}
+
+    @staticmethod
+    def adjacent(seat, a, b, capacity=10):
+        return seat[a][0] == seat[b][0] and (seat[a][1] - seat[b][1]) % capacity in (1, capacity - 1)
+
+    def test_union_find_merges_overlapping_links(self):
+        groups = seating_engine.together_groups([(1, 2), (3, 4), (2, 3), (5,), (6, 7)])
+        assert sorted(groups) == [[1, 2, 3, 4], [6, 7]]
+
+    def test_wedding_keeps_every_couple_together(self):
+        snapshot = {
+            "tables": [(t, "round", 10, {}) for t in range(42)],
+            "guests": [(i, "Male" if i % 2 == 0 else "Female") for i in range(400)],
+            "together": [(i, i + 1) for i in range(0, 300, 2)] + [(300, 301, 302, 303)],
+            "apart": [(i, i + 2) for i in range(0, 40, 4)],
+        }
+        for mode in ("random", "alternating", "optimize"):
+            placements, _ = seating_engine.search(snapshot, mode=mode, seed=1)
+            seat = self.seats(placements)
+            assert len(seat) == 400
+            assert all(self.adjacent(seat, i, i + 1) for i in range(0, 300, 2))
+            assert len({seat[i][0] for i in range(300, 304)}) == 1
+            assert not any(self.adjacent(seat, a, b) for a, b in snapshot["apart"])
+
+    def test_group_grows_from_seated_member(self):
+        snapshot = {
+            "tables": [(1, "round", 8, {5: "Female"}), (2, "round", 8, {})],
+            "guests": [(1, "Male"), (2, "Male"), (3, "Female")],
+            "seated": {9: (1, 5)},
+            "together": [(9, 1)],
+        }
+        placements, rest = seating_engine.place_groups(snapshot, random.Random(0))
+        assert placements[0][0] == 1 and placements[0][1] == 1
+        assert placements[0][2] in (4, 6)
+        assert [g[0] for g in rest["guests"]] == [2, 3]
+
+    def test_apart_with_seated_partner(self):
+        snapshot = {
+            "tables": [(1, "round", 4, {1: "Male"})],
+            "guests": [(1, "Male"), (2, "Female"), (3, "Female")],
+            "seated": {9: (1, 1)},
+            "apart": [(9, 1)],
+        }
+        for mode in ("random", "optimize"):
+            placements, score = seating_engine.search(snapshot, mode=mode, seed=3)
+            assert self.seats(placements)[1] == (1, 3)
+            assert score == seating_engine.score_placements(snapshot, placements)
+
+
+# ── API ──────────────────────────────────────────────────────────────────────
+
+class TestOptimizeMode:
+    def test_auto_assign_optimize(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 6, 6)
+            make_table(sample_event, 1, 12)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/auto-assign",
+                     {"mode": "optimize", "time_budget_ms": 200})
+        assert r.status_code == 200
+        data = r.get_json()["data"]
+        assert data["unseated"] == []
+        with test_app.app_context():
+            assert same_gender_neighbours(sample_event) == 0
+
+    def test_shuffle_optimize_keeps_locked(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 4, 4)
+            tid = make_table(sample_event, 1, 8)
+            db.session.add(SeatAssignment(table_id=tid, invitation_id=inv_ids[0],
+                                          seat_position=3, is_locked=True))
+            db.session.commit()
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/shuffle",
+                     {"mode": "optimize"})
+        assert r.status_code == 200
+        with test_app.app_context():
+            sa = SeatAssignment.query.filter_by(invitation_id=inv_ids[0]).first()
+            assert sa.seat_position == 3 and sa.is_locked
+            assert SeatAssignment.query.count() == 8
+
+    def test_invalid_time_budget(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 1, 1)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/auto-assign",
+                     {"mode": "optimize", "time_budget_ms": "fast"})
+        assert r.status_code == 400
+
+    def test_unknown_mode(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 1, 1)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/shuffle",
+                     {"mode": "bogus"})
+        assert r.status_code == 400
+
+
+    def test_restarts_and_seed(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 5, 5)
+            make_table(sample_event, 1, 10)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/auto-assign",
+                     {"mode": "alternating", "restarts": 4, "seed": 11})
+        assert r.status_code == 200
+        with test_app.app_context():
+            first = {sa.invitation_id: sa.seat_position for sa in SeatAssignment.query.all()}
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/shuffle",
+                     {"mode": "alternating", "restarts": 4, "seed": 11})
+        assert r.status_code == 200
+        with test_app.app_context():
+            again = {sa.invitation_id: sa.seat_position for sa in SeatAssignment.query.all()}
+        assert again == first
+
+    def test_seed_recorded_and_replayed(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 5, 5)
+            make_table(sample_event, 1, 12)
+        url = f"/api/v1/events/{sample_event}/seating"
+        plan = api_post(logged_in_client, f"{url}/auto-assign", {"mode": "random"}).get_json()["data"]
+        run = plan["seed"]
+        assert run["mode"] == "random" and run["restarts"] == 1
+        first = {t["id"]: t["seats"] for t in plan["tables"]}
+        api_post(logged_in_client, f"{url}/clear")
+        assert logged_in_client.get(url).get_json()["data"]["seed"] is None
+        plan = api_post(logged_in_client, f"{url}/auto-assign",
+                        {"mode": "random", "seed": run["seed"]}).get_json()["data"]
+        assert {t["id"]: t["seats"] for t in plan["tables"]} == first
+        assert plan["seed"] == run
+
+    def test_invalid_restarts(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 1, 1)
+        url = f"/api/v1/events/{sample_event}/seating/auto-assign"
+        assert api_post(logged_in_client, url, {"restarts": 0}).status_code == 400
+        assert api_post(logged_in_client, url, {"restarts": 1000}).status_code == 400
+        assert api_post(logged_in_client, url, {"seed": "x"}).status_code == 400
+
+
+class TestVenueMode:
+    def test_capacity_cap_lifted(self, logged_in_client, test_app, sample_event):
+        url = f"/api/v1/events/{sample_event}/seating/tables"
+        assert api_post(logged_in_client, url, {"capacity": 120}).status_code == 400
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/venue-mode",
+                     {"enabled": True})
+        assert r.status_code == 200
+        assert r.get_json()["data"]["venue_mode"] is True
+        assert r.get_json()["data"]["max_capacity"] == 500
+        assert api_post(logged_in_client, url, {"capacity": 120}).status_code == 201
+        assert api_post(logged_in_client, url, {"capacity": 501}).status_code == 400
+
+    def test_cannot_leave_with_oversized_tables(self, logged_in_client, test_app, sample_event):
+        url = f"/api/v1/events/{sample_event}/seating/venue-mode"
+        api_post(logged_in_client, url, {"enabled": True})
+        api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/tables",
+                 {"capacity": 60})
+        assert api_post(logged_in_client, url, {"enabled": False}).status_code == 400
+        assert api_post(logged_in_client, url, {"enabled": "no"}).status_code == 400
+
+    def test_score_counts_across_the_table(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 2, 0)
+            tid = make_table(sample_event, 1, 4, shape="long")
+            # Seats 1 and 4 face each other at the left end of a long table
+            db.session.add(SeatAssignment(table_id=tid, invitation_id=inv_ids[0], seat_position=1))
+            db.session.add(SeatAssignment(table_id=tid, invitation_id=inv_ids[1], seat_position=4))
+            db.session.commit()
+        r = logged_in_client.get(f"/api/v1/events/{sample_event}/seating")
+        assert r.get_json()["data"]["score"] == 0
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/venue-mode",
+                     {"enabled": True})
+        assert r.get_json()["data"]["score"] == 1
+
+
+class TestSeatingConstraints:
+    def test_tag_couples_kept_together_on_shuffle(self, logged_in_client, test_app,
+                                                   sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 20, 20)
+            for n in range(4):
+                make_table(sample_event, n + 1, 10)
+            tag_ids = []
+            for c in range(10):
+                tag = Tag(user_id=user, name=f"Couple {c}")
+                db.session.add(tag)
+                for inv_id in (inv_ids[c], inv_ids[20 + c]):
+                    guest = db.session.get(Invitation, inv_id).guest
+                    guest.tags.append(tag)
+                db.session.flush()
+                tag_ids.append(tag.id)
+            db.session.commit()
+        url = f"/api/v1/events/{sample_event}/seating/constraints"
+        for tag_id in tag_ids:
+            r = api_post(logged_in_client, url, {"kind": "together", "tag_id": tag_id})
+            assert r.status_code == 201
+        r = api_post(logged_in_client, url, {"kind": "apart", "invitation_ids": [inv_ids[10], inv_ids[11]]})
+        assert r.status_code == 201
+        assert len(logged_in_client.get(url).get_json()["data"]) == 11
+
+        for mode in ("random", "alternating", "optimize"):
+            r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/shuffle",
+                         {"mode": mode})
+            assert r.status_code == 200
+            with test_app.app_context():
+                seat = {sa.invitation_id: (sa.table_id, sa.seat_position)
+                        for sa in SeatAssignment.query.all()}
+
+            def adjacent(a, b):
+                return seat[a][0] == seat[b][0] and (seat[a][1] - seat[b][1]) % 10 in (1, 9)
+            assert len(seat) == 40
+            assert all(adjacent(inv_ids[c], inv_ids[20 + c]) for c in range(10))
+            assert not adjacent(inv_ids[10], inv_ids[11])
+
+    def test_validation(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 1)
+        url = f"/api/v1/events/{sample_event}/seating/constraints"
+        assert api_post(logged_in_client, url, {"kind": "near", "tag_id": 1}).status_code == 400
+        assert api_post(logged_in_client, url, {"kind": "apart"}).status_code == 400
+        assert api_post(logged_in_client, url, {"kind": "apart", "tag_id": 999}).status_code == 400
+        assert api_post(logged_in_client, url,
+                        {"kind": "apart", "invitation_ids": [inv_ids[0], inv_ids[0]]}).status_code == 400
+        pair = {"kind": "apart", "invitation_ids": inv_ids}
+        r = api_post(logged_in_client, url, pair)
+        assert r.status_code == 201
+        assert api_post(logged_in_client, url, pair).status_code == 400
+        cid = r.get_json()["data"]["id"]
+        assert logged_in_client.delete(f"{url}/{cid}").status_code == 204
+        assert logged_in_client.delete(f"{url}/{cid}").status_code == 404
+
+
+class TestFreshMode:
+    def test_neighbour_index_follows_moves(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 2, 1)
+            tid = make_table(sample_event, 1, 6)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/batch", {"operations": [
+            {"op": "assign", "invitation_id": inv_ids[0], "table_id": tid, "seat_position": 1},
+            {"op": "assign", "invitation_id": inv_ids[1], "table_id": tid, "seat_position": 2},
+            {"op": "assign", "invitation_id": inv_ids[2], "table_id": tid, "seat_position": 4},
+        ]})
+        with test_app.app_context():
+            assert SeatNeighbour.query.count() == 1
+        r = api_post(logged_in_client, f"{url}/assign",
+                     {"invitation_id": inv_ids[2], "table_id": tid, "seat_position": 3})
+        assert r.status_code == 200
+        with test_app.app_context():
+            assert SeatNeighbour.query.count() == 2
+            aid = SeatAssignment.query.filter_by(invitation_id=inv_ids[1]).first().id
+        logged_in_client.delete(f"{url}/assign/{aid}")
+        with test_app.app_context():
+            assert SeatNeighbour.query.count() == 0
+
+    def test_table_edits_keep_seed_and_neighbours(self, logged_in_client, test_app,
+                                                  sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 3, 3)
+            tid = make_table(sample_event, 1, 6)
+        url = f"/api/v1/events/{sample_event}/seating"
+        run = api_post(logged_in_client, f"{url}/auto-assign",
+                       {"seed": 5}).get_json()["data"]["seed"]
+        with test_app.app_context():
+            rows = {n.id for n in SeatNeighbour.query.all()}
+            assert len(rows) == 6
+        assert api_post(logged_in_client, f"{url}/tables", {"capacity": 8}).status_code == 201
+        logged_in_client.put(f"{url}/tables/{tid}", json={"label": "Family"})
+        assert logged_in_client.get(url).get_json()["data"]["seed"] == run
+        with test_app.app_context():
+            assert {n.id for n in SeatNeighbour.query.all()} == rows
+
+        logged_in_client.put(f"{url}/tables/{tid}", json={"capacity": 10})
+        assert logged_in_client.get(url).get_json()["data"]["seed"] is None
+        with test_app.app_context():
+            assert SeatNeighbour.query.count() == 5
+
+    def test_fresh_avoids_previous_neighbours(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 4, 4)
+            tid = make_table(sample_event, 1, 8)
+            guest_ids = [db.session.get(Invitation, i).guest_id for i in inv_ids]
+            second = Event(user_id=user, name="Second Dinner", event_type="Dinner",
+                           date=date(2026, 7, 15), date_created=date.today())
+            db.session.add(second)
+            db.session.flush()
+            second_inv = []
+            for guest_id in guest_ids:
+                inv = Invitation(event_id=second.id, guest_id=guest_id, status="Attending",
+                                 date_invited=date.today())
+                db.session.add(inv)
+                db.session.flush()
+                second_inv.append(inv.id)
+            db.session.commit()
+            second_id = second.id
+            make_table(second_id, 1, 8)
+        # First dinner: M1 F1 M2 F2 M3 F3 M4 F4 around the table
+        order = [inv_ids[0], inv_ids[4], inv_ids[1], inv_ids[5],
+                 inv_ids[2], inv_ids[6], inv_ids[3], inv_ids[7]]
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/batch", {
+            "operations": [{"op": "assign", "invitation_id": inv_id, "table_id": tid,
+                            "seat_position": pos} for pos, inv_id in enumerate(order, start=1)]})
+        assert r.status_code == 200
+
+        r = api_post(logged_in_client, f"/api/v1/events/{second_id}/seating/auto-assign",
+                     {"mode": "fresh", "seed": 1, "time_budget_ms": 500})
+        assert r.status_code == 200
+        with test_app.app_context():
+            first_pairs = {(n.guest_a_id, n.guest_b_id)
+                           for n in SeatNeighbour.query.filter_by(event_id=sample_event)}
+            second_pairs = {(n.guest_a_id, n.guest_b_id)
+                            for n in SeatNeighbour.query.filter_by(event_id=second_id)}
+            assert len(first_pairs) == len(second_pairs) == 8
+            assert not first_pairs & second_pairs
+            assert same_gender_neighbours(second_id) == 0
+
+
+# ── Score state ──────────────────────────────────────────────────────────────
+
+class TestSeatingState:
+    def test_initial_score_matches_rescore(self):
+        seat_map = {1: "Male", 2: "Male", 3: "Female", 4: "Female"}
+        state = seating_engine.SeatingState([(7, "round", 4, seat_map)])
+        assert state.score == seating_engine.table_score("round", 4, seat_map) == 2
+        assert state.table_scores == {7: 2}
+
+    def test_incremental_moves(self):
+        state = seating_engine.SeatingState([
+            (1, "round", 4, {1: "Male", 2: "Male"}),
+            (2, "rectangular", 4, {}),
+        ])
+        assert state.score == 1
+        changed = state.apply([(1, 2, None), (2, 1, "Male")])
+        assert changed == {1: 0, 2: 0}
+        assert state.score == 0
+        state.apply([(2, 2, "Male")])
+        assert state.score == 1 and state.table_scores[2] == 1
+
+
+class TestScoreDeltas:
+    def _seat_all(self, test_app, event_id, user_id):
+        with test_app.app_context():
+            inv_ids = make_attending(event_id, user_id, 2, 2)
+            tid = make_table(event_id, 1, 4)
+            genders = ["Male", "Male", "Female", "Female"]
+            sa_ids = []
+            for pos, inv_id in enumerate(inv_ids, start=1):
+                sa = SeatAssignment(table_id=tid, invitation_id=inv_id, seat_position=pos)
+                db.session.add(sa)
+                db.session.flush()
+                sa_ids.append(sa.id)
+            db.session.commit()
+        return tid, inv_ids, sa_ids, genders
+
+    def test_plan_includes_score(self, logged_in_client, test_app, sample_event, user):
+        self._seat_all(test_app, sample_event, user)
+        r = logged_in_client.get(f"/api/v1/events/{sample_event}/seating")
+        assert r.get_json()["data"]["score"] == 2
+
+    def test_swap_returns_score_delta(self, logged_in_client, test_app, sample_event, user):
+        tid, _, sa_ids, _ = self._seat_all(test_app, sample_event, user)
+        logged_in_client.get(f"/api/v1/events/{sample_event}/seating")
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/swap",
+                     {"assignment_id_a": sa_ids[1], "assignment_id_b": sa_ids[2]})
+        data = r.get_json()["data"]
+        assert data["score"] == 0
+        assert data["changed_tables"] == [{"id": tid, "score": 0}]
+
+    def test_unseat_and_assign_return_score(self, logged_in_client, test_app, sample_event, user):
+        tid, inv_ids, sa_ids, _ = self._seat_all(test_app, sample_event, user)
+        r = logged_in_client.delete(f"/api/v1/events/{sample_event}/seating/assign/{sa_ids[0]}")
+        assert r.status_code == 200
+        assert r.get_json()["data"]["score"] == 1
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/assign",
+                     {"invitation_id": inv_ids[0], "table_id": tid, "seat_position": 1})
+        data = r.get_json()["data"]
+        assert data["assignment_id"]
+        assert data["score"] == 2
+
+    def test_seat_changes_return_delta(self, logged_in_client, test_app, sample_event, user):
+        tid, inv_ids, sa_ids, _ = self._seat_all(test_app, sample_event, user)
+        url = f"/api/v1/events/{sample_event}/seating"
+        data = api_post(logged_in_client, f"{url}/swap",
+                        {"assignment_id_a": sa_ids[1], "assignment_id_b": sa_ids[2]}).get_json()["data"]
+        assert data["delta"] and [t["id"] for t in data["tables"]] == [tid]
+        seats = data["tables"][0]["seats"]
+        assert (seats["2"]["invitation_id"], seats["3"]["invitation_id"]) == (inv_ids[2], inv_ids[1])
+
+        data = logged_in_client.delete(f"{url}/assign/{sa_ids[0]}").get_json()["data"]
+        assert "1" not in data["tables"][0]["seats"]
+        assert [g["invitation_id"] for g in data["unseated_added"]] == [inv_ids[0]]
+        data = api_post(logged_in_client, f"{url}/assign",
+                        {"invitation_id": inv_ids[0], "table_id": tid,
+                         "seat_position": 1}).get_json()["data"]
+        assert data["unseated_removed"] == [inv_ids[0]] and data["unseated_added"] == []
+
+        data = api_post(logged_in_client, f"{url}/assign/{sa_ids[1]}/lock").get_json()["data"]
+        assert data["is_locked"] and data["tables"][0]["seats"]["3"]["is_locked"]
+        data = api_post(logged_in_client, f"{url}/tables/{tid}/lock",
+                        {"lock": False}).get_json()["data"]
+        assert not any(seat["is_locked"] for seat in data["tables"][0]["seats"].values())
+        data = api_post(logged_in_client, f"{url}/batch", {"operations": [
+            {"op": "unseat", "assignment_id": sa_ids[3]}]}).get_json()["data"]
+        assert [g["invitation_id"] for g in data["unseated_added"]] == [inv_ids[3]]
+        assert data["score"] == logged_in_client.get(url).get_json()["data"]["score"]
+
+    def test_gender_edit_invalidates_score(self, logged_in_client, test_app, sample_event, user):
+        _, _, sa_ids, _ = self._seat_all(test_app, sample_event, user)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/swap",
+                     {"assignment_id_a": sa_ids[1], "assignment_id_b": sa_ids[2]})
+        assert r.get_json()["data"]["score"] == 0
+        with test_app.app_context():
+            guest_id = Invitation.query.filter_by(event_id=sample_event).first().guest_id
+        r = logged_in_client.put(f"/api/v1/friends/{guest_id}", json={"gender": "Female"})
+        assert r.status_code == 200
+        r = logged_in_client.get(f"/api/v1/events/{sample_event}/seating")
+        assert r.get_json()["data"]["score"] == 2
+
+
+class TestSeatingWriteCost:
+    def test_swap_issues_bounded_queries(self, test_app, sample_event, user):
+        from sqlalchemy import event as sa_event
+        from rsvp_manager.services import seating_service
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 10, 10)
+            tid = make_table(sample_event, 1, 20)
+            sa_ids = []
+            for pos, inv_id in enumerate(inv_ids, start=1):
+                sa = SeatAssignment(table_id=tid, invitation_id=inv_id, seat_position=pos)
+                db.session.add(sa)
+                db.session.flush()
+                sa_ids.append(sa.id)
+            db.session.commit()
+            event = db.session.get(Event, sample_event)
+            seating_service.swap_seats(event, sa_ids[0], sa_ids[1])
+
+            statements = []
+
+            def record(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            sa_event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                counts = []
+                for other in sa_ids[2:12]:
+                    statements.clear()
+                    seating_service.swap_seats(event, sa_ids[0], other)
+                    counts.append(len(statements))
+                    # The revision comes from the swap, not from replaying history
+                    assert not any("seating_revision.data" in s for s in statements
+                                   if s.lstrip().startswith("SELECT"))
+            finally:
+                sa_event.remove(db.engine, "before_cursor_execute", record)
+            # Includes reloading the changed table's seats for the response
+            assert max(counts) <= 20
+            assert len(set(counts)) == 1
+
+
+class TestSeatingPlanCache:
+    def test_etag_and_not_modified(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 1)
+            tid = make_table(sample_event, 1, 4)
+        url = f"/api/v1/events/{sample_event}/seating"
+        r = logged_in_client.get(url)
+        etag = r.headers["ETag"]
+        assert etag
+        r = logged_in_client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.data == b""
+
+        api_post(logged_in_client, f"{url}/assign",
+                 {"invitation_id": inv_ids[0], "table_id": tid, "seat_position": 1})
+        r = logged_in_client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["ETag"] != etag
+        assert len(r.get_json()["data"]["unseated"]) == 1
+
+        etag = r.headers["ETag"]
+        api_post(logged_in_client, f"{url}/tables/{tid}/rotate")
+        r = logged_in_client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.get_json()["data"]["tables"][0]["rotation"] == 90
+
+    def test_guest_and_invitation_edits_refresh_plan(self, logged_in_client, test_app,
+                                                     sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 1)
+            tid = make_table(sample_event, 1, 4)
+            db.session.add(SeatAssignment(table_id=tid, invitation_id=inv_ids[0], seat_position=1))
+            db.session.commit()
+            guest_id = db.session.get(Invitation, inv_ids[0]).guest_id
+        url = f"/api/v1/events/{sample_event}/seating"
+        logged_in_client.get(url)
+        logged_in_client.put(f"/api/v1/friends/{guest_id}", json={"first_name": "Renamed"})
+        data = logged_in_client.get(url).get_json()["data"]
+        assert data["tables"][0]["seats"]["1"]["first_name"] == "Renamed"
+
+        logged_in_client.put(f"/api/v1/invitations/{inv_ids[1]}", json={"status": "Declined"})
+        assert logged_in_client.get(url).get_json()["data"]["unseated"] == []
+
+
+class TestDeltaResponses:
+    def test_auto_assign_delta(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 2, 2)
+            make_table(sample_event, 1, 4)
+            make_table(sample_event, 2, 4)
+        url = f"/api/v1/events/{sample_event}/seating"
+        r = api_post(logged_in_client, f"{url}/auto-assign",
+                     {"mode": "alternating", "response": "delta"})
+        data = r.get_json()["data"]
+        assert data["delta"] is True
+        assert sorted(data["unseated_removed"]) == sorted(inv_ids)
+        assert data["unseated_added"] == []
+        seated = sum(len(t["seats"]) for t in data["tables"])
+        assert seated == 4
+        assert data["score"] == logged_in_client.get(url).get_json()["data"]["score"]
+
+    def test_shuffle_delta_patches_previous_plan(self, logged_in_client, test_app,
+                                                 sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 3, 3)
+            make_table(sample_event, 1, 4)
+            make_table(sample_event, 2, 4)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/auto-assign", {"seed": 1})
+        with test_app.app_context():
+            SeatAssignment.query.filter_by(invitation_id=inv_ids[0]).first().is_locked = True
+            db.session.commit()
+        plan = logged_in_client.get(url).get_json()["data"]
+
+        data = api_post(logged_in_client, f"{url}/shuffle",
+                        {"seed": 5, "response": "delta"}).get_json()["data"]
+        tables = {t["id"]: t for t in plan["tables"]}
+        tables.update({t["id"]: t for t in data["tables"]})
+        unseated = [g for g in plan["unseated"]
+                    if g["invitation_id"] not in data["unseated_removed"]] + data["unseated_added"]
+        after = logged_in_client.get(url).get_json()["data"]
+        assert list(tables.values()) == after["tables"]
+        assert unseated == after["unseated"]
+        assert data["score"] == after["score"]
+
+    def test_invalid_response_mode(self, logged_in_client, test_app, sample_event, user):
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/shuffle",
+                     {"response": "diff"})
+        assert r.status_code == 400
+
+
+# ── Batch operations ─────────────────────────────────────────────────────────
+
+class TestSeatingBatch:
+    def _setup(self, test_app, event_id, user_id):
+        with test_app.app_context():
+            inv_ids = make_attending(event_id, user_id, 2, 2)
+            t1 = make_table(event_id, 1, 4)
+            t2 = make_table(event_id, 2, 4)
+            sa = SeatAssignment(table_id=t1, invitation_id=inv_ids[0], seat_position=1)
+            db.session.add(sa)
+            db.session.commit()
+            return inv_ids, t1, t2, sa.id
+
+    def test_batch_applies_all_in_one_log(self, logged_in_client, test_app, sample_event, user):
+        from rsvp_manager.models import ActivityLog
+        inv_ids, t1, t2, sa_id = self._setup(test_app, sample_event, user)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/batch", {"operations": [
+            {"op": "assign", "invitation_id": inv_ids[1], "table_id": t1, "seat_position": 2},
+            {"op": "assign", "invitation_id": inv_ids[2], "table_id": t2, "seat_position": 1},
+            {"op": "unseat", "assignment_id": sa_id},
+            {"op": "assign", "invitation_id": inv_ids[0], "table_id": t2, "seat_position": 2},
+        ]})
+        assert r.status_code == 200
+        data = r.get_json()["data"]
+        assert data["applied"] == 4
+        assert set(data["assignments"]) == {str(inv_ids[0]), str(inv_ids[1]), str(inv_ids[2])}
+        assert {t["id"] for t in data["changed_tables"]} == {t1, t2}
+        with test_app.app_context():
+            seats = {(sa.table_id, sa.seat_position): sa.invitation_id for sa in SeatAssignment.query.all()}
+            assert seats == {(t1, 2): inv_ids[1], (t2, 1): inv_ids[2], (t2, 2): inv_ids[0]}
+            assert ActivityLog.query.filter_by(action="updated_seating").count() == 1
+
+    def test_batch_move_and_lock(self, logged_in_client, test_app, sample_event, user):
+        inv_ids, t1, t2, sa_id = self._setup(test_app, sample_event, user)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/batch", {"operations": [
+            {"op": "assign", "invitation_id": inv_ids[0], "table_id": t2, "seat_position": 3},
+            {"op": "lock", "assignment_id": sa_id, "locked": True},
+        ]})
+        assert r.status_code == 200
+        with test_app.app_context():
+            sa = db.session.get(SeatAssignment, sa_id)
+            assert (sa.table_id, sa.seat_position, sa.is_locked) == (t2, 3, True)
+
+    def test_batch_move_unlocks_like_assign(self, logged_in_client, test_app, sample_event, user):
+        inv_ids, t1, t2, sa_id = self._setup(test_app, sample_event, user)
+        url = f"/api/v1/events/{sample_event}/seating"
+        with test_app.app_context():
+            db.session.add(SeatAssignment(table_id=t1, invitation_id=inv_ids[1],
+                                          seat_position=2, is_locked=True))
+            db.session.get(SeatAssignment, sa_id).is_locked = True
+            db.session.commit()
+        r = api_post(logged_in_client, f"{url}/batch", {"operations": [
+            {"op": "assign", "invitation_id": inv_ids[0], "table_id": t2, "seat_position": 3},
+        ]})
+        assert r.status_code == 200
+        api_post(logged_in_client, f"{url}/assign",
+                 {"invitation_id": inv_ids[1], "table_id": t2, "seat_position": 4})
+        with test_app.app_context():
+            locks = {sa.invitation_id: (sa.seat_position, sa.is_locked)
+                     for sa in SeatAssignment.query.all()}
+            assert locks == {inv_ids[0]: (3, False), inv_ids[1]: (4, False)}
+
+    def test_invalid_operation_rolls_back(self, logged_in_client, test_app, sample_event, user):
+        inv_ids, t1, t2, sa_id = self._setup(test_app, sample_event, user)
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/batch", {"operations": [
+            {"op": "assign", "invitation_id": inv_ids[1], "table_id": t2, "seat_position": 1},
+            {"op": "assign", "invitation_id": inv_ids[2], "table_id": t1, "seat_position": 1},
+        ]})
+        assert r.status_code == 400
+        assert r.get_json()["message"] == "Operation 2: Seat is already occupied"
+        with test_app.app_context():
+            assert SeatAssignment.query.count() == 1
+        for body in ([1, 2], "ops", {"operations": []}, {"operations": [1]}):
+            r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/batch", body)
+            assert r.status_code == 400
+
+    def test_requires_cohost(self, logged_in_client, test_app, user2):
+        with test_app.app_context():
+            e = Event(user_id=user2, name="Other", event_type="Party", date=date(2026, 7, 1))
+            db.session.add(e)
+            db.session.commit()
+            eid = e.id
+        r = api_post(logged_in_client, f"/api/v1/events/{eid}/seating/batch",
+                     {"operations": [{"op": "unseat", "assignment_id": 1}]})
+        assert r.status_code == 403
+
+
+class TestSeatingRevisions:
+    def seats(self, event_id):
+        return sorted((sa.invitation_id, sa.table_id, sa.seat_position)
+                      for sa in SeatAssignment.query.join(SeatingTable).filter(
+                          SeatingTable.event_id == event_id))
+
+    def test_undo_redo_shuffle(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 4, 4)
+            make_table(sample_event, 1, 8)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/auto-assign", {"seed": 1})
+        with test_app.app_context():
+            first = self.seats(sample_event)
+        api_post(logged_in_client, f"{url}/shuffle", {"seed": 2})
+        with test_app.app_context():
+            second = self.seats(sample_event)
+        assert first != second
+
+        r = api_post(logged_in_client, f"{url}/undo")
+        assert r.status_code == 200
+        assert sum(len(t["seats"]) for t in r.get_json()["data"]["tables"]) == 8
+        with test_app.app_context():
+            assert self.seats(sample_event) == first
+        api_post(logged_in_client, f"{url}/undo")
+        with test_app.app_context():
+            assert self.seats(sample_event) == []
+        r = api_post(logged_in_client, f"{url}/undo")
+        assert r.status_code == 400
+
+        api_post(logged_in_client, f"{url}/redo")
+        api_post(logged_in_client, f"{url}/redo")
+        with test_app.app_context():
+            assert self.seats(sample_event) == second
+        assert api_post(logged_in_client, f"{url}/redo").status_code == 400
+
+    def test_new_change_drops_redo(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 1)
+            tid = make_table(sample_event, 1, 4)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/assign",
+                 {"invitation_id": inv_ids[0], "table_id": tid, "seat_position": 1})
+        api_post(logged_in_client, f"{url}/undo")
+        api_post(logged_in_client, f"{url}/assign",
+                 {"invitation_id": inv_ids[1], "table_id": tid, "seat_position": 2})
+        r = logged_in_client.get(f"{url}/revisions")
+        data = r.get_json()["data"]
+        assert [rev["number"] for rev in data["revisions"]] == [2, 1]
+        assert data["can_undo"] and not data["can_redo"]
+
+    def test_rotate_records_no_revision(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 0)
+            tid = make_table(sample_event, 1, 4)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/assign",
+                 {"invitation_id": inv_ids[0], "table_id": tid, "seat_position": 1})
+        api_post(logged_in_client, f"{url}/undo")
+        with test_app.app_context():
+            count = SeatingRevision.query.filter_by(event_id=sample_event).count()
+        assert api_post(logged_in_client, f"{url}/tables/{tid}/rotate").status_code == 200
+        with test_app.app_context():
+            assert SeatingRevision.query.filter_by(event_id=sample_event).count() == count
+        assert api_post(logged_in_client, f"{url}/redo").status_code == 200
+        with test_app.app_context():
+            assert self.seats(sample_event) == [(inv_ids[0], tid, 1)]
+
+    def test_restore_and_diffs(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 3, 3)
+            tid = make_table(sample_event, 1, 6)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/batch", {"operations": [
+            {"op": "assign", "invitation_id": inv_id, "table_id": tid, "seat_position": pos}
+            for pos, inv_id in enumerate(inv_ids, start=1)]})
+        with test_app.app_context():
+            full = self.seats(sample_event)
+            aid = SeatAssignment.query.filter_by(invitation_id=inv_ids[0]).first().id
+        logged_in_client.delete(f"{url}/assign/{aid}")
+        api_post(logged_in_client, f"{url}/clear")
+        with test_app.app_context():
+            revisions = {r.number: r for r in SeatingRevision.query.filter_by(event_id=sample_event)}
+            assert revisions[1].is_keyframe and json.loads(revisions[1].data) == {"seats": []}
+            assert json.loads(revisions[3].data) == {"unset": [inv_ids[0]], "set": []}
+            assert len(revisions[3].data) < len(revisions[2].data)
+
+        r = api_post(logged_in_client, f"{url}/revisions/2/restore")
+        assert r.status_code == 200
+        with test_app.app_context():
+            assert self.seats(sample_event) == full
+            assert SeatingRevision.query.filter_by(event_id=sample_event).count() == 5
+        assert api_post(logged_in_client, f"{url}/revisions/99/restore").status_code == 404
+
+    def test_drag_revisions_from_moves(self, logged_in_client, test_app, sample_event, user,
+                                       monkeypatch):
+        from rsvp_manager.services import seating_service
+        monkeypatch.setattr(seating_service, "SEATING_KEYFRAME_INTERVAL", 3)
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 1)
+            tid = make_table(sample_event, 1, 6)
+        url = f"/api/v1/events/{sample_event}/seating"
+
+        def plan():
+            return sorted((sa.invitation_id, sa.seat_position, bool(sa.is_locked))
+                          for sa in SeatAssignment.query.all())
+
+        states = []
+        a = api_post(logged_in_client, f"{url}/assign", {
+            "invitation_id": inv_ids[0], "table_id": tid, "seat_position": 1,
+        }).get_json()["data"]["assignment_id"]
+        b = api_post(logged_in_client, f"{url}/assign", {
+            "invitation_id": inv_ids[1], "table_id": tid, "seat_position": 4,
+        }).get_json()["data"]["assignment_id"]
+        with test_app.app_context():
+            states.append(plan())
+        api_post(logged_in_client, f"{url}/swap", {"assignment_id_a": a, "assignment_id_b": b})
+        with test_app.app_context():
+            states.append(plan())
+        api_post(logged_in_client, f"{url}/assign/{a}/lock")
+        with test_app.app_context():
+            states.append(plan())
+        logged_in_client.delete(f"{url}/assign/{b}")
+        with test_app.app_context():
+            states.append(plan())
+            revisions = {r.number: r for r in SeatingRevision.query.filter_by(event_id=sample_event)}
+            assert json.loads(revisions[3].data) == {"set": [[inv_ids[1], tid, 4, 0]]}
+            # Every third revision is a full keyframe, the drags in between are diffs
+            assert revisions[4].is_keyframe
+            assert json.loads(revisions[4].data) == {"seats": [[inv_ids[0], tid, 4, 0],
+                                                               [inv_ids[1], tid, 1, 0]]}
+            assert json.loads(revisions[5].data) == {"set": [[inv_ids[0], tid, 4, 1]]}
+            assert json.loads(revisions[6].data) == {"set": [], "unset": [inv_ids[1]]}
+
+        for expected in reversed(states[:-1]):
+            assert api_post(logged_in_client, f"{url}/undo").status_code == 200
+            with test_app.app_context():
+                assert plan() == expected
+
+    def test_prunes_oldest_revisions(self, logged_in_client, test_app, sample_event, user,
+                                     monkeypatch):
+        from rsvp_manager.services import seating_service
+        monkeypatch.setattr(seating_service, "SEATING_REVISION_LIMIT", 3)
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 1, 1)
+            tid = make_table(sample_event, 1, 8)
+        url = f"/api/v1/events/{sample_event}/seating"
+        api_post(logged_in_client, f"{url}/assign",
+                 {"invitation_id": inv_ids[1], "table_id": tid, "seat_position": 8})
+        for pos in range(1, 5):
+            api_post(logged_in_client, f"{url}/assign",
+                     {"invitation_id": inv_ids[0], "table_id": tid, "seat_position": pos})
+        with test_app.app_context():
+            revisions = SeatingRevision.query.filter_by(event_id=sample_event).order_by(
+                SeatingRevision.number).all()
+            assert [r.number for r in revisions] == [4, 5, 6]
+            assert revisions[0].is_keyframe
+            assert json.loads(revisions[0].data) == {
+                "seats": [[inv_ids[0], tid, 2, 0], [inv_ids[1], tid, 8, 0]]}
+
+
+class TestSeatingJobs:
+    def test_job_runs_and_applies_plan(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 4, 4)
+            make_table(sample_event, 1, 8)
+        url = f"/api/v1/events/{sample_event}/seating"
+        r = api_post(logged_in_client, f"{url}/jobs",
+                     {"mode": "optimize", "restarts": 3, "seed": 1, "time_budget_ms": 300})
+        assert r.status_code == 202
+        job = r.get_json()["data"]
+        assert job["kind"] == "auto_assign"
+        r = logged_in_client.get(f"{url}/jobs/{job['id']}")
+        job = r.get_json()["data"]
+        assert job["status"] == "done"
+        assert job["completed"] == 3
+        plan = logged_in_client.get(url).get_json()["data"]
+        assert plan["unseated"] == []
+        assert plan["seed"] == {"seed": 1, "mode": "optimize", "restarts": 3}
+        assert job["best_score"] == plan["score"] == 0
+        assert logged_in_client.get(f"{url}/jobs").get_json()["data"][0]["id"] == job["id"]
+        assert api_post(logged_in_client, f"{url}/jobs/{job['id']}/cancel").status_code == 400
+
+    def test_best_score_reported_while_running(self, logged_in_client, test_app, sample_event,
+                                               user, monkeypatch):
+        from rsvp_manager.services import seating_service
+        monkeypatch.setattr(seating_engine, "_PROGRESS_EVERY_S", 0)
+        search, seen = seating_service._search, []
+
+        def spy(*args, progress=None, **kwargs):
+            def watch(completed, best_score):
+                result = progress(completed, best_score)
+                job = SeatingJob.query.filter_by(event_id=sample_event).one()
+                seen.append((completed, job.status, job.best_score))
+                return result
+            return search(*args, progress=watch, **kwargs)
+
+        monkeypatch.setattr(seating_service, "_search", spy)
+        with test_app.app_context():
+            make_attending(sample_event, user, 35, 15)
+            for number in range(1, 6):
+                make_table(sample_event, number, 10, shape="round")
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/jobs",
+                     {"mode": "optimize", "seed": 1, "time_budget_ms": 2000})
+        assert r.status_code == 202
+        running = [best for completed, status, best in seen
+                   if completed == 0 and status == "running"]
+        assert running and all(best is not None for best in running)
+        assert seen[-1][0] == 1
+
+    def test_plan_change_blocks_apply(self, test_app, sample_event, user):
+        from rsvp_manager.services import seating_service
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 2, 2)
+            tid = make_table(sample_event, 1, 4)
+            event = db.session.get(Event, sample_event)
+            version, snapshot = seating_service.prepare_seating_search(event)
+            placements, _ = seating_engine.search(snapshot, mode="random", seed=1)
+            seating_service.assign_seat(event, inv_ids[0], tid, 1)
+            try:
+                seating_service.apply_seating_search(event, version, placements)
+                assert False, "expected a conflict"
+            except ValueError as e:
+                assert "changed" in str(e)
+            assert SeatAssignment.query.count() == 1
+
+    def test_cancel_queued_job(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            job = SeatingJob(event_id=sample_event, created_by=user, kind="shuffle",
+                             mode="optimize", time_budget_ms=250, restarts=1, seed=0,
+                             status="queued", created_at=datetime.now())
+            db.session.add(job)
+            db.session.commit()
+            job_id = job.id
+        url = f"/api/v1/events/{sample_event}/seating/jobs"
+        r = api_post(logged_in_client, f"{url}", {})
+        assert r.status_code == 400
+        r = api_post(logged_in_client, f"{url}/{job_id}/cancel")
+        assert r.get_json()["data"]["status"] == "cancelled"
+
+    def test_viewer_cannot_start_jobs(self, logged_in_client, test_app, user, user2):
+        with test_app.app_context():
+            e = Event(user_id=user2, name="Other", event_type="Party", date=date(2026, 7, 1))
+            db.session.add(e)
+            db.session.flush()
+            db.session.add(EventCohost(event_id=e.id, user_id=user, role="viewer",
+                                       joined_at=datetime.now()))
+            db.session.commit()
+            eid = e.id
+        r = api_post(logged_in_client, f"/api/v1/events/{eid}/seating/jobs", {})
+        assert r.status_code == 403
+        assert logged_in_client.get(f"/api/v1/events/{eid}/seating/jobs").status_code == 200
+
+
+class TestTableLayout:
+    TYPES = [("rectangular", c) for c in (4, 6, 8, 10, 12)]
+
+    def test_fewest_evenly_filled_tables(self):
+        layout = seating_engine.plan_table_layout([1] * 30, self.TYPES)
+        assert [(c, g) for _, c, g in layout] == [(10, 10)] * 3
+
+    def test_groups_stay_whole(self):
+        layout = seating_engine.plan_table_layout([5, 5, 4, 3, 3, 2], self.TYPES)
+        assert len(layout) == 2
+        assert sum(g for _, _, g in layout) == 22
+        assert all(g <= c for _, c, g in layout)
+
+    def test_oversized_group_split_and_shapes(self):
+        types = [("round", 8), ("long", 16)]
+        layout = seating_engine.plan_table_layout([20], types)
+        assert sorted((s, c, g) for s, c, g in layout) == [("long", 16, 16), ("round", 8, 4)]
+
+    def test_auto_assign_creates_layout_in_bulk(self, logged_in_client, test_app,
+                                                sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 20, 20)
+        url = f"/api/v1/events/{sample_event}/seating"
+        r = api_post(logged_in_client, f"{url}/tables/auto-layout", {"dry_run": True})
+        assert [t["capacity"] for t in r.get_json()["data"]] == [20, 20]
+        r = api_post(logged_in_client, f"{url}/auto-assign", {"mode": "alternating"})
+        plan = r.get_json()["data"]
+        assert [(t["table_number"], t["capacity"]) for t in plan["tables"]] == [(1, 20), (2, 20)]
+        assert plan["unseated"] == []
+
+    def test_layout_endpoint_validation(self, logged_in_client, test_app, sample_event, user):
+        with test_app.app_context():
+            make_attending(sample_event, user, 2, 2)
+        url = f"/api/v1/events/{sample_event}/seating/tables/auto-layout"
+        r = api_post(logged_in_client, url, {"table_types": [{"shape": "round", "capacity": 99}]})
+        assert r.status_code == 400
+        r = api_post(logged_in_client, url, {"table_types": [{"shape": "round", "capacity": 6}]})
+        assert r.status_code == 201
+        assert [(t["shape"], t["capacity"]) for t in r.get_json()["data"]] == [("round", 6)]
+
+
+class TestSeatingTemplates:
+    def test_save_and_apply_with_locked_seats(self, logged_in_client, test_app,
+                                              sample_event, user):
+        with test_app.app_context():
+            inv_ids = make_attending(sample_event, user, 2, 1)
+            t1 = make_table(sample_event, 1, 6)
+            make_table(sample_event, 2, 8, shape="long")
+            db.session.add(SeatAssignment(table_id=t1, invitation_id=inv_ids[0],
+                                          seat_position=3, is_locked=True))
+            db.session.add(SeatAssignment(table_id=t1, invitation_id=inv_ids[1],
+                                          seat_position=4))
+            db.session.add(SeatAssignment(table_id=t1, invitation_id=inv_ids[2],
+                                          seat_position=5, is_locked=True))
+            db.session.get(SeatingTable, t1).label = "Head"
+            guest_ids = [db.session.get(Invitation, i).guest_id for i in inv_ids]
+            other = Event(user_id=user, name="Second", event_type="Dinner",
+                          date=date(2026, 7, 1), date_created=date.today())
+            db.session.add(other)
+            db.session.flush()
+            db.session.add_all([Invitation(event_id=other.id, guest_id=g,
+                                           status="Pending" if g == guest_ids[2] else "Attending",
+                                           date_invited=date.today()) for g in guest_ids])
+            db.session.commit()
+            other_id = other.id
+            make_table(other_id, 1, 4)
+
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/templates",
+                     {"name": "Hall", "include_locked": True})
+        assert r.status_code == 201
+        template = r.get_json()["data"]
+        assert [(t["shape"], t["capacity"], t["locked_seats"]) for t in template["tables"]] == [
+            ("round", 6, 2), ("long", 8, 0)]
+        r = logged_in_client.get("/api/v1/seating-templates")
+        assert [t["name"] for t in r.get_json()["data"]] == ["Hall"]
+
+        url = f"/api/v1/events/{other_id}/seating/templates/{template['id']}/apply"
+        r = api_post(logged_in_client, url, {"copy_locked": True})
+        assert r.status_code == 200
+        data = r.get_json()["data"]
+        # The third guest hasn't confirmed for the second event, so stays unseated
+        assert data["copied_seats"] == 1
+        assert data["skipped_guests"] == [guest_ids[2]]
+        tables = data["tables"]
+        assert [(t["table_number"], t["label"], t["capacity"]) for t in tables] == [
+            (1, "", 4), (2, "Head", 6), (3, "", 8)]
+        with test_app.app_context():
+            seats = SeatAssignment.query.join(SeatingTable).filter(
+                SeatingTable.event_id == other_id).all()
+            assert [(s.table.table_number, s.seat_position, s.is_locked) for s in seats] == [
+                (2, 3, True)]
+            assert seats[0].invitation.guest_id == guest_ids[0]
+
+    def test_apply_checks_owner_and_capacity(self, logged_in_client, test_app,
+                                             sample_event, user):
+        with test_app.app_context():
+            make_table(sample_event, 1, 6)
+            sample = db.session.get(Event, sample_event)
+            sample.seating_venue_mode = True
+            make_table(sample_event, 2, 60)
+            other = Event(user_id=user, name="Second", event_type="Dinner",
+                          date=date(2026, 7, 1), date_created=date.today())
+            db.session.add(other)
+            db.session.commit()
+            other_id = other.id
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/templates",
+                     {"name": ""})
+        assert r.status_code == 400
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/templates",
+                     {"name": "Banquet"})
+        template_id = r.get_json()["data"]["id"]
+        url = f"/api/v1/events/{other_id}/seating/templates/{template_id}/apply"
+        r = api_post(logged_in_client, url)
+        assert r.status_code == 400
+        with test_app.app_context():
+            assert SeatingTable.query.filter_by(event_id=other_id).count() == 0
+
+        r = api_post(logged_in_client, f"/api/v1/events/{sample_event}/seating/templates/"
+                     f"{template_id + 1}/apply")
+        assert r.status_code == 404
+        r = logged_in_client.delete(f"/api/v1/seating-templates/{template_id}")
+        assert r.status_code == 204
+        assert logged_in_client.get("/api/v1/seating-templates").get_json()["data"] == []
+
+    def test_viewer_cannot_save_template(self, logged_in_client, test_app, user, user2):
+        with test_app.app_context():
+            e = Event(user_id=user2, name="Other", event_type="Party", date=date(2026, 7, 1))
+            db.session.add(e)
+            db.session.flush()
+            db.session.add(EventCohost(event_id=e.id, user_id=user, role="viewer",
+                                       joined_at=datetime.now()))
+            db.session.commit()
+            eid = e.id
+            make_table(eid, 1, 6)
+        r = api_post(logged_in_client, f"/api/v1/events/{eid}/seating/templates",
+                     {"name": "Copy", "include_locked": True})
+        assert r.status_code == 403
+        assert logged_in_client.get("/api/v1/seating-templates").get_json()["data"] == []